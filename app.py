@@ -3,13 +3,15 @@ import sys
 import cv2
 import numpy as np
 from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtGui import QImage, QKeySequence, QPixmap, QShortcut
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QTextEdit, QFileDialog, QMessageBox
 )
 
-from main import SignRecognizer
+from instrumentation import PROFILER
+from model_registry import ModelRegistry
+from recognizer import SignRecognizer
 from smoothing import MajoritySmoother
 
 
@@ -96,6 +98,10 @@ class MainWindow(QWidget):
         self.btn_clear.clicked.connect(self.clear_text)
         self.btn_commit.clicked.connect(self.commit_token)
 
+        # F3: per-stage timing overlay (starts recording), F4: export the trace to logs/
+        QShortcut(QKeySequence("F3"), self, PROFILER.toggle_overlay)
+        QShortcut(QKeySequence("F4"), self, PROFILER.export)
+
     def setup_layouts(self):
         top_layout = QHBoxLayout()
         top_layout.addWidget(self.btn_start)
@@ -132,6 +138,10 @@ class MainWindow(QWidget):
     def init_sign_recognizer(self):
         self.recognizer = SignRecognizer("models/sign_classifier.pkl")
         self.smoother = MajoritySmoother(window=7)
+        self.registry = ModelRegistry()
+        self.model_load = None
+        self.load_timer = QTimer()
+        self.load_timer.timeout.connect(self.check_model_load)
 
     def start_cam(self):
         if self.cap is None:
@@ -146,25 +156,46 @@ class MainWindow(QWidget):
         self.video_label.setText("Camera is off")
 
     def load_model(self):
-        fn, _ = QFileDialog.getOpenFileName(self, "Select model", "models", "Pickle (*.pkl)")
+        fn, _ = QFileDialog.getOpenFileName(self, "Select model", "models", "Models (*.wtm *.pkl *.joblib)")
         if fn:
-            try:
-                self.recognizer = SignRecognizer(fn)
-            except Exception as e:
-                QMessageBox.warning(self, "Load failed", str(e))
+            # Load and compile off the Qt thread; the recognizer swaps it in between frames
+            self.model_load = self.registry.load_into(self.recognizer, fn)
+            self.btn_load.setEnabled(False)
+            self.btn_load.setText("⏳ Loading…")
+            self.load_timer.start(100)
+
+    def check_model_load(self):
+        job = self.model_load
+        if job is None or not job.done.is_set():
+            return
+        self.load_timer.stop()
+        self.model_load = None
+        self.btn_load.setEnabled(True)
+        self.btn_load.setText("📂 Load Model")
+        if job.error is not None:
+            QMessageBox.warning(self, "Load failed", str(job.error))
+        else:
+            self.smoother.clear()
+            self.setWindowTitle(f"🖐 Sign2Text Professional — {job.info.name}")
 
     def update_frame(self):
         if self.cap is None:
             return
-        ret, frame = self.cap.read()
+        with PROFILER.stage("cap.read"):
+            ret, frame = self.cap.read()
         if not ret:
             return
 
-        frame, pred, fps = self.recognizer.process_frame(frame)
+        with PROFILER.stage("process_frame"):
+            frame, pred, fps = self.recognizer.process_frame(frame)
         smoothed = self.smoother.push(pred)
         if smoothed:
             self.pred_label.setText(smoothed)
-        self.video_label.setPixmap(cv2qt(frame))
+        cv2.putText(frame, f"{fps:.0f} fps", (frame.shape[1] - 90, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (80, 255, 80), 2)
+        PROFILER.overlay(frame)
+        with PROFILER.stage("QPixmap"):
+            self.video_label.setPixmap(cv2qt(frame))
 
     def commit_token(self):
         token = self.pred_label.text()
@@ -186,6 +217,7 @@ class MainWindow(QWidget):
         self.output.clear()
 
     def closeEvent(self, e):
+        PROFILER.export()
         self.stop_cam()
         super().closeEvent(e)
 
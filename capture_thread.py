@@ -2,6 +2,7 @@ from __future__ import annotations
 import cv2
 from PySide6.QtCore import QThread, Signal
 import mediapipe as mp
+from frame_source import open_source
 from utils_landmarks import extract_features
 
 mp_hands = mp.solutions.hands
@@ -10,18 +11,16 @@ class CaptureThread(QThread):
     frame_ready = Signal(object)          # BGR frame (numpy array)
     features_ready = Signal(object)       # feature vector or None
 
-    def __init__(self, cam_index: int = 0, min_detection_confidence: float = 0.6, min_tracking_confidence: float = 0.5):
+    def __init__(self, cam_index: int | str = 0, min_detection_confidence: float = 0.6, min_tracking_confidence: float = 0.5):
         super().__init__()
-        self.cam_index = cam_index
+        self.cam_index = cam_index  # camera index or any open_source() spec (video file, image dir, "synthetic")
         self._running = False
         self.det_conf = min_detection_confidence
         self.trk_conf = min_tracking_confidence
 
     def run(self):
         self._running = True
-        cap = cv2.VideoCapture(self.cam_index)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        cap = open_source(self.cam_index, realtime=True)
 
         with mp_hands.Hands(
             static_image_mode=False,
@@ -0,0 +1,276 @@
+"""
+Streaming commit decoder: turns per-frame class probabilities into typed symbols.
+
+Each frame's probability vector is treated as (tempered) evidence in a small
+Bayes filter over "which sign is being held". The posterior leaks back towards
+a prior every frame, so old evidence fades, and a symbol is committed only when
+its posterior crosses `threshold`. A committed symbol is latched until it is
+released -- the hand leaves the frame or the posterior of that symbol falls
+below `release_threshold` -- so holding a sign types it once. Double letters
+are typed by releasing and signing again, or by holding past `repeat_after`.
+
+An optional letter-bigram prior (`bigram_from_text`) biases the next symbol
+after each commit.
+
+    python commit_decoder.py          # simulated latency / false-commit trade-off
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+THRESHOLD = 0.9
+RELEASE_THRESHOLD = 0.4
+SWITCH_PROB = 0.05
+SHARPNESS = 0.5
+RELEASE_S = 0.25
+IGNORE_LABELS = ("nothing",)
+SYMBOLS = {"space": " "}
+BIGRAM_CORPUS = os.path.join("data", "bigram_corpus.txt")
+
+
+def label_symbol(label) -> Optional[str]:
+    """Character a class label types ('A' -> 'a', 'Space' -> ' '), or None if it has none."""
+    name = str(label)
+    if name.lower() in SYMBOLS:
+        return SYMBOLS[name.lower()]
+    return name.lower() if len(name) == 1 else None
+
+
+def bigram_from_text(text: str, classes: Sequence, alpha: float = 1.0) -> np.ndarray:
+    """
+    Letter-bigram transition matrix over `classes` from a text corpus.
+
+    Returns:
+        np.ndarray: (K, K) row-stochastic P(next class | previous class), add-`alpha`
+                    smoothed. Classes that type no character get uniform rows/columns.
+    """
+    symbols = [label_symbol(c) for c in classes]
+    index = {s: i for i, s in enumerate(symbols) if s is not None}
+    counts = np.full((len(classes), len(classes)), float(alpha))
+    codes = [index.get(ch) for ch in text.lower()]
+    for a, b in zip(codes, codes[1:]):
+        if a is not None and b is not None:
+            counts[a, b] += 1
+    return counts / counts.sum(axis=1, keepdims=True)
+
+
+def load_bigram(path: str, classes: Sequence, alpha: float = 1.0) -> np.ndarray:
+    with open(path, encoding="utf-8") as f:
+        return bigram_from_text(f.read(), classes, alpha)
+
+
+def make_decoder(classes: Sequence, corpus: str = BIGRAM_CORPUS, **kwargs) -> "CommitDecoder":
+    """The decoder the app runs: default settings, with the bigram prior when `corpus` exists."""
+    bigram = load_bigram(corpus, classes) if corpus and os.path.exists(corpus) else None
+    return CommitDecoder(classes, bigram=bigram, **kwargs)
+
+
+class CommitDecoder:
+    """
+    Args:
+        classes: Class labels, in the order of the probability vectors.
+        threshold (float): Posterior needed to commit a symbol.
+        release_threshold (float): A latched symbol is released once its posterior drops below this.
+        switch_prob (float): Per-frame probability that the held sign changes (evidence leak).
+        sharpness (float): Exponent on frame probabilities; < 1 discounts correlated frames.
+        release_s (float): Hand absence (seconds) that counts as a release.
+        repeat_after (Optional[float]): Holding a committed sign this long commits it again.
+        bigram (Optional[np.ndarray]): (K, K) P(next | previous) prior, see bigram_from_text.
+        prior_weight (float): How much of the prior comes from the bigram row (vs. uniform).
+        ignore: Labels that are never committed (background classes).
+    """
+
+    def __init__(self, classes: Sequence, threshold: float = THRESHOLD,
+                 release_threshold: float = RELEASE_THRESHOLD, switch_prob: float = SWITCH_PROB,
+                 sharpness: float = SHARPNESS, release_s: float = RELEASE_S,
+                 repeat_after: Optional[float] = None, bigram: Optional[np.ndarray] = None,
+                 prior_weight: float = 0.5, ignore: Iterable = IGNORE_LABELS):
+        self.classes = list(classes)
+        self.threshold = threshold
+        self.release_threshold = release_threshold
+        self.switch_prob = switch_prob
+        self.sharpness = sharpness
+        self.release_s = release_s
+        self.repeat_after = repeat_after
+        self.bigram = bigram
+        self.prior_weight = prior_weight
+        ignore = {str(l).lower() for l in ignore}
+        self._committable = np.array([str(c).lower() not in ignore for c in self.classes])
+        self._uniform = np.full(len(self.classes), 1.0 / len(self.classes))
+        self.latencies: List[float] = []
+        self.commits: List[Tuple[float, object]] = []
+        self.reset()
+
+    def reset(self):
+        """Forget the current sign and the bigram context."""
+        self.prior = self._uniform
+        self.posterior = self._uniform.copy()
+        self.latched: Optional[int] = None
+        self._latched_at = 0.0
+        self._onset: Optional[float] = None
+        self._missing_since: Optional[float] = None
+
+    # -- state helpers ----------------------------------------------------------------------
+    @property
+    def candidate(self) -> Tuple[object, float]:
+        """(label, posterior) of the current best hypothesis."""
+        k = int(self.posterior.argmax())
+        return self.classes[k], float(self.posterior[k])
+
+    def _release(self, t: float, lost_hand: bool):
+        self.latched = None
+        self._onset = None if lost_hand else t
+        if lost_hand:
+            self.posterior = self.prior.copy()
+
+    def _commit(self, k: int, t: float):
+        self.latched = k
+        self._latched_at = t
+        if self._onset is not None:
+            self.latencies.append(t - self._onset)
+        self.commits.append((t, self.classes[k]))
+        if self.bigram is not None:
+            self.prior = self.prior_weight * self.bigram[k] + (1.0 - self.prior_weight) * self._uniform
+        self._onset = t
+        return self.classes[k]
+
+    # -- streaming ----------------------------------------------------------------------------
+    def update(self, proba: Optional[np.ndarray], t: Optional[float] = None):
+        """
+        Feed one frame.
+
+        Args:
+            proba: Class probability vector, or None when no hand was detected.
+            t: Frame time in seconds (defaults to time.monotonic()).
+
+        Returns:
+            The committed class label, or None.
+        """
+        t = time.monotonic() if t is None else t
+        if proba is None:
+            if self._missing_since is None:
+                self._missing_since = t
+            if t - self._missing_since >= self.release_s and (self.latched is not None or self._onset is not None):
+                self._release(t, lost_hand=True)
+            return None
+        self._missing_since = None
+        if self._onset is None:
+            self._onset = t
+
+        post = (1.0 - self.switch_prob) * self.posterior + self.switch_prob * self.prior
+        post *= (np.asarray(proba, dtype=np.float64) + 1e-6) ** self.sharpness
+        post /= post.sum()
+        self.posterior = post
+
+        if self.latched is not None:
+            if post[self.latched] < self.release_threshold:
+                self._release(t, lost_hand=False)
+            elif self.repeat_after is not None and t - self._latched_at >= self.repeat_after:
+                return self._commit(self.latched, t)
+            else:
+                return None
+
+        k = int(post.argmax())
+        if post[k] >= self.threshold and self._committable[k]:
+            return self._commit(k, t)
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        """Commit count and onset-to-commit latency percentiles (ms) so far."""
+        lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {"commits": len(self.commits), "latency_p50_ms": float(np.percentile(lat, 50)),
+                "latency_p95_ms": float(np.percentile(lat, 95))}
+
+
+# ------------------------------------------------------------------------------------
+# Offline evaluation
+# ------------------------------------------------------------------------------------
+def evaluate(decoder, frames: Iterable[Tuple[float, Optional[np.ndarray]]],
+             segments: Sequence[Tuple[object, float, float]], grace_s: float = 0.3) -> Dict[str, float]:
+    """
+    Score a decoder against ground truth.
+
+    Args:
+        decoder: Anything with update(proba, t) -> label or None.
+        frames: (t, proba or None) per frame.
+        segments: (label, start, end) for every sign actually made, in time order.
+        grace_s: A commit this long after a segment ends still belongs to it.
+
+    Returns:
+        dict: signs, commits, correct, false_commits, missed, false_commit_rate (of all commits),
+              and latency p50/p95 (ms) from sign onset to its correct commit.
+    """
+    commits = [(t, label) for t, p in frames for label in [decoder.update(p, t)] if label is not None]
+    starts = np.array([s for _, s, _ in segments])
+    used = set()
+    latencies, false = [], 0
+    for t, label in commits:
+        i = int(np.searchsorted(starts, t, side="right")) - 1
+        seg = segments[i] if i >= 0 else None
+        if seg is not None and t <= seg[2] + grace_s and seg[0] == label and i not in used:
+            used.add(i)
+            latencies.append(t - seg[1])
+        else:
+            false += 1
+    lat = np.array(latencies) * 1000 if latencies else np.full(1, np.nan)
+    return {"signs": len(segments), "commits": len(commits), "correct": len(used), "false_commits": false,
+            "missed": len(segments) - len(used), "false_commit_rate": false / max(1, len(commits)),
+            "latency_p50_ms": float(np.percentile(lat, 50)), "latency_p95_ms": float(np.percentile(lat, 95))}
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    classes = [chr(c) for c in range(ord("A"), ord("Z") + 1)] + ["Space", "nothing"]
+    K, fps = len(classes), 30.0
+    text = "hello world look at the little balloon keep calm and sign all day " * 4
+
+    def simulate(text):
+        """Noisy per-frame probabilities for fingerspelling `text`, with transitions and hand drops."""
+        frames, segments, t = [], [], 0.0
+        for ch in text:
+            k = K - 2 if ch == " " else ord(ch) - ord("a")
+            # Transition: hand moves (noisy, often confidently wrong) or briefly leaves
+            for _ in range(int(rng.uniform(0.1, 0.35) * fps)):
+                p = rng.dirichlet(np.full(K, 0.3))
+                frames.append((t, None if rng.random() < 0.3 else p))
+                t += 1 / fps
+            start = t
+            for _ in range(int(rng.uniform(0.5, 1.0) * fps)):
+                p = rng.dirichlet(np.full(K, 0.5))
+                top = k if rng.random() > 0.25 else rng.integers(K)  # 25% confusions
+                p = 0.4 * p + 0.6 * np.eye(K)[top] * rng.uniform(0.3, 1.0)
+                frames.append((t, p / p.sum()))
+                t += 1 / fps
+            segments.append((classes[k], start, t))
+        return frames, segments
+
+    class FirstFrameCommit:
+        """The old main.py rule: commit the first confident frame's label 0.1 s later."""
+
+        def __init__(self):
+            self.first, self.start = None, None
+
+        def update(self, p, t):
+            if p is None or p.max() <= 0.3:
+                return None
+            if self.start is None:
+                self.start, self.first = t, classes[int(p.argmax())]
+            elif t - self.start >= 0.1:
+                self.start = None
+                return self.first
+            return None
+
+    frames, segments = simulate(text)
+    bigram = bigram_from_text(text * 10, classes)
+    print(f"{len(segments)} signs, {len(frames)} frames at {fps:.0f} fps")
+    print(f"{'decoder':28s} {'correct':>7s} {'false':>6s} {'missed':>6s} {'FCR':>6s} {'p50 ms':>7s} {'p95 ms':>7s}")
+    rows = [("first-frame (old)", FirstFrameCommit())]
+    rows += [(f"bayes thr={thr}", CommitDecoder(classes, threshold=thr)) for thr in (0.8, 0.9, 0.97)]
+    rows += [("bayes thr=0.9 + bigram", CommitDecoder(classes, threshold=0.9, bigram=bigram))]
+    for name, dec in rows:
+        r = evaluate(dec, frames, segments)
+        print(f"{name:28s} {r['correct']:7d} {r['false_commits']:6d} {r['missed']:6d} "
+              f"{r['false_commit_rate']:6.1%} {r['latency_p50_ms']:7.0f} {r['latency_p95_ms']:7.0f}")
@@ -0,0 +1,261 @@
+"""
+Consolidated landmark dataset store.
+
+One directory holds the whole dataset as flat column files:
+
+    meta.json        count, feature width, class list, next session id
+    features.f32     (count, n_features) float32, row-major
+    labels.i32       (count,) class index into meta["classes"]
+    sessions.i32     (count,) collection session id
+    timestamps.f64   (count,) capture time (unix seconds)
+
+Reads are zero-copy `np.memmap` views, so opening even a million-sample
+store costs a JSON parse, and `iter_chunks()` streams it without loading
+everything into RAM. Appends write the column files first and then
+atomically bump `count` in meta.json, so a crash mid-append never exposes
+a torn row. `append(..., flush=False)` defers the fsyncs and the meta.json
+rewrite to `flush()`/`close()`, so per-frame appends stay off the disk's
+critical path; unflushed rows are dropped by the next open after a crash.
+Single writer at a time.
+
+    python dataset_store.py import --npy data --csv data/samples.csv
+    python dataset_store.py info
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STORE_DIR = os.path.join("data", "store")
+N_FEATURES = 63
+_FILES = ("features.f32", "labels.i32", "sessions.i32", "timestamps.f64")
+_COLUMNS = {
+    "labels": ("labels.i32", np.int32),
+    "sessions": ("sessions.i32", np.int32),
+    "timestamps": ("timestamps.f64", np.float64),
+}
+
+
+class LandmarkStore:
+    def __init__(self, root: str = STORE_DIR, n_features: int = N_FEATURES):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._meta_path = os.path.join(root, "meta.json")
+        self._files = {}    # column files kept open for appending
+        self._pending = 0   # rows written but not yet flushed (not counted in meta.json)
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {"version": 1, "n_features": n_features, "count": 0, "classes": [], "next_session": 0}
+            self._write_meta()
+
+    # -- metadata -------------------------------------------------------------------------
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def n_features(self) -> int:
+        return self.meta["n_features"]
+
+    @property
+    def classes(self) -> List[str]:
+        return self.meta["classes"]
+
+    def __len__(self):
+        return self.count
+
+    def _write_meta(self):
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=4)
+        os.replace(tmp, self._meta_path)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def new_session(self) -> int:
+        session = self.meta["next_session"]
+        self.meta["next_session"] = session + 1
+        self._write_meta()
+        return session
+
+    def class_index(self, label: str) -> int:
+        if label not in self.classes:
+            self.classes.append(label)
+        return self.classes.index(label)
+
+    # -- writing --------------------------------------------------------------------------
+    def append(self, features, labels: Sequence[str], session: int = 0, timestamps=None, flush: bool = True):
+        """
+        Append rows; `features` is (k, n_features) (or (k, 21, 3)), `labels` has k entries.
+
+        With flush=False the rows are only written to the (still open) column files, and
+        become visible and durable at the next `flush()` / `close()`; use that for
+        per-frame appends so the capture loop never waits on fsync.
+        """
+        features = np.ascontiguousarray(features, dtype=np.float32).reshape(-1, self.n_features)
+        k = len(features)
+        if k == 0:
+            return
+        if len(labels) != k:
+            raise ValueError(f"{k} feature rows but {len(labels)} labels")
+        codes = np.array([self.class_index(str(l)) for l in labels], dtype=np.int32)
+        sessions = np.full(k, session, dtype=np.int32)
+        if timestamps is None:
+            timestamps = np.full(k, time.time(), dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(k)
+
+        if not self._files:
+            self._truncate_to_count()
+            self._files = {name: open(self._path(name), "ab") for name in _FILES}
+        try:
+            for name, arr in zip(_FILES, (features, codes, sessions, timestamps)):
+                self._files[name].write(arr.tobytes())
+        except BaseException:
+            # Don't let a later flush publish a partly written batch
+            for f in self._files.values():
+                f.close()
+            self._files, self._pending = {}, 0
+            self._truncate_to_count()
+            raise
+        self._pending += k
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Sync the appended rows to disk, then publish them by bumping `count` in meta.json."""
+        if not self._pending:
+            return
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        self.meta["count"] += self._pending
+        self._pending = 0
+        self._write_meta()
+
+    def close(self):
+        """Flush and close the column files (appending again reopens them)."""
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _truncate_to_count(self):
+        # Drop bytes left behind by an append that crashed before meta.json was updated
+        sizes = {"features.f32": self.count * self.n_features * 4, "labels.i32": self.count * 4,
+                 "sessions.i32": self.count * 4, "timestamps.f64": self.count * 8}
+        for name, size in sizes.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    # -- reading --------------------------------------------------------------------------
+    def _memmap(self, name: str, dtype, shape):
+        if self.count == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r", shape=shape)
+
+    def features(self) -> np.ndarray:
+        """(count, n_features) float32 memory-mapped view."""
+        return self._memmap("features.f32", np.float32, (self.count, self.n_features))
+
+    def column(self, name: str) -> np.ndarray:
+        fname, dtype = _COLUMNS[name]
+        return self._memmap(fname, dtype, (self.count,))
+
+    def labels(self) -> np.ndarray:
+        """Class names per row (materialized; use column('labels') for the int codes)."""
+        return np.array(self.classes)[self.column("labels")] if self.count else np.array([], dtype=str)
+
+    def load(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(X, y) with X as a memmap view and y as class names."""
+        return self.features(), self.labels()
+
+    def iter_chunks(self, chunk_size: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (features, label codes) slices of at most `chunk_size` rows (zero-copy views)."""
+        X = self.features()
+        codes = self.column("labels")
+        for start in range(0, self.count, chunk_size):
+            yield X[start:start + chunk_size], codes[start:start + chunk_size]
+
+
+# ------------------------------------------------------------------------------------
+# Importers for the legacy formats
+# ------------------------------------------------------------------------------------
+def import_npy_folders(store: LandmarkStore, data_dir: str = "data") -> int:
+    """Import data/<gesture>/*.npy as written by the old data_collection.py."""
+    total = 0
+    session = store.new_session()
+    for gesture in sorted(os.listdir(data_dir)):
+        gesture_path = os.path.join(data_dir, gesture)
+        if not os.path.isdir(gesture_path) or os.path.abspath(gesture_path) == os.path.abspath(store.root):
+            continue
+        files = sorted(f for f in os.listdir(gesture_path) if f.endswith(".npy"))
+        if not files:
+            continue
+        rows = np.stack([np.load(os.path.join(gesture_path, f)).astype(np.float32).ravel() for f in files])
+        mtimes = [os.path.getmtime(os.path.join(gesture_path, f)) for f in files]
+        store.append(rows, [gesture] * len(rows), session=session, timestamps=mtimes)
+        print(f"[IMPORT] {len(rows)} samples for '{gesture}'")
+        total += len(rows)
+    return total
+
+
+def import_samples_csv(store: LandmarkStore, csv_path: str = "data/samples.csv") -> int:
+    """Import the label + 63 feature CSV written by the old record_samples.py."""
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = [r for r in reader if r]
+    if not rows:
+        return 0
+    labels = [r[0] for r in rows]
+    feats = np.array([r[1:] for r in rows], dtype=np.float32)
+    store.append(feats, labels, session=store.new_session(), timestamps=np.full(len(rows), os.path.getmtime(csv_path)))
+    print(f"[IMPORT] {len(rows)} samples from {csv_path}")
+    return len(rows)
+
+
+def open_store(root: str = STORE_DIR) -> Optional[LandmarkStore]:
+    """The store at `root` if one exists, else None."""
+    return LandmarkStore(root) if os.path.exists(os.path.join(root, "meta.json")) else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Landmark dataset store")
+    parser.add_argument("command", choices=["import", "info"])
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--npy", help="legacy data/<gesture>/*.npy directory to import")
+    parser.add_argument("--csv", help="legacy samples.csv to import")
+    args = parser.parse_args()
+
+    store = LandmarkStore(args.store)
+    if args.command == "import":
+        if args.npy:
+            import_npy_folders(store, args.npy)
+        if args.csv:
+            import_samples_csv(store, args.csv)
+
+    t0 = time.perf_counter()
+    store = LandmarkStore(args.store)
+    X, y = store.features(), store.column("labels")
+    t_open = (time.perf_counter() - t0) * 1000
+    counts = np.bincount(y, minlength=len(store.classes)) if len(y) else []
+    print(f"{store.count} samples, {len(store.classes)} classes, opened in {t_open:.2f} ms")
+    for name, n in zip(store.classes, counts):
+        print(f"  {name}: {n}")
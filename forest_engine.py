@@ -0,0 +1,283 @@
+from __future__ import annotations
+import sys
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def _preorder(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Node ids in depth-first preorder (left subtree first)."""
+    split = np.flatnonzero(left != -1)
+    if np.array_equal(left[split], split + 1):
+        return np.arange(left.size)  # sklearn's depth-first builder already lays trees out this way
+    order, stack = [], [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if left[node] != -1:
+            stack.extend((right[node], left[node]))
+    return np.asarray(order)
+
+
+def _node_depths(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    depth = np.zeros(left.size, dtype=np.int32)
+    frontier, d = np.array([0]), 0
+    while frontier.size:
+        depth[frontier] = d
+        frontier = frontier[left[frontier] != -1]
+        frontier = np.concatenate([left[frontier], right[frontier]])
+        d += 1
+    return depth
+
+
+def floor_float(values: np.ndarray, dtype) -> np.ndarray:
+    """
+    Round float64 thresholds down to `dtype`.
+
+    For float32 this is exact: sklearn sends a float32 sample left when x <= t,
+    and for float32 x that holds exactly when x <= (largest float32 <= t).
+    """
+    out = values.astype(dtype)
+    over = out > values
+    out[over] = np.nextafter(out[over], dtype(-np.inf))
+    return out
+
+
+def index_dtype(n: int):
+    """Smallest unsigned dtype that can index `n` items (int32 beyond uint16)."""
+    return np.uint8 if n <= 1 << 8 else np.uint16 if n <= 1 << 16 else np.int32
+
+
+class CompiledForest:
+    """
+    A trained sklearn tree ensemble flattened into NumPy node arrays.
+
+    All trees are evaluated together: every step advances one node per
+    (row, tree) pair with a handful of vectorized gathers, so a single frame
+    costs one pass over the forest instead of sklearn's per-call validation
+    and per-tree dispatch. `predict_proba` matches sklearn's output for the
+    same model (see `verify_against_sklearn`) unless the tables were pruned or
+    quantized at compile time.
+
+    Nodes are stored in preorder, so a split's left child is always the next
+    node and only the distance to the right child is kept. Leaves have a -inf
+    threshold and a skip of -1, so rows that reach a leaf early stay there.
+    """
+
+    def __init__(self, feature, threshold, skip, leaf_slot, leaf_values, roots, classes, n_features, max_depth,
+                 leaf_scale: float = 1.0):
+        self.feature = feature          # (n_nodes,) uint8/uint16 feature index, 0 for leaves
+        self.threshold = threshold      # (n_nodes,) float32 (or float16), -inf for leaves
+        self.skip = skip                # (n_nodes,) int16/int32 right child - left child, -1 for leaves
+        self.leaf_slot = leaf_slot      # (n_nodes,) row into leaf_values (0 for split nodes)
+        self.leaf_values = leaf_values  # (n_rows, n_classes) class distribution, float64 or quantized ints
+        self.roots = roots              # (n_trees,) int32
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        self.leaf_scale = leaf_scale    # leaf_values / leaf_scale is the distribution
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.size)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.skip, self.leaf_slot,
+                                      self.leaf_values, self.roots))
+
+    @classmethod
+    def from_sklearn(cls, model, max_depth: Optional[int] = None, n_trees: Optional[int] = None,
+                     leaf_bits: Optional[int] = None, half_thresholds: bool = False,
+                     dedupe: bool = False) -> "CompiledForest":
+        """
+        Compile a fitted RandomForest/ExtraTrees/DecisionTree classifier.
+
+        The defaults reproduce sklearn exactly. The options trade accuracy for size:
+
+        Args:
+            max_depth: Prune every tree to this depth; cut nodes become leaves with their
+                       training class distribution.
+            n_trees: Keep only the first `n_trees` trees.
+            leaf_bits: Quantize leaf distributions to 8 or 16 bit integers.
+            half_thresholds: Store thresholds as float16 (rounded down) instead of float32.
+            dedupe: Share identical leaf distributions (fully grown forests have mostly
+                    one-hot leaves, so this shrinks the leaf table by orders of magnitude).
+        """
+        trees = [est.tree_ for est in model.estimators_] if hasattr(model, "estimators_") else [model.tree_]
+        if trees[0].n_outputs != 1:
+            raise ValueError("Only single-output classifiers can be compiled")
+        if leaf_bits not in (None, 8, 16):
+            raise ValueError("leaf_bits must be 8 or 16")
+        trees = trees[:n_trees]
+        thr_dtype = np.float16 if half_thresholds else np.float32
+
+        features, thresholds, skips, leaf_values, roots = [], [], [], [], []
+        offset = 0
+        depth_max = 0
+        for tree in trees:
+            left, right = tree.children_left, tree.children_right
+            order = _preorder(left, right)
+            is_leaf = left == -1
+            if max_depth is not None:
+                depth = _node_depths(left, right)
+                order = order[depth[order] <= max_depth]
+                is_leaf = is_leaf | (depth == max_depth)
+                depth_max = max(depth_max, int(depth[order].max()))
+            else:
+                depth_max = max(depth_max, tree.max_depth)
+
+            m = order.size
+            leaf = is_leaf[order]
+            new_id = np.empty(left.size, dtype=np.int64)
+            new_id[order] = np.arange(m)
+
+            features.append(np.where(leaf, 0, tree.feature[order]))
+            thr = np.full(m, -np.inf, dtype=thr_dtype)
+            thr[~leaf] = floor_float(tree.threshold[order[~leaf]], thr_dtype)
+            thresholds.append(thr)
+            skips.append(np.where(leaf, -1, new_id[np.where(leaf, 0, right[order])] - np.arange(1, m + 1)))
+            values = tree.value[order[leaf], 0, :].astype(np.float64)
+            norm = values.sum(axis=1, keepdims=True)
+            norm[norm == 0] = 1.0
+            leaf_values.append(values / norm)
+            roots.append(offset)
+            offset += m
+
+        is_leaf = np.concatenate([np.isinf(t) for t in thresholds])
+        values = np.concatenate(leaf_values)
+        leaf_scale = 1.0
+        if leaf_bits is not None:
+            leaf_scale = float((1 << leaf_bits) - 1)
+            values = np.rint(values * leaf_scale).astype(np.uint8 if leaf_bits == 8 else np.uint16)
+        if dedupe:
+            values, rows = np.unique(values, axis=0, return_inverse=True)
+            rows = rows.ravel()
+        else:
+            rows = np.arange(len(values))
+        slot = np.zeros(offset, dtype=index_dtype(len(values)))
+        slot[is_leaf] = rows
+
+        n_features = int(model.n_features_in_)
+        skip = np.concatenate(skips)
+        return cls(
+            feature=np.concatenate(features).astype(index_dtype(n_features)),
+            threshold=np.concatenate(thresholds),
+            skip=skip.astype(np.int16 if skip.max() < (1 << 15) - 1 else np.int32),  # skip + 1 fits too
+            leaf_slot=slot,
+            leaf_values=values,
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            n_features=n_features,
+            max_depth=int(depth_max),
+            leaf_scale=leaf_scale,
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf node reached in every tree, shape (n_rows, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        n = X.shape[0]
+        flat_x = X.ravel()
+        row_offset = (np.arange(n, dtype=np.int64) * self.n_features_in_)[:, None]
+
+        idx = np.broadcast_to(self.roots, (n, self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            go_right = flat_x[row_offset + self.feature[idx]] > self.threshold[idx]
+            idx += go_right * self.skip[idx]  # accumulate in idx's int32/int64, never in skip's int16
+            idx += 1
+        return idx
+
+    def predict_proba(self, X) -> np.ndarray:
+        leaves = self.leaf_slot[self.apply(X)]
+        return self.leaf_values[leaves].sum(axis=1) / (leaves.shape[1] * self.leaf_scale)
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_with_proba(X)[0]
+
+    def predict_with_proba(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        """Labels and class probabilities from a single pass over the forest."""
+        proba = self.predict_proba(X)
+        return self.classes_.take(proba.argmax(axis=1)), proba
+
+    def predict_one(self, x):
+        """Classify one sample; returns (label, probability vector)."""
+        labels, proba = self.predict_with_proba(x)
+        return labels[0], proba[0]
+
+
+class SklearnEngine:
+    """Fallback for non-tree models: one predict_proba call per frame instead of two."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = int(model.n_features_in_)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        return self.model.predict_proba(X)
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_with_proba(X)[0]
+
+    def predict_with_proba(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        proba = self.predict_proba(X)
+        return self.classes_.take(proba.argmax(axis=1)), proba
+
+    def predict_one(self, x):
+        labels, proba = self.predict_with_proba(x)
+        return labels[0], proba[0]
+
+
+def compile_model(model):
+    """Return the fastest available inference engine for a fitted classifier."""
+    if isinstance(model, CompiledForest):
+        return model  # already compiled (a .wtm artifact, see model_artifact)
+    if hasattr(model, "tree_") or (hasattr(model, "estimators_") and hasattr(model.estimators_[0], "tree_")):
+        return CompiledForest.from_sklearn(model)
+    return SklearnEngine(model)
+
+
+def verify_against_sklearn(model, X) -> bool:
+    """Check that the compiled engine reproduces sklearn's labels and probabilities."""
+    engine = compile_model(model)
+    labels, proba = engine.predict_with_proba(X)
+    ref_proba = model.predict_proba(X)
+    ref_labels = model.predict(X)
+    return bool(np.array_equal(labels, ref_labels) and np.allclose(proba, ref_proba, rtol=0, atol=1e-12))
+
+
+if __name__ == "__main__":
+    # python forest_engine.py [model.pkl]  -- correctness check and per-frame timing
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    if len(sys.argv) > 1:
+        model = joblib.load(sys.argv[1])
+        rng = np.random.default_rng(0)
+        X = rng.random((2000, model.n_features_in_), dtype=np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        X = rng.random((3000, 63), dtype=np.float32)
+        y = np.array(list("ABCDEFGHIJ"))[(X[:, :10].argmax(axis=1) + (X[:, 10] > 0.5)) % 10]
+        model = RandomForestClassifier(n_estimators=200, random_state=42).fit(X, y)
+
+    engine = compile_model(model)
+    print(f"Engine: {type(engine).__name__}, identical to sklearn: {verify_against_sklearn(model, X)}")
+
+    row = X[:1]
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        model.predict(row)
+        model.predict_proba(row)
+    sk_ms = (time.perf_counter() - t0) * 1000 / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        engine.predict_one(row)
+    eng_ms = (time.perf_counter() - t0) * 1000 / n
+    t0 = time.perf_counter()
+    engine.predict_with_proba(X)
+    batch_rate = len(X) / (time.perf_counter() - t0)
+    print(f"Per frame: sklearn {sk_ms:.3f} ms, compiled {eng_ms:.3f} ms; batch {batch_rate:,.0f} rows/s")
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import os
+import time
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """
+    Base class for anything that yields BGR frames.
+
+    Mirrors the `cv2.VideoCapture` interface (`read()` / `release()`) so the
+    capture loops don't care whether frames come from a webcam, a file or a
+    generator. With `realtime=True` file-backed sources are paced to their
+    nominal fps; otherwise they run as fast as they can be decoded.
+    """
+
+    live = False
+
+    def __init__(self, fps: float = 30.0, realtime: bool = False):
+        self.fps = fps
+        self.realtime = realtime
+        self.frames_read = 0
+        self._next_due = None
+
+    def _read_raw(self):
+        raise NotImplementedError
+
+    def read(self):
+        ok, frame = self._read_raw()
+        if ok:
+            self.frames_read += 1
+            if self.realtime and not self.live and self.fps:
+                self._pace()
+        return ok, frame
+
+    def _pace(self):
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_due = max(self._next_due, now) + 1.0 / self.fps
+
+    def isOpened(self) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            ok, frame = self.read()
+            if not ok:
+                return
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    """Live webcam via cv2.VideoCapture."""
+
+    live = True
+
+    def __init__(self, index: int = 0, width: Optional[int] = 1280, height: Optional[int] = 720):
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime=True)
+
+    def _read_raw(self):
+        return self.cap.read()
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frames decoded from a video file, optionally looping."""
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime=realtime)
+
+    def _read_raw(self):
+        ok, frame = self.cap.read()
+        if not ok and self.loop and self.frames_read:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Every image in a directory, in sorted filename order."""
+
+    def __init__(self, path: str, fps: float = 30.0, realtime: bool = False, loop: bool = False):
+        self.files = sorted(
+            os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTS)
+        )
+        if not self.files:
+            raise IOError(f"No images found in {path}")
+        self.loop = loop
+        self._pos = 0
+        super().__init__(fps=fps, realtime=realtime)
+
+    def _read_raw(self):
+        if self._pos >= len(self.files):
+            if not self.loop:
+                return False, None
+            self._pos = 0
+        frame = cv2.imread(self.files[self._pos])
+        self._pos += 1
+        return frame is not None, frame
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames for smoke tests and raw pipeline overhead measurements.
+
+    Frames are a scrolling gradient with a moving blob; no real hand is
+    present, so MediaPipe exercises its detection path on every frame.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, n_frames: Optional[int] = 300,
+                 fps: float = 30.0, realtime: bool = False):
+        self.width = width
+        self.height = height
+        self.n_frames = n_frames
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._base = np.dstack([np.tile(gradient, (height, 1))] * 3)
+        super().__init__(fps=fps, realtime=realtime)
+
+    def _read_raw(self):
+        if self.n_frames is not None and self.frames_read >= self.n_frames:
+            return False, None
+        i = self.frames_read
+        frame = np.roll(self._base, (i * 4) % self.width, axis=1)
+        center = (int(self.width * (0.5 + 0.3 * np.sin(i / 15))), self.height // 2)
+        cv2.circle(frame, center, self.height // 8, (40, 120, 220), -1)
+        return True, frame
+
+
+def open_source(spec: Union[int, str, None] = 0, realtime: bool = False, **kwargs) -> FrameSource:
+    """
+    Build a FrameSource from a short spec.
+
+    Accepts a camera index (`0`, `"1"`, `"camera:1"`), `"synthetic"`, an
+    image directory or a video file path.
+    """
+    if spec is None:
+        spec = 0
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), **kwargs)
+    if spec.startswith("camera:"):
+        return CameraSource(int(spec.split(":", 1)[1]), **kwargs)
+    if spec == "synthetic":
+        return SyntheticSource(realtime=realtime, **kwargs)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, **kwargs)
+    return VideoFileSource(spec, realtime=realtime, **kwargs)
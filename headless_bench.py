@@ -0,0 +1,95 @@
+"""
+Headless recognition benchmark.
+
+Runs frames from any FrameSource through the same SignRecognizer hot path
+(flip -> MediaPipe -> classifier) as the live app, without a camera or a
+GUI, and reports throughput and per-frame latency percentiles. Latency covers
+flip + inference only; frame read/decode time is reported separately.
+
+    python headless_bench.py --source synthetic
+    python headless_bench.py --source recordings/session1.mp4 --json bench.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from frame_source import open_source
+from recognizer import MODEL_PATH, SignRecognizer
+
+
+def percentiles(samples_ms) -> dict:
+    if not samples_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(samples_ms), [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def run(source, recognizer, max_frames=None) -> dict:
+    latencies = []
+    read_ms = []
+    hands_found = 0
+    predictions = []
+
+    frames = iter(source)
+    t_start = time.perf_counter()
+    while max_frames is None or len(latencies) < max_frames:
+        t_read = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        # Decode and --realtime pacing are reported separately from the recognizer latency
+        t0 = time.perf_counter()
+        read_ms.append((t0 - t_read) * 1000.0)
+        if recognizer.flip:
+            frame = cv2.flip(frame, 1)
+        pred = recognizer.infer(frame)
+        if pred.hand:
+            hands_found += 1
+            predictions.append(str(pred.label))
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "frames": len(latencies),
+        "hands": hands_found,
+        "seconds": elapsed,
+        "fps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": percentiles(latencies),
+        "read_ms": percentiles(read_ms),
+        "predictions": predictions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless WaveToMe pipeline benchmark")
+    parser.add_argument("--source", default="synthetic",
+                        help="camera index, 'synthetic', image directory or video file")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--realtime", action="store_true", help="pace file sources to their native fps")
+    parser.add_argument("--no-flip", action="store_true")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    recognizer = SignRecognizer(args.model, flip=not args.no_flip).load()
+    with open_source(args.source, realtime=args.realtime) as source:
+        report = run(source, recognizer, max_frames=args.max_frames)
+
+    lat, read = report["latency_ms"], report["read_ms"]
+    print(f"{report['frames']} frames ({report['hands']} with a hand) in {report['seconds']:.2f}s "
+          f"-> {report['fps']:.1f} fps")
+    print(f"Latency ms: p50 {lat['p50']:.2f}  p95 {lat['p95']:.2f}  p99 {lat['p99']:.2f}")
+    print(f"Read ms:    p50 {read['p50']:.2f}  p95 {read['p95']:.2f}  p99 {read['p99']:.2f}")
+
+    if args.json:
+        report["source"] = args.source
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Incremental sign classifier: teach a new sign, or add samples to a known
+one, in well under a second instead of refitting the forest.
+
+`PrototypeClassifier` is a k-nearest-prototype head on the engineered hand
+features (utils_landmarks.extract_features, 88 columns). It keeps at most
+`per_class` prototypes per class -- a uniform reservoir sample of every
+sample seen for that class -- plus running feature means and variances for
+standardization. An update only touches the new samples, so its cost does
+not grow with the dataset. It is a regular fitted classifier (classes_,
+n_features_in_, predict_proba), so it is saved with model_registry.save_model
+and runs through forest_engine's SklearnEngine like any other model; a
+running app's ModelWatcher hot-swaps it in when the file changes.
+
+The sidecar records how many dataset-store rows the model has seen, so
+`update` only reads rows appended since (e.g. by data_collection.py --teach).
+
+    python incremental_model.py init                  # build from the whole store
+    python incremental_model.py update                # add rows appended since the last update
+    python incremental_model.py bench                 # update time vs. dataset size, against a forest refit
+"""
+from __future__ import annotations
+import argparse
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from dataset_store import STORE_DIR, LandmarkStore, open_store
+from model_registry import read_info, save_model
+from utils_landmarks import FEATURE_DIM, model_input
+
+MODEL_PATH = "models/sign_incremental.pkl"
+PER_CLASS = 400
+N_NEIGHBORS = 10
+READ_CHUNK = 65536
+
+
+class PrototypeClassifier:
+    """
+    Args:
+        per_class (int): Prototypes kept per class (reservoir sample of its samples).
+        n_neighbors (int): Prototypes that vote on each prediction.
+        seed (int): Reservoir sampling seed.
+    """
+
+    def __init__(self, per_class: int = PER_CLASS, n_neighbors: int = N_NEIGHBORS, seed: int = 0):
+        self.per_class = per_class
+        self.n_neighbors = n_neighbors
+        self.classes_ = np.array([], dtype=str)
+        self.n_features_in_ = FEATURE_DIM
+        self._rng = np.random.default_rng(seed)
+        self._protos = {}       # label -> (k, d) float32
+        self._seen = {}         # label -> samples seen
+        self._n = 0
+        self._sum = np.zeros(FEATURE_DIM)
+        self._sumsq = np.zeros(FEATURE_DIM)
+        self._index()
+
+    # -- updates ------------------------------------------------------------------------------
+    def partial_fit(self, X, y) -> "PrototypeClassifier":
+        """Add (n, 88) feature rows with labels; new labels become new classes."""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        y = np.asarray(y).astype(str)
+        self._n += len(X)
+        self._sum += X.sum(axis=0, dtype=np.float64)
+        self._sumsq += np.square(X, dtype=np.float64).sum(axis=0)
+        for label in np.unique(y):
+            rows = X[y == label]
+            protos = self._protos.get(label, np.zeros((0, self.n_features_in_), np.float32))
+            seen = self._seen.get(label, 0)
+            room = max(0, self.per_class - len(protos))
+            protos = np.concatenate([protos, rows[:room]])
+            rest = rows[room:]
+            if len(rest):
+                # Reservoir sampling: the i-th sample of a class replaces a random slot with chance per_class / i
+                i = seen + room + 1 + np.arange(len(rest))
+                slots = (self._rng.random(len(rest)) * i).astype(np.int64)
+                keep = slots < self.per_class
+                protos[slots[keep]] = rest[keep]  # later samples win a contested slot, as sequentially
+            self._protos[label] = protos
+            self._seen[label] = seen + len(rows)
+        self._index()
+        return self
+
+    def fit(self, X, y) -> "PrototypeClassifier":
+        self.__init__(self.per_class, self.n_neighbors)
+        return self.partial_fit(X, y)
+
+    def _index(self):
+        """Rebuild the standardized prototype matrix used by predict_proba."""
+        self.classes_ = np.array(sorted(self._protos), dtype=str)
+        if self._n:
+            mean = self._sum / self._n
+            std = np.sqrt(np.maximum(self._sumsq / self._n - mean ** 2, 1e-8))
+        else:
+            mean, std = np.zeros(self.n_features_in_), np.ones(self.n_features_in_)
+        self._mean = mean.astype(np.float32)
+        self._scale = (1.0 / std).astype(np.float32)
+        protos = [self._protos[c] for c in self.classes_]
+        P = np.concatenate(protos) if protos else np.zeros((0, self.n_features_in_), np.float32)
+        self._P = (P - self._mean) * self._scale
+        self._P_sq = np.einsum("ij,ij->i", self._P, self._P)
+        self._owner = np.repeat(np.arange(len(protos)), [len(p) for p in protos])
+
+    # -- inference -----------------------------------------------------------------------------
+    def predict_proba(self, X) -> np.ndarray:
+        """Distance-weighted vote of the nearest prototypes; (n, n_classes)."""
+        X = (np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_) - self._mean) * self._scale
+        d2 = self._P_sq - 2.0 * (X @ self._P.T)  # + |x|^2, constant per row
+        d2 += np.einsum("ij,ij->i", X, X)[:, None]
+        k = min(self.n_neighbors, d2.shape[1])
+        near = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        dist = np.sqrt(np.maximum(np.take_along_axis(d2, near, axis=1), 0.0))
+        votes = 1.0 / (dist + 1e-3)
+        n_classes = len(self.classes_)
+        cells = (np.arange(len(X))[:, None] * n_classes + self._owner[near]).ravel()
+        proba = np.bincount(cells, votes.ravel(), minlength=len(X) * n_classes).reshape(len(X), n_classes)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    @property
+    def n_prototypes(self) -> int:
+        return len(self._P)
+
+    def __repr__(self):
+        return (f"PrototypeClassifier({len(self.classes_)} classes, {self.n_prototypes} prototypes, "
+                f"{self._n} samples seen)")
+
+
+# ------------------------------------------------------------------------------------
+# Store-backed training
+# ------------------------------------------------------------------------------------
+def _learn_rows(model: PrototypeClassifier, store: LandmarkStore, start: int) -> int:
+    """partial_fit store rows [start, count) in chunks; returns the number of rows read."""
+    X, codes = store.features(), store.column("labels")
+    classes = np.array(store.classes)
+    for i in range(start, store.count, READ_CHUNK):
+        chunk = slice(i, min(i + READ_CHUNK, store.count))
+        model.partial_fit(model_input(np.asarray(X[chunk]), FEATURE_DIM), classes[codes[chunk]])
+    return store.count - start
+
+
+def init_model(store: LandmarkStore, path: str = MODEL_PATH, per_class: int = PER_CLASS) -> PrototypeClassifier:
+    """Build the model from every row in the store and save it."""
+    t0 = time.perf_counter()
+    model = PrototypeClassifier(per_class)
+    n = _learn_rows(model, store, 0)
+    info = save_model(model, path, store_rows=store.count, store=store.root, n_samples=n)
+    print(f"Built {model} from {n} rows in {time.perf_counter() - t0:.2f}s -> {info}")
+    return model
+
+
+def update_model(store: LandmarkStore, path: str = MODEL_PATH) -> Optional[PrototypeClassifier]:
+    """Add the store rows appended since the model's last update and save it (the app picks it up live)."""
+    if not os.path.exists(path):
+        return init_model(store, path)
+    import joblib
+    t0 = time.perf_counter()
+    seen = int(read_info(path).meta.get("store_rows", 0))
+    if seen >= store.count:
+        print(f"{path} is up to date ({seen} rows)")
+        return None
+    model = joblib.load(path)
+    n = _learn_rows(model, store, seen)
+    info = save_model(model, path, store_rows=store.count, store=store.root, n_samples=model._n)
+    print(f"Added {n} rows in {(time.perf_counter() - t0) * 1000:.0f} ms: {model} -> {info}")
+    return model
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------------------------
+def bench(sizes=(2_000, 8_000, 32_000, 128_000), new_samples: int = 300, forest_limit: int = 32_000):
+    """Time to teach one new sign vs. dataset size: prototype update vs. refitting the forest."""
+    import tempfile
+    from sklearn.ensemble import RandomForestClassifier
+    from forest_engine import compile_model
+
+    rng = np.random.default_rng(0)
+    n_classes = 26
+    shapes = rng.random((n_classes + 1, 21, 3)).astype(np.float32) * [0.15, 0.25, 0.05] + [0.4, 0.35, -0.02]
+
+    def samples(label_ids):
+        lm = shapes[label_ids] + rng.normal(0, 0.03, (len(label_ids), 21, 3)).astype(np.float32)
+        return model_input(lm, FEATURE_DIM), np.array([f"c{i}" for i in label_ids])
+
+    X_new, y_new = samples(np.full(new_samples, n_classes))
+    X_test, y_test = samples(rng.integers(n_classes + 1, size=3000))
+    print(f"Teaching a new sign ({new_samples} samples) to a model trained on N samples of {n_classes} signs")
+    print(f"{'N':>8s} {'update+save ms':>15s} {'ms/frame':>9s} {'acc':>6s} {'forest refit s':>15s} {'acc':>6s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "incremental.pkl")
+        for n in sizes:
+            X, y = samples(rng.integers(n_classes, size=n))
+            model = PrototypeClassifier().fit(X, y)
+            save_model(model, path)
+
+            t0 = time.perf_counter()
+            model.partial_fit(X_new, y_new)
+            save_model(model, path)
+            update_ms = (time.perf_counter() - t0) * 1000
+
+            engine = compile_model(model)
+            engine.predict_one(X_test[:1])
+            t0 = time.perf_counter()
+            for row in X_test[:200]:
+                engine.predict_one(row)
+            frame_ms = (time.perf_counter() - t0) / 200 * 1000
+            acc = (engine.predict(X_test) == y_test).mean()
+
+            forest = ""
+            if n <= forest_limit:
+                t0 = time.perf_counter()
+                rf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
+                rf.fit(np.concatenate([X, X_new]), np.concatenate([y, y_new]))
+                refit_s = time.perf_counter() - t0
+                forest = f"{refit_s:15.1f} {(rf.predict(X_test) == y_test).mean():6.1%}"
+            print(f"{n:8d} {update_ms:15.1f} {frame_ms:9.3f} {acc:6.1%} {forest}")
+
+
+if __name__ == "__main__":
+    # Run the commands from the importable module, so the pickled class is
+    # incremental_model.PrototypeClassifier (loadable by the app) and not __main__.PrototypeClassifier
+    import incremental_model
+
+    parser = argparse.ArgumentParser(description="Incremental (prototype) sign classifier")
+    parser.add_argument("command", choices=["init", "update", "bench"])
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--per-class", type=int, default=PER_CLASS, help="prototypes kept per class")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        incremental_model.bench()
+    else:
+        store = open_store(args.store)
+        if store is None:
+            raise SystemExit(f"No dataset store at {args.store} (collect with data_collection.py)")
+        if args.command == "init":
+            incremental_model.init_model(store, args.model, args.per_class)
+        else:
+            incremental_model.update_model(store, args.model)
@@ -0,0 +1,224 @@
+"""
+Per-stage timing for the hot path.
+
+Code marks its stages with
+
+    with PROFILER.stage("hands.process"):
+        ...
+
+While the profiler is disabled (the default) `stage()` returns a shared no-op
+context manager, so an instrumented frame costs a few hundred nanoseconds in
+total. When enabled, every stage records a monotonic (perf_counter_ns) span:
+the last `window` durations per stage feed rolling p50/p95/p99 figures (see
+`summary()` and the on-video `overlay()`), and all spans go into a bounded
+event log that exports to Chrome trace-event JSON (chrome://tracing, Perfetto)
+and CSV.
+
+Enable with WAVETOME_PROFILE=1, or at runtime with the overlay hotkey (F3 in
+the recognition windows; F4 exports the trace to logs/).
+
+    python instrumentation.py       # overhead check, disabled and enabled
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+WINDOW = 300
+MAX_EVENTS = 200_000
+TRACE_DIR = "logs"
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.t0, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """
+    Args:
+        enabled (bool): Record spans (otherwise stage() is a no-op).
+        window (int): Durations per stage kept for the rolling percentiles.
+        max_events (int): Spans kept for trace export (oldest dropped first).
+    """
+
+    def __init__(self, enabled: bool = False, window: int = WINDOW, max_events: int = MAX_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.overlay_visible = False
+        self._durations: Dict[str, deque] = {}
+        self._events = deque(maxlen=max_events)  # (name, start ns, duration ns, thread id)
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter_ns()
+
+    # -- recording ---------------------------------------------------------------------------
+    def stage(self, name: str):
+        """Context manager timing one stage (no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, t0_ns: int, t1_ns: int):
+        """Record a span measured elsewhere (perf_counter_ns timestamps)."""
+        dur = t1_ns - t0_ns
+        window = self._durations.get(name)
+        if window is None:
+            window = self._durations.setdefault(name, deque(maxlen=self.window))
+        window.append(dur)
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._events.append((name, t0_ns, dur, tid))
+
+    def toggle_overlay(self) -> bool:
+        """Hotkey handler: show/hide the overlay; showing it also starts recording."""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.enabled = True
+        return self.overlay_visible
+
+    def reset(self):
+        self._durations.clear()
+        self._events.clear()
+        self._origin = time.perf_counter_ns()
+
+    # -- reporting ---------------------------------------------------------------------------
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: count and p50/p95/p99/mean in ms over the rolling window."""
+        out = {}
+        for name, window in list(self._durations.items()):
+            ms = np.fromiter(window, dtype=np.float64, count=len(window)) / 1e6
+            if ms.size:
+                p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+                out[name] = {"n": int(ms.size), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+                             "mean": float(ms.mean())}
+        return out
+
+    def format_summary(self) -> str:
+        lines = [f"{'stage':18s} {'p50':>7s} {'p95':>7s} {'p99':>7s} ms"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:18s} {s['p50']:7.2f} {s['p95']:7.2f} {s['p99']:7.2f}")
+        return "\n".join(lines)
+
+    def overlay(self, frame_bgr):
+        """Draw the rolling percentiles onto a BGR frame in place (when the overlay is visible)."""
+        if not self.overlay_visible:
+            return frame_bgr
+        import cv2
+        lines = self.format_summary().splitlines()
+        h = 18 * len(lines) + 10
+        x1, y1 = min(frame_bgr.shape[1], 330), min(frame_bgr.shape[0], h)
+        roi = frame_bgr[:y1, :x1]
+        roi[:] = (roi * 0.35).astype(roi.dtype)
+        for i, line in enumerate(lines):
+            cv2.putText(frame_bgr, line, (8, 20 + 18 * i), cv2.FONT_HERSHEY_PLAIN, 1.0, (80, 255, 80), 1,
+                        cv2.LINE_AA)
+        return frame_bgr
+
+    # -- export ------------------------------------------------------------------------------
+    def _snapshot(self) -> List[tuple]:
+        return list(self._events)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write Chrome trace-event JSON (complete "X" events, µs); returns the event count."""
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in list(self._threads.items())]
+        spans = self._snapshot()
+        events += [{"name": name, "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+                    "ts": (t0 - self._origin) / 1000, "dur": dur / 1000}
+                   for name, t0, dur, tid in spans]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(spans)
+
+    def export_csv(self, path: str) -> int:
+        """Write one row per span: stage, thread, start_ms, duration_ms; returns the row count."""
+        spans = self._snapshot()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "thread", "start_ms", "duration_ms"])
+            for name, t0, dur, tid in spans:
+                writer.writerow([name, self._threads.get(tid, tid), f"{(t0 - self._origin) / 1e6:.3f}",
+                                 f"{dur / 1e6:.3f}"])
+        return len(spans)
+
+    def export(self, directory: str = TRACE_DIR, prefix: str = "trace") -> Optional[str]:
+        """Export both formats as <directory>/<prefix>-<time>.{json,csv}; returns the base path."""
+        if not self._events:
+            return None
+        base = os.path.join(directory, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}")
+        n = self.export_chrome_trace(base + ".json")
+        self.export_csv(base + ".csv")
+        print(f"Trace: {n} spans written to {base}.json / .csv")
+        return base
+
+
+PROFILER = Profiler(enabled=os.environ.get("WAVETOME_PROFILE") == "1")
+
+
+if __name__ == "__main__":
+    # Overhead check: an instrumented frame has ~10 stages; a 30 fps frame is 33 ms
+    stages_per_frame, frame_ms, n = 10, 1000 / 30, 200_000
+
+    def loop(profiler):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            with profiler.stage("stage"):
+                pass
+        return (time.perf_counter() - t0) / n * 1e9
+
+    def bare():
+        t0 = time.perf_counter()
+        for _ in range(n):
+            pass
+        return (time.perf_counter() - t0) / n * 1e9
+
+    base = min(bare() for _ in range(3))
+    off = min(loop(Profiler(enabled=False)) for _ in range(3)) - base
+    on = min(loop(Profiler(enabled=True)) for _ in range(3)) - base
+    for label, ns in (("disabled", off), ("enabled", on)):
+        share = ns * stages_per_frame / (frame_ms * 1e6)
+        print(f"{label:9s} {ns:7.0f} ns per stage, {share:.4%} of a {frame_ms:.0f} ms frame "
+              f"at {stages_per_frame} stages/frame")
+    assert off * stages_per_frame < 0.001 * frame_ms * 1e6, "disabled instrumentation costs over 0.1% of a frame"
+    print("OK: disabled overhead is below 0.1% of a frame")
+
+    profiler = Profiler(enabled=True)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        with profiler.stage("hands.process"):
+            time.sleep(rng.uniform(0.0005, 0.002))
+    print(profiler.format_summary())
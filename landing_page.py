@@ -1,23 +1,35 @@
 import os
-import sys
-import subprocess
+import time
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
 import customtkinter as ctk
 import json
 
+from session_log import VIDEO_SCALE
+from warm_start import WarmStart
+
 # ---------------------------------------------------------------------------------
 # Config
 # -----------------------------------------------------------------------------------
 SPLASH_W, SPLASH_H = 500, 380
 APP_W, APP_H = 900, 600
-SPLASH_DURATION_MS = 4000
+SPLASH_MIN_MS = 800
 ASSETS_DIR = "assets"
 LOGO_PATH = os.path.join(ASSETS_DIR, "logo.png")
 ICON_PATH = os.path.join(ASSETS_DIR, "icon.ico")
 SETTINGS_FILE = "settings.json"
 
+PHASE_LABELS = {
+    "imports": "Loading libraries...",
+    "model": "Loading sign model...",
+    "mediapipe": "Preparing hand tracking...",
+    "speech": "Preparing speech...",
+    "camera": "Opening camera...",
+    "ready": "Ready",
+    "error": "Some components failed to load",
+}
+
 # Language list
 LANGUAGES = {
     "English": "en",
@@ -115,16 +127,30 @@ def show_splash(parent):
     loading_bg = tk.Frame(bottom_section, bg="#2d2d2d", width=200, height=3)
     loading_bg.pack()
 
-    # Loading bar (animated)
+    # Loading bar (driven by the real warm-up progress)
     loading_bar = tk.Frame(loading_bg, bg="#0078d4", width=0, height=3)
     loading_bar.place(x=0, y=0)
 
-    def animate_loading(width=0):
-        if width <= 200:
-            loading_bar.config(width=width)
-            splash.after(20, animate_loading, width + 2)
+    phase_text = tk.Label(
+        bottom_section, text="Starting...",
+        font=("Segoe UI", 9),
+        fg="#8a8a8a", bg="#0f1419"
+    )
+    phase_text.pack(pady=(8, 0))
+
+    warm = WarmStart().start()
+    shown_at = time.monotonic()
 
-    animate_loading()
+    def poll_loading():
+        loading_bar.config(width=int(200 * warm.progress))
+        phase_text.config(text=PHASE_LABELS.get(warm.phase, "Starting..."))
+        elapsed = (time.monotonic() - shown_at) * 1000
+        if warm.ready.is_set() and elapsed >= SPLASH_MIN_MS:
+            close_splash_and_start(parent, splash, warm)
+        else:
+            splash.after(30, poll_loading)
+
+    poll_loading()
 
     # Version
     version_text = tk.Label(
@@ -141,14 +167,13 @@ def show_splash(parent):
     )
     copyright_text.pack()
 
-    parent.after(SPLASH_DURATION_MS, lambda: close_splash_and_start(parent, splash))
 
-def close_splash_and_start(root, splash):
+def close_splash_and_start(root, splash, warm):
     try:
         splash.destroy()
     except Exception:
         pass
-    start_landing_page(root)
+    start_landing_page(root, warm)
 
 
 # -------------------------------------------------------------------------------------------------------------------
@@ -159,10 +184,10 @@ def open_settings(root):
 
     win = ctk.CTkToplevel(root)
     win.title("Settings - WaveToMe")
-    win.geometry("480x380")
+    win.geometry("480x620")
     win.configure(fg_color="#1c1e24")
     win.resizable(False, False)
-    center_window(win, 480, 380)
+    center_window(win, 480, 620)
 
     frame = ctk.CTkFrame(win, fg_color="#2b2f38", corner_radius=15)
     frame.pack(pady=20, padx=20, fill="both", expand=True)
@@ -207,13 +232,57 @@ def open_settings(root):
 
     speed_slider.configure(command=update_speed)
 
+    # Speech rate (1.0 = the voice's normal pace)
+    rate_label = ctk.CTkLabel(frame, text="Speech Rate:", font=("Segoe UI", 14))
+    rate_label.pack(pady=(5))
+    rate_var = ctk.DoubleVar(value=settings.get("speech_rate", 1.0))
+    rate_slider = ctk.CTkSlider(frame,
+                                from_=0.5, to=2.0, number_of_steps=6,
+                                variable=rate_var,
+                                progress_color="#4a90e2", button_color="#4a90e2", width=220)
+    rate_slider.pack()
+    rate_value = ctk.CTkLabel(frame, text=f"{rate_var.get():.2f}x", font=("Segoe UI", 12))
+    rate_value.pack()
+
+    def update_rate(val):
+        rate_value.configure(text=f"{float(val):.2f}x")
+
+    rate_slider.configure(command=update_rate)
+
+    # Auto-speak
+    auto_speak_var = ctk.BooleanVar(value=settings.get("auto_speak", False))
+    auto_speak_switch = ctk.CTkSwitch(frame, text="Speak each word as it is signed",
+                                      variable=auto_speak_var, progress_color="#4a90e2")
+    auto_speak_switch.pack(pady=(10, 0))
+
+    # Execution mode (applies the next time recognition starts)
+    isolation_var = ctk.BooleanVar(value=settings.get("process_isolation", False))
+    isolation_switch = ctk.CTkSwitch(frame, text="Run capture and inference in separate processes",
+                                     variable=isolation_var, progress_color="#4a90e2")
+    isolation_switch.pack(pady=(10, 0))
+
+    # Session logs for offline replay (session_replay.py)
+    record_var = ctk.BooleanVar(value=settings.get("record_sessions", False))
+    record_switch = ctk.CTkSwitch(frame, text="Record sessions to logs/sessions",
+                                  variable=record_var, progress_color="#4a90e2")
+    record_switch.pack(pady=(10, 0))
+    video_var = ctk.BooleanVar(value=bool(settings.get("record_video_scale", 0)))
+    video_switch = ctk.CTkSwitch(frame, text="Include downscaled video in session logs",
+                                 variable=video_var, progress_color="#4a90e2")
+    video_switch.pack(pady=(10, 0))
+
     # Save and Close buttons
     def save_and_close():
         chosen_settings = {
             "language": lang_var.get(),
             "language_code": LANGUAGES[lang_var.get()],
             "gender": gender_var.get(),
-            "speed": speed_var.get()
+            "speed": speed_var.get(),
+            "speech_rate": rate_var.get(),
+            "auto_speak": auto_speak_var.get(),
+            "process_isolation": isolation_var.get(),
+            "record_sessions": record_var.get(),
+            "record_video_scale": (settings.get("record_video_scale") or VIDEO_SCALE) if video_var.get() else 0.0
         }
         save_settings(chosen_settings)
         print("Settings saved:", chosen_settings)
@@ -239,7 +308,7 @@ def open_settings(root):
 # ----------------------------------------------------------------------------------------------
 # Landing Page
 # ---------------------------------------------------------------------------------
-def start_landing_page(root):
+def start_landing_page(root, warm):
     root.deiconify()
     root.title("WaveToMe - Sign Language Recognition")
     root.resizable(False, False)
@@ -335,9 +404,17 @@ def start_landing_page(root):
     instruction_label.pack(pady=(0, 35))
 
     def start_recognition():
+        if not warm.ready.is_set():
+            btn_start.configure(text="Loading...", state="disabled")
+            root.after(50, start_recognition)
+            return
+        if warm.error is not None:
+            btn_start.configure(text="Start Recognition", state="normal")
+            messagebox.showerror("Error", f"Could not start recognition:\n{warm.error}")
+            return
         try:
-            root.destroy()
-            subprocess.Popen([sys.executable, "main.py"])
+            from main import run_recognition
+            run_recognition(root, warm.components)
         except Exception as e:
             messagebox.showerror("Error", f"Could not start recognition:\n{e}")
 
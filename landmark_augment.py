@@ -0,0 +1,245 @@
+"""
+Vectorized landmark augmentation: more signers' worth of training data
+without recapturing.
+
+`Augmenter` transforms a whole (N, 21, 3) batch of normalized MediaPipe
+landmarks at once; every sample gets its own random
+
+- finger-length change (bones past the knuckle, per finger),
+- in-plane rotation and out-of-plane tilt (3D rotation about the hand centre,
+  in aspect-corrected pixel space),
+- scale about the hand centre,
+- translation, limited so the hand stays inside the frame,
+- handedness mirror (x -> 1 - x),
+- per-joint jitter (tracker noise).
+
+`augment_stream()` turns a small dataset into a stream of augmented chunks
+that never exist all at once. Chunk `i` draws everything from
+`default_rng([seed, i])`, so a stream is reproducible for a given seed and
+chunk size, and any chunk can be regenerated on its own.
+
+Note for the engineered "hand" features (utils_landmarks.extract_features):
+they are wrist-relative, scale- and mirror-normalized, so only rotation,
+tilt, finger length and jitter change them; translation, scale and mirror
+matter for raw-coordinate models.
+
+    python landmark_augment.py      # throughput, determinism and a cross-signer accuracy check
+"""
+from __future__ import annotations
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from utils_landmarks import FINGERS, N_LANDMARKS, RAW_DIM, WRIST
+
+CHUNK_SIZE = 65536
+BLOCK = 4096     # samples transformed at a time (temporaries stay in cache)
+ASPECT = 16 / 9  # width / height of the frames the landmarks were normalized against
+
+# Parent joint of every landmark along its finger chain (the wrist is its own parent)
+_CHAINS = np.array([(WRIST,) + finger for finger in FINGERS])   # (5, 5): wrist + 4 joints
+_JOINTS = _CHAINS[:, 1:]                                          # (5, 4)
+_PARENTS = _CHAINS[:, :-1]                                        # (5, 4)
+
+
+class Augmenter:
+    """
+    Args:
+        rotation_deg (float): Max in-plane rotation (either direction).
+        tilt_deg (float): Max out-of-plane rotation about the x and y axes.
+        scale (Tuple[float, float]): Range of the size factor.
+        translate (float): Max shift in normalized frame units (kept inside the frame).
+        mirror_prob (float): Chance of flipping handedness.
+        jitter (float): Per-joint noise standard deviation, in normalized frame units.
+        finger_scale (float): Max relative change of each finger's length past the knuckle.
+        aspect (float): Frame width / height, so rotations happen in square pixel space.
+    """
+
+    def __init__(self, rotation_deg: float = 15.0, tilt_deg: float = 20.0, scale: Tuple[float, float] = (0.8, 1.2),
+                 translate: float = 0.15, mirror_prob: float = 0.5, jitter: float = 0.003,
+                 finger_scale: float = 0.08, aspect: float = ASPECT):
+        self.rotation = np.deg2rad(rotation_deg)
+        self.tilt = np.deg2rad(tilt_deg)
+        self.scale = scale
+        self.translate = translate
+        self.mirror_prob = mirror_prob
+        self.jitter = jitter
+        self.finger_scale = finger_scale
+        self.aspect = aspect
+
+    def __call__(self, pts: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Augment a batch.
+
+        Args:
+            pts (np.ndarray): (N, 21, 3) or (N, 63) landmarks, x/y normalized to the frame.
+            rng: Source of randomness; parameters are drawn in a fixed order.
+
+        Returns:
+            np.ndarray: (N, 21, 3) float32, a new array.
+        """
+        rows = np.asarray(pts, dtype=np.float32).reshape(-1, RAW_DIM)
+        out = np.empty_like(rows)
+        for start in range(0, len(rows), BLOCK):
+            out[start:start + BLOCK] = self._block(rows[start:start + BLOCK], rng).T
+        return out.reshape(-1, N_LANDMARKS, 3)
+
+    def _block(self, rows: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # Column layout (63, n): every coordinate of every joint is a contiguous row of n samples,
+        # so per-sample parameters broadcast along whole rows
+        f32 = np.float32
+        cols = np.ascontiguousarray(rows.T)
+        n = cols.shape[1]
+        x, y, z = cols[0::3], cols[1::3], cols[2::3]  # (21, n) views
+
+        # Finger lengths: scaling every bone past a finger's first joint by g moves
+        # joint m to J1 + g * (Jm - J1)
+        if self.finger_scale:
+            grow = rng.uniform(1 - self.finger_scale, 1 + self.finger_scale, (5, 1, n)).astype(f32)
+            for plane in (x, y, z):
+                fingers = plane[1:].reshape(5, 4, n)
+                base = fingers[:, :1]
+                tips = fingers[:, 1:]
+                tips -= base
+                tips *= grow
+                tips += base
+
+        # Rotation and scale about the hand centre: R = Rz(a) @ Rx(bx) @ Ry(by) * s, applied in
+        # square pixel units (x and z, like MediaPipe's z, are scaled by the frame width)
+        a = rng.uniform(-self.rotation, self.rotation, n)
+        bx = rng.uniform(-self.tilt, self.tilt, n)
+        by = rng.uniform(-self.tilt, self.tilt, n)
+        s = rng.uniform(self.scale[0], self.scale[1], n)
+        ca, sa, cx, sx, cy, sy = np.cos(a), np.sin(a), np.cos(bx), np.sin(bx), np.cos(by), np.sin(by)
+        k = self.aspect
+        rot = (s * np.array([
+            [ca * cy - sa * sx * sy, -sa * cx / k, ca * sy + sa * sx * cy],
+            [(sa * cy + ca * sx * sy) * k, ca * cx, (sa * sy - ca * sx * cy) * k],
+            [-cx * sy, sx / k, cx * cy],
+        ])).astype(f32)  # (3, 3, n), conjugated by diag(k, 1, k) so it applies to normalized coordinates
+        planes = (x, y, z)
+        centre = [p.mean(axis=0) for p in planes]
+        rel = [p - c for p, c in zip(planes, centre)]
+        for i, plane in enumerate(planes):
+            np.multiply(rel[0], rot[i, 0], out=plane)
+            plane += rel[1] * rot[i, 1]
+            plane += rel[2] * rot[i, 2]
+            plane += centre[i]
+
+        # Translation within the frame, then the mirror (x -> 1 - x)
+        if self.translate:
+            for plane in (x, y):
+                lo = np.maximum(-self.translate, -plane.min(axis=0))
+                hi = np.minimum(self.translate, 1.0 - plane.max(axis=0))
+                u = rng.random(n, dtype=f32)
+                plane += np.where(hi > lo, lo + u * (hi - lo), 0.0).astype(f32)
+        if self.mirror_prob:
+            flip = rng.random(n) < self.mirror_prob
+            sign = np.where(flip, f32(-1), f32(1))
+            x *= sign
+            x += flip.astype(f32)
+
+        if self.jitter:
+            # Zero-mean uniform noise in 256 steps with the requested standard deviation; random
+            # bytes cost a fraction of float draws
+            noise = np.frombuffer(rng.bytes(cols.size), np.uint8).reshape(cols.shape).astype(f32)
+            noise -= 127.5
+            noise *= f32(self.jitter / np.sqrt((256 ** 2 - 1) / 12))
+            cols += noise
+        return cols
+
+
+def augment_stream(X, y, n_samples: int, chunk_size: int = CHUNK_SIZE, seed: int = 0,
+                   augmenter: Optional[Augmenter] = None, balance: bool = False
+                   ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream `n_samples` augmented samples in chunks.
+
+    Args:
+        X: (N, 21, 3) or (N, 63) source landmarks (a memmap works; only the drawn rows are read).
+        y: (N,) labels.
+        n_samples (int): Total augmented samples to yield.
+        chunk_size (int): Samples per chunk (the last one may be smaller).
+        seed (int): Chunk i uses np.random.default_rng([seed, i]).
+        augmenter (Optional[Augmenter]): Defaults to Augmenter().
+        balance (bool): Draw classes uniformly instead of in proportion to their counts.
+
+    Yields:
+        (landmarks (k, 21, 3) float32, labels (k,)) per chunk.
+    """
+    augmenter = augmenter or Augmenter()
+    y = np.asarray(y)
+    weights = None
+    if balance:
+        _, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+        weights = 1.0 / counts[inverse]
+        weights /= weights.sum()
+    for i, start in enumerate(range(0, n_samples, chunk_size)):
+        rng = np.random.default_rng([seed, i])
+        k = min(chunk_size, n_samples - start)
+        idx = rng.choice(len(y), size=k, p=weights) if weights is not None else rng.integers(len(y), size=k)
+        idx.sort()  # sequential reads from a memmap
+        yield augmenter(np.asarray(X[idx]), rng), y[idx]
+
+
+# ------------------------------------------------------------------------------------
+# Checks
+# ------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    n_classes = 12
+    shapes = rng.random((n_classes, N_LANDMARKS, 3)).astype(np.float32) * [0.15, 0.25, 0.05] + [0.4, 0.35, -0.02]
+
+    # Throughput
+    X = shapes[rng.integers(n_classes, size=5000)]
+    y = np.arange(5000) % n_classes
+    for chunk in (4096, 65536):
+        n = 2_000_000
+        t0 = time.perf_counter()
+        total = sum(len(c) for c, _ in augment_stream(X, y, n, chunk_size=chunk))
+        dt = time.perf_counter() - t0
+        print(f"chunk {chunk:6d}: {total / dt / 1e6:.2f} M samples/s (1 core), "
+              f"{chunk * 63 * 4 / 1e6:.1f} MB per chunk in memory")
+
+    # Determinism: same seed, same samples; chunks can be regenerated on their own
+    a = [c for c, _ in augment_stream(X, y, 10_000, chunk_size=4096, seed=7)]
+    b = [c for c, _ in augment_stream(X, y, 10_000, chunk_size=4096, seed=7)]
+    assert all(np.array_equal(p, q) for p, q in zip(a, b))
+    assert not np.array_equal(a[0], next(augment_stream(X, y, 4096, seed=8))[0])
+    print("OK: streams are reproducible under a seed")
+
+    # Bones keep their lengths apart from the finger perturbation
+    plain = Augmenter(rotation_deg=30, tilt_deg=30, scale=(1, 1), translate=0.2, jitter=0, finger_scale=0, aspect=1)
+    aug = plain(X[:1000], np.random.default_rng(1))
+    length = lambda p: np.linalg.norm(p[:, _JOINTS] - p[:, _PARENTS], axis=-1)  # noqa: E731
+    assert np.allclose(length(aug), length(X[:1000]), atol=1e-5)
+    assert aug[..., :2].min() >= -1e-6 and aug[..., :2].max() <= 1 + 1e-6
+    fingers = Augmenter(rotation_deg=0, tilt_deg=0, scale=(1, 1), translate=0, mirror_prob=0, jitter=0,
+                        finger_scale=0.1)
+    ratio = length(fingers(X[:1000], np.random.default_rng(1))) / length(X[:1000])
+    assert np.allclose(ratio[:, :, 0], 1, atol=1e-4) and np.allclose(ratio[:, :, 1:], ratio[:, :, 1:2], atol=1e-4)
+    assert 0.9 - 1e-4 <= ratio.min() < 0.95 and 1.05 < ratio.max() <= 1.1 + 1e-4
+    print("OK: rotation/mirror/translation are rigid and keep the hand in frame; finger lengths scale per finger")
+
+    # Cross-signer check: train on one right-handed "signer", test on another with different
+    # hand proportions, pose, size and position, signing with either hand
+    def signer(n_per_class, finger, rot, tilt, scale, mirror, seed):
+        other = Augmenter(rotation_deg=rot, tilt_deg=tilt, scale=scale, translate=0.15, mirror_prob=mirror,
+                          jitter=0.004, finger_scale=finger)
+        labels = np.repeat(np.arange(n_classes), n_per_class)
+        return other(shapes[labels], np.random.default_rng(seed)), labels
+
+    X_train, y_train = signer(20, 0.02, 5, 5, (0.95, 1.05), 0.0, 1)
+    X_test, y_test = signer(200, 0.1, 20, 25, (0.7, 1.3), 0.5, 2)
+    for name, extra in (("original only", 0), ("+ 50k augmented", 50_000)):
+        Xs, ys = [X_train.reshape(len(X_train), -1)], [y_train]
+        for chunk, labels in augment_stream(X_train, y_train, extra, seed=0):
+            Xs.append(chunk.reshape(len(chunk), -1))
+            ys.append(labels)
+        clf = RandomForestClassifier(n_estimators=40, random_state=0, n_jobs=1).fit(np.concatenate(Xs),
+                                                                                     np.concatenate(ys))
+        acc = (clf.predict(X_test.reshape(len(X_test), -1)) == y_test).mean()
+        print(f"{name:18s} {len(np.concatenate(ys)):6d} training samples, accuracy on another signer {acc:.1%}")
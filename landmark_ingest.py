@@ -0,0 +1,213 @@
+"""
+Parallel, cached landmark extraction for image datasets.
+
+Images are fanned out over a process pool with one static-mode MediaPipe
+`Hands` per worker. Extracted landmarks are cached by image content hash
+plus the extraction settings (decode reduction, detection confidence), so
+re-running on an unchanged dataset only stats the files and reads the
+cache, adding images only processes the new ones, and changing a setting
+re-extracts instead of reusing results made under the old one. The cache
+is flushed every FLUSH_S seconds, so an interrupted run keeps its work.
+
+    python landmark_ingest.py external_asl_images/combine_asl_dataset --workers 8 --reduce 2
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils_landmarks import landmarks_to_array
+
+CACHE_PATH = os.path.join("data", "cache", "image_landmarks.npz")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+N_FEATURES = 63
+FLUSH_S = 30.0
+
+# Downscaled JPEG/PNG decode straight from the file (no full-size decode + resize)
+_REDUCE_FLAGS = {1: "IMREAD_COLOR", 2: "IMREAD_REDUCED_COLOR_2", 4: "IMREAD_REDUCED_COLOR_4",
+                 8: "IMREAD_REDUCED_COLOR_8"}
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def extraction_key(digest: str, reduce: int, min_detection_confidence: float) -> str:
+    """Cache key for an image's landmarks under the given extraction settings."""
+    return f"{digest}:r{reduce}:c{min_detection_confidence:g}"
+
+
+class LandmarkCache:
+    """
+    Content-hash keyed landmark store.
+
+    `features` maps extraction_key() (sha1 plus settings) -> (63,) float32
+    landmarks, or None when MediaPipe found no hand (so misses are not retried
+    under the same settings). `index` maps a file path to (size, mtime_ns, sha1)
+    so unchanged files are not even re-hashed.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self.features: Dict[str, Optional[np.ndarray]] = {}
+        self.index: Dict[str, Tuple[int, int, str]] = {}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as z:
+            feats, found = z["features"], z["found"]
+            for key, row, ok in zip(z["digests"], feats, found):
+                if ":" in key:  # bare sha1 keys predate the settings in the key; re-extract those
+                    self.features[str(key)] = row if ok else None
+            for p, size, mtime, digest in zip(z["paths"], z["sizes"], z["mtimes"], z["path_digests"]):
+                self.index[str(p)] = (int(size), int(mtime), str(digest))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        digests = list(self.features)
+        feats = np.zeros((len(digests), N_FEATURES), dtype=np.float32)
+        found = np.zeros(len(digests), dtype=bool)
+        for i, d in enumerate(digests):
+            if self.features[d] is not None:
+                feats[i] = self.features[d]
+                found[i] = True
+        paths = list(self.index)
+        tmp = self.path + ".tmp.npz"
+        np.savez(
+            tmp,
+            digests=np.array(digests, dtype=str), features=feats, found=found,
+            paths=np.array(paths, dtype=str),
+            sizes=np.array([self.index[p][0] for p in paths], dtype=np.int64),
+            mtimes=np.array([self.index[p][1] for p in paths], dtype=np.int64),
+            path_digests=np.array([self.index[p][2] for p in paths], dtype=str),
+        )
+        os.replace(tmp, self.path)
+
+    def digest_for(self, path: str) -> str:
+        st = os.stat(path)
+        cached = self.index.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(path)
+        self.index[path] = (st.st_size, st.st_mtime_ns, digest)
+        return digest
+
+
+# ------------------------------------------------------------------------------------
+# Worker side (one MediaPipe graph per process)
+# ------------------------------------------------------------------------------------
+_hands = None
+_imread_flag = None
+
+
+def _init_worker(reduce: int, min_detection_confidence: float):
+    global _hands, _imread_flag
+    import cv2
+    import mediapipe as mp
+    cv2.setNumThreads(1)
+    _imread_flag = getattr(cv2, _REDUCE_FLAGS[reduce])
+    _hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1,
+                                      min_detection_confidence=min_detection_confidence)
+
+
+def _extract(path: str) -> Optional[np.ndarray]:
+    import cv2
+    img = cv2.imread(path, _imread_flag)
+    if img is None:
+        return None
+    results = _hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    if not results.multi_hand_landmarks:
+        return None
+    return landmarks_to_array(results.multi_hand_landmarks[0]).ravel()
+
+
+# ------------------------------------------------------------------------------------
+# Driver
+# ------------------------------------------------------------------------------------
+def list_images(root_dir: str) -> List[Tuple[str, str]]:
+    """(label, path) for every image in `root_dir/<label>/`."""
+    items = []
+    for label in sorted(os.listdir(root_dir)):
+        label_dir = os.path.join(root_dir, label)
+        if os.path.isdir(label_dir):
+            for fname in sorted(os.listdir(label_dir)):
+                if fname.lower().endswith(IMAGE_EXTS):
+                    items.append((label, os.path.join(label_dir, fname)))
+    return items
+
+
+def ingest_images(root_dir: str, cache_path: str = CACHE_PATH, workers: Optional[int] = None,
+                  reduce: int = 1, min_detection_confidence: float = 0.7, chunksize: int = 16):
+    """
+    Extract landmarks for every image under `root_dir/<label>/`.
+
+    Returns:
+        (X, y, stats): (N, 63) float32 landmarks, (N,) labels for images with a detected
+        hand, and a dict with counts and timings.
+    """
+    if reduce not in _REDUCE_FLAGS:
+        raise ValueError(f"reduce must be one of {sorted(_REDUCE_FLAGS)}")
+    t0 = time.perf_counter()
+    cache = LandmarkCache(cache_path)
+    items = list_images(root_dir)
+
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as pool:
+        digests = list(pool.map(cache.digest_for, (p for _, p in items)))
+    t_hash = time.perf_counter() - t0
+
+    keys = [extraction_key(d, reduce, min_detection_confidence) for d in digests]
+    todo = {}
+    for (_, path), key in zip(items, keys):
+        if key not in cache.features and key not in todo:
+            todo[key] = path
+
+    t1 = time.perf_counter()
+    try:
+        if todo:
+            print(f"[EXTERNAL DATA] Extracting {len(todo)} new images ({len(items) - len(todo)} cached)")
+            last_flush = time.monotonic()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(reduce, min_detection_confidence)) as pool:
+                for key, feat in zip(todo, pool.map(_extract, todo.values(), chunksize=chunksize)):
+                    cache.features[key] = feat
+                    if time.monotonic() - last_flush > FLUSH_S:
+                        cache.save()
+                        last_flush = time.monotonic()
+    finally:
+        # Also on Ctrl+C or a worker crash: keep what was extracted
+        cache.save()
+    t_extract = time.perf_counter() - t1
+
+    X, y, missing = [], [], 0
+    for (label, _), key in zip(items, keys):
+        feat = cache.features[key]
+        if feat is None:
+            missing += 1
+            continue
+        X.append(feat)
+        y.append(label)
+
+    stats = {"images": len(items), "extracted": len(todo), "no_hand": missing,
+             "hash_s": t_hash, "extract_s": t_extract, "total_s": time.perf_counter() - t0}
+    X = np.array(X, dtype=np.float32).reshape(-1, N_FEATURES)
+    return X, np.array(y), stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from an image dataset")
+    parser.add_argument("root_dir")
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--reduce", type=int, default=1, choices=sorted(_REDUCE_FLAGS),
+                        help="decode images at 1/N resolution")
+    args = parser.parse_args()
+
+    X, y, stats = ingest_images(args.root_dir, args.cache, args.workers, args.reduce)
+    print(f"{len(X)} samples across {len(set(y))} classes; {stats}")
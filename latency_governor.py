@@ -0,0 +1,267 @@
+"""
+Latency governor: trades recognition quality for speed when the machine can't keep up.
+
+The governor wraps a recognizer's `infer()` and measures what each frame
+costs. It steps through quality tiers -- MediaPipe landmark model, inference
+input scale, and running inference only every Nth frame (the frames in
+between reuse the last result, landmarks and box included) -- to hold a target
+inference rate and, optionally, an end-to-end latency budget reported by the
+render stage through `observe()`.
+
+Hysteresis keeps it from oscillating:
+- a tier is only left after a full window of frames, and after `COOLDOWN_S`
+  since the previous change;
+- it steps down as soon as the budget has been exceeded for `DOWN_HOLD_S`;
+- it steps back up only after `UP_HOLD_S` of clear headroom (cost under
+  `UP_RATIO` of the budget), and not at all into a tier that measured
+  over budget within the last `RETRY_S`.
+
+    python latency_governor.py      # simulated low-end laptop: tier trace and fps with/without the governor
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from instrumentation import PROFILER
+from utils_landmarks import bounding_box
+
+TARGET_FPS = 15.0
+WINDOW = 20
+COOLDOWN_S = 2.0
+DOWN_HOLD_S = 0.5
+UP_HOLD_S = 3.0
+UP_RATIO = 0.6
+RETRY_S = 30.0
+
+
+class Tier:
+    """One quality level: landmark model complexity, input scale, inference on every Nth frame."""
+
+    __slots__ = ("name", "complexity", "scale", "every")
+
+    def __init__(self, name: str, complexity: int, scale: float, every: int):
+        self.name = name
+        self.complexity = complexity
+        self.scale = scale
+        self.every = every
+
+    def __repr__(self):
+        return f"Tier({self.name}: complexity {self.complexity}, {self.scale:.0%} input, every {self.every})"
+
+
+# Best quality first
+TIERS = (
+    Tier("full", 1, 1.0, 1),
+    Tier("lite", 0, 1.0, 1),
+    Tier("lite-half", 0, 0.5, 1),
+    Tier("lite-half/2", 0, 0.5, 2),
+    Tier("lite-third/3", 0, 1 / 3, 3),
+)
+
+
+class LatencyGovernor:
+    """
+    Drop-in wrapper around a SignRecognizer's `infer()` (other attributes pass through).
+
+    `infer()` runs on the inference thread while `observe()`, `tier` and `stats()` are
+    used from the render thread; the measurements and tier state are shared under a lock.
+
+    Args:
+        recognizer: Anything with infer(frame) -> Prediction; set_model_complexity() is used if present.
+        target_fps (float): Inference rate to hold; the per-frame budget is 1000 / target_fps ms.
+        latency_budget_ms (Optional[float]): End-to-end (capture -> screen) budget, checked against
+                                             values passed to observe().
+        tiers: Quality tiers, best first.
+        start (int): Index of the initial tier.
+        clock: Time source in seconds (injectable for simulations).
+    """
+
+    def __init__(self, recognizer, target_fps: float = TARGET_FPS, latency_budget_ms: Optional[float] = None,
+                 tiers: Sequence[Tier] = TIERS, start: int = 0, clock: Callable[[], float] = time.perf_counter):
+        self.recognizer = recognizer
+        self.budget_ms = 1000.0 / target_fps
+        self.latency_budget_ms = latency_budget_ms
+        self.tiers = tuple(tiers)
+        self.clock = clock
+        self.level = start
+        self._lock = threading.Lock()
+        self._costs = deque(maxlen=WINDOW)
+        self._latencies = deque(maxlen=WINDOW)
+        self._tier_cost = {}  # level -> (cost ms, measured at)
+        self._frame = 0
+        self._last = None
+        self._skip_next = True
+        self._changed_at = clock()
+        self._over_since: Optional[float] = None
+        self._ok_since: Optional[float] = None
+        self.changes = 0
+        self.carried = 0
+        self.history = [(self._changed_at, self.tier.name)]
+        self._configure()
+
+    def __getattr__(self, name):
+        return getattr(self.recognizer, name)
+
+    @property
+    def tier(self) -> Tier:
+        return self.tiers[self.level]
+
+    def _configure(self):
+        if hasattr(self.recognizer, "set_model_complexity"):
+            self.recognizer.set_model_complexity(self.tier.complexity)
+
+    def _set_level(self, level: int, now: float, reason: str):
+        old = self.tier.name
+        self.level = level
+        self._configure()
+        self._costs.clear()
+        self._latencies.clear()
+        self._skip_next = True  # the first frame after a change may rebuild the tracking graph
+        self._changed_at = now
+        self._over_since = self._ok_since = None
+        self.changes += 1
+        self.history.append((now, self.tier.name))
+        print(f"Governor: {old} -> {self.tier.name} ({reason})")
+
+    def observe(self, latency_ms: float):
+        """Report a frame's end-to-end latency (e.g. from the render stage, any thread)."""
+        with self._lock:
+            self._latencies.append(latency_ms)
+
+    # -- control ------------------------------------------------------------------------------
+    def _decide(self, now: float):
+        if len(self._costs) < WINDOW or now - self._changed_at < COOLDOWN_S:
+            return
+        cost = float(np.median(self._costs))
+        latency = float(np.median(self._latencies)) if self._latencies else None
+        self._tier_cost[self.level] = (cost, now)
+        late = self.latency_budget_ms is not None and latency is not None and latency > self.latency_budget_ms
+
+        if cost > self.budget_ms or late:
+            self._ok_since = None
+            if self._over_since is None:
+                self._over_since = now
+            if now - self._over_since >= DOWN_HOLD_S and self.level < len(self.tiers) - 1:
+                what = (f"latency {latency:.0f} ms > {self.latency_budget_ms:.0f} ms" if late
+                        else f"{cost:.1f} ms/frame > {self.budget_ms:.1f} ms budget")
+                self._set_level(self.level + 1, now, what)
+            return
+        self._over_since = None
+
+        roomy = cost < UP_RATIO * self.budget_ms and (
+            self.latency_budget_ms is None or latency is None or latency < UP_RATIO * self.latency_budget_ms)
+        if not roomy or self.level == 0:
+            self._ok_since = None
+            return
+        if self._ok_since is None:
+            self._ok_since = now
+        if now - self._ok_since >= UP_HOLD_S:
+            known = self._tier_cost.get(self.level - 1)
+            if known is not None and known[0] > self.budget_ms * 0.9 and now - known[1] < RETRY_S:
+                return  # that tier was over budget recently
+            self._set_level(self.level - 1, now, f"{cost:.1f} ms/frame, headroom for better quality")
+
+    def infer(self, frame_bgr):
+        """Like SignRecognizer.infer(), at the current tier."""
+        tier = self.tier
+        self._frame += 1
+        if self._last is not None and self._frame % tier.every:
+            self.carried += 1
+            return self._last
+
+        t0 = self.clock()
+        if tier.scale != 1.0:
+            with PROFILER.stage("downscale"):
+                small = cv2.resize(frame_bgr, None, fx=tier.scale, fy=tier.scale, interpolation=cv2.INTER_AREA)
+            pred = self.recognizer.infer(small)
+            if pred.box is not None:
+                pred.box = self._full_box(pred, frame_bgr.shape, tier.scale)
+        else:
+            pred = self.recognizer.infer(frame_bgr)
+        now = self.clock()
+        self._last = pred
+        with self._lock:
+            if self._skip_next:
+                self._skip_next = False
+            else:
+                self._costs.append((now - t0) * 1000 / tier.every)  # amortized over the frames it covers
+                self._decide(now)
+        return pred
+
+    def _full_box(self, pred, shape, scale: float):
+        """The hand box in full-resolution pixels, padded by the recognizer's padding in those pixels."""
+        h, w = shape[:2]
+        padding = getattr(self.recognizer, "padding", 0)
+        if pred.landmarks is not None:
+            return bounding_box(np.asarray(pred.landmarks).reshape(-1, 3), w, h, padding)  # normalized coords
+        # No landmarks: strip the padding added at the small scale, rescale, pad again
+        x0, y0, x1, y1 = pred.box
+        return (max(0, int((x0 + padding) / scale) - padding), max(0, int((y0 + padding) / scale) - padding),
+                min(w, int((x1 - padding) / scale) + padding), min(h, int((y1 - padding) / scale) + padding))
+
+    def stats(self) -> dict:
+        with self._lock:
+            cost = float(np.median(self._costs)) if self._costs else None
+            return {"tier": self.tier.name, "cost_ms": None if cost is None else round(cost, 1),
+                    "budget_ms": round(self.budget_ms, 1), "changes": self.changes, "carried": self.carried}
+
+
+# ------------------------------------------------------------------------------------
+# Simulation
+# ------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    from recognizer import Prediction
+
+    class Clock:
+        now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    class SlowLaptop:
+        """Simulated MediaPipe cost: ~110 ms per 720p frame with the full model, scaled by pixels and load."""
+
+        def __init__(self, clock):
+            self.clock = clock
+            self.complexity = 1
+            self.load = 1.0
+
+        def set_model_complexity(self, c):
+            self.complexity = c
+
+        def infer(self, frame):
+            h, w = frame.shape[:2]
+            ms = (25 + 85 * (1.0 if self.complexity else 0.55) * (w * h) / (1280 * 720)) * self.load
+            self.clock.now += ms * np.random.default_rng(int(self.clock.now * 1e3)).uniform(0.9, 1.1) / 1000
+            return Prediction("A", 0.9, np.ones(1), (10, 10, 50, 50), np.zeros((21, 3), np.float32))
+
+    def simulate(governed: bool, seconds: float = 60.0, camera_fps: float = 30.0):
+        clock = Clock()
+        laptop = SlowLaptop(clock)
+        model = LatencyGovernor(laptop, clock=clock) if governed else laptop
+        frame = np.zeros((720, 1280, 3), np.uint8)
+        results, buckets = [], {}
+        while clock.now < seconds:
+            laptop.load = 2.5 if 20 <= clock.now < 40 else 1.0  # a browser tab hogging the CPU
+            start = clock.now
+            model.infer(frame)
+            clock.now = max(clock.now, start + 0.2 / 1000)  # carried frames still cost a little
+            # Latest-frame-wins: the next frame is whichever the camera delivers next
+            clock.now = np.ceil(clock.now * camera_fps) / camera_fps
+            results.append(clock.now)
+            buckets.setdefault(int(clock.now // 10), []).append(clock.now)
+        fps = [len(buckets.get(b, ())) / 10 for b in range(int(seconds // 10))]
+        return model, fps
+
+    for governed in (False, True):
+        model, fps = simulate(governed)
+        print(f"{'governed' if governed else 'fixed full':10s} results/s per 10 s: "
+              + " ".join(f"{f:4.1f}" for f in fps) + "   (load x2.5 during 20-40 s)")
+        if governed:
+            print("tier trace: " + ", ".join(f"{t:.1f}s {name}" for t, name in model.history))
+            print(f"{model.changes} tier changes, {model.carried} carried-over frames")
@@ -1,19 +1,32 @@
 import cv2
-import mediapipe as mp
-import numpy as np
-import joblib
 import customtkinter as ctk
 from PIL import Image
 import time
-import threading
-from gtts import gTTS
-import pygame
-import tempfile
+import queue
 import os
 import json
 
+from commit_decoder import label_symbol, make_decoder
+from instrumentation import PROFILER
+from latency_governor import LatencyGovernor
+from model_registry import ModelWatcher
+from pipeline import FramePipeline
+from presence_gate import PresenceGate
+from process_pipeline import ProcessPipeline
+from session_log import VIDEO_SCALE, SessionRecorder, session_path
+from speech_queue import SpeechWorker
+from tts_engine import DEFAULT_RATE
+from warm_start import WarmStart
+
 SETTINGS_FILE = "settings.json"
 
+FLASH_DURATION = 0.2
+PADDING = 20
+BOX_THICKNESS = 3
+RENDER_POLL_MS = 5
+STATS_LOG_INTERVAL = 5.0
+LATENCY_BUDGET_MS = 200.0
+
 LANGUAGES = {
     "English": "en", "Spanish": "es", "French": "fr", "German": "de",
     "Italian": "it", "Portuguese": "pt", "Russian": "ru", "Japanese": "ja",
@@ -49,10 +62,10 @@ def open_settings_window(root):
 
     win = ctk.CTkToplevel(root)
     win.title("Settings - WaveToMe")
-    win.geometry("480x380")
+    win.geometry("480x620")
     win.configure(fg_color="#1c1e24")
     win.resizable(False, False)
-    center_window(win, 480, 380)
+    center_window(win, 480, 620)
 
     frame = ctk.CTkFrame(win, fg_color="#2b2f38", corner_radius=15)
     frame.pack(pady=20, padx=20, fill="both", expand=True)
@@ -97,13 +110,57 @@ def open_settings_window(root):
 
     speed_slider.configure(command=update_speed)
 
+    # Speech rate (1.0 = the voice's normal pace)
+    rate_label = ctk.CTkLabel(frame, text="Speech Rate:", font=("Segoe UI", 14))
+    rate_label.pack(pady=(5))
+    rate_var = ctk.DoubleVar(value=settings.get("speech_rate", DEFAULT_RATE))
+    rate_slider = ctk.CTkSlider(frame,
+                                from_=0.5, to=2.0, number_of_steps=6,
+                                variable=rate_var,
+                                progress_color="#4a90e2", button_color="#4a90e2", width=220)
+    rate_slider.pack()
+    rate_value = ctk.CTkLabel(frame, text=f"{rate_var.get():.2f}x", font=("Segoe UI", 12))
+    rate_value.pack()
+
+    def update_rate(val):
+        rate_value.configure(text=f"{float(val):.2f}x")
+
+    rate_slider.configure(command=update_rate)
+
+    # Auto-speak
+    auto_speak_var = ctk.BooleanVar(value=settings.get("auto_speak", False))
+    auto_speak_switch = ctk.CTkSwitch(frame, text="Speak each word as it is signed",
+                                      variable=auto_speak_var, progress_color="#4a90e2")
+    auto_speak_switch.pack(pady=(10, 0))
+
+    # Execution mode (applies the next time recognition starts)
+    isolation_var = ctk.BooleanVar(value=settings.get("process_isolation", False))
+    isolation_switch = ctk.CTkSwitch(frame, text="Run capture and inference in separate processes",
+                                     variable=isolation_var, progress_color="#4a90e2")
+    isolation_switch.pack(pady=(10, 0))
+
+    # Session logs for offline replay (session_replay.py)
+    record_var = ctk.BooleanVar(value=settings.get("record_sessions", False))
+    record_switch = ctk.CTkSwitch(frame, text="Record sessions to logs/sessions",
+                                  variable=record_var, progress_color="#4a90e2")
+    record_switch.pack(pady=(10, 0))
+    video_var = ctk.BooleanVar(value=bool(settings.get("record_video_scale", 0)))
+    video_switch = ctk.CTkSwitch(frame, text="Include downscaled video in session logs",
+                                 variable=video_var, progress_color="#4a90e2")
+    video_switch.pack(pady=(10, 0))
+
     # Save and Close buttons
     def save_and_close():
         chosen_settings = {
             "language": lang_var.get(),
             "language_code": LANGUAGES[lang_var.get()],
             "gender": gender_var.get(),
-            "speed": speed_var.get()
+            "speed": speed_var.get(),
+            "speech_rate": rate_var.get(),
+            "auto_speak": auto_speak_var.get(),
+            "process_isolation": isolation_var.get(),
+            "record_sessions": record_var.get(),
+            "record_video_scale": (settings.get("record_video_scale") or VIDEO_SCALE) if video_var.get() else 0.0
         }
         save_settings(chosen_settings)
         print("Settings saved:", chosen_settings)
@@ -127,400 +184,474 @@ def open_settings_window(root):
 
 
 # -------------------------------------------------------------------------
-# Load trained model
-# ------------------------------------------------------------------------------------
-model = joblib.load("models/sign_classifier_v3.pkl")
-
-# --------------------------------------------------------------------------------------
-# Mediapipe setup
-# ------------------------------------------------------------------------------
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-
-# --------------------------------------------------------------------------------
-# Webcam
-# ------------------------------------------------------------------------------------
-cap = cv2.VideoCapture(0)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-
-# ----------------------------------------------------------------------------------------
-# GUI Setup
-# ---------------------------------------------------------------------------------
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
-
-root = ctk.CTk()
-root.title("WaveToMe - Sign Language Translator")
-root.geometry("1200x800")
-root.configure(fg_color="#0f1419")
-
-# ---------------------------------------------------------------------------------------------------
-# Left Panel
-# -------------------------------------------------------------------------------
-left_panel = ctk.CTkFrame(root, fg_color="#1a1f2e", corner_radius=15)
-left_panel.place(relx=0.015, rely=0.025, relwidth=0.575, relheight=0.95)
-
-left_panel.grid_rowconfigure(0, weight=0)
-left_panel.grid_rowconfigure(1, weight=1)
-left_panel.grid_rowconfigure(2, weight=0)
-left_panel.grid_columnconfigure(0, weight=1)
-
-# Header
-header_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
-header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(20, 10))
-
-title_label = ctk.CTkLabel(
-    header_frame,
-    text="📹 Live Camera",
-    font=("Segoe UI", 24, "bold"),
-    text_color="#ffffff"
-)
-title_label.pack(side="left")
-
-# Status indicator
-status_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
-status_frame.pack(side="right")
-
-status_dot = ctk.CTkLabel(
-    status_frame,
-    text="●",
-    font=("Segoe UI", 20),
-    text_color="#10a37f"
-)
-status_dot.pack(side="left", padx=(0, 5))
-
-status_label = ctk.CTkLabel(
-    status_frame,
-    text="Ready",
-    font=("Segoe UI", 14),
-    text_color="#a0a0a0"
-)
-status_label.pack(side="left")
-
-# Camera container
-camera_container = ctk.CTkFrame(left_panel, fg_color="#0f1419", corner_radius=12, border_width=2,
-                                border_color="#2a2f3e")
-camera_container.grid(row=1, column=0, sticky="nsew", padx=15, pady=10)
-camera_container.grid_rowconfigure(0, weight=1)
-camera_container.grid_columnconfigure(0, weight=1)
-
-video_label = ctk.CTkLabel(camera_container, text="", fg_color="transparent")
-video_label.grid(row=0, column=0, sticky="nsew", padx=3, pady=3)
-
-# Confidence indicator
-confidence_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
-confidence_frame.grid(row=2, column=0, sticky="ew", padx=20, pady=(10, 20))
-
-confidence_label = ctk.CTkLabel(
-    confidence_frame,
-    text="Detection Confidence:",
-    font=("Segoe UI", 13),
-    text_color="#a0a0a0"
-)
-confidence_label.pack(side="left")
-
-confidence_value = ctk.CTkLabel(
-    confidence_frame,
-    text="--",
-    font=("Segoe UI", 13, "bold"),
-    text_color="#10a37f"
-)
-confidence_value.pack(side="left", padx=10)
-
-confidence_bar = ctk.CTkProgressBar(
-    confidence_frame,
-    width=200,
-    height=8,
-    progress_color="#10a37f",
-    fg_color="#2a2f3e"
-)
-confidence_bar.pack(side="left", padx=10)
-confidence_bar.set(0)
-
-# --------------------------------------------------------------------------------------------------------
-# Right Panel
+# Recognition Window
 # ------------------------------------------------------------------------------------
-right_panel = ctk.CTkFrame(root, fg_color="#1a1f2e", corner_radius=15)
-right_panel.place(relx=0.605, rely=0.025, relwidth=0.38, relheight=0.95)
-
-right_panel.grid_rowconfigure(0, weight=0)
-right_panel.grid_rowconfigure(1, weight=1)
-right_panel.grid_rowconfigure(2, weight=0)
-right_panel.grid_columnconfigure(0, weight=1)
-
-# Output header
-output_header = ctk.CTkLabel(
-    right_panel,
-    text="📝 Translated Text",
-    font=("Segoe UI", 22, "bold"),
-    text_color="#ffffff"
-)
-output_header.grid(row=0, column=0, sticky="w", padx=15, pady=(20, 10))
-
-# Add settings button (⚙️) next to output header
-settings_btn = ctk.CTkButton(
-    right_panel,
-    text="⚙️",
-    width=45,
-    height=45,
-    corner_radius=10,
-    fg_color="#2a2f3e",
-    hover_color="#3a3f4e",
-    text_color="#ffffff",
-    font=("Segoe UI", 18, "bold"),
-    command=lambda: open_settings_window(root)
-)
-settings_btn.grid(row=0, column=0, sticky="e", padx=15, pady=(20, 10))
-
-# Text output box
-text_box = ctk.CTkTextbox(
-    right_panel,
-    font=("Segoe UI", 18),
-    fg_color="#0f1419",
-    text_color="#ffffff",
-    border_width=2,
-    border_color="#2a2f3e",
-    wrap="word",
-    corner_radius=12
-)
-text_box.grid(row=1, column=0, sticky="nsew", padx=15, pady=10)
-
-# Action buttons
-action_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
-action_frame.grid(row=2, column=0, sticky="ew", padx=15, pady=(10, 20))
-action_frame.grid_columnconfigure(0, weight=1)
-action_frame.grid_columnconfigure(1, weight=1)
-
-# --------------------------------------------------------------------------------------
-# Google TTS Engine Setup (need to change that)
-# -------------------------------------------------------------------------------------
-pygame.mixer.init()
-
-is_speaking = False
-temp_audio_file = None
-
-
-def stop_speech():
-    global is_speaking, temp_audio_file
-    if is_speaking:
+def run_recognition(root=None, components=None):
+    """
+    Build the recognition window and start the frame pipeline.
+
+    Args:
+        root: Existing CTk window to take over (the launcher passes its own); a new
+              window with its own mainloop is created when None.
+        components: Preloaded `warm_start.Components`; loaded synchronously when None.
+    """
+    if components is None:
+        warm = WarmStart()
+        warm.run()
+        components = warm.wait()
+
+    recognizer = components.recognizer
+    cap = components.cap
+
+    # ----------------------------------------------------------------------------------------
+    # GUI Setup
+    # ---------------------------------------------------------------------------------
+    standalone = root is None
+    if standalone:
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("blue")
+        root = ctk.CTk()
+    else:
+        for child in root.winfo_children():
+            child.destroy()
+        root.resizable(True, True)
+        root.deiconify()
+
+    root.title("WaveToMe - Sign Language Translator")
+    root.geometry("1200x800")
+    root.configure(fg_color="#0f1419")
+
+    # ---------------------------------------------------------------------------------------------------
+    # Left Panel
+    # -------------------------------------------------------------------------------
+    left_panel = ctk.CTkFrame(root, fg_color="#1a1f2e", corner_radius=15)
+    left_panel.place(relx=0.015, rely=0.025, relwidth=0.575, relheight=0.95)
+
+    left_panel.grid_rowconfigure(0, weight=0)
+    left_panel.grid_rowconfigure(1, weight=1)
+    left_panel.grid_rowconfigure(2, weight=0)
+    left_panel.grid_columnconfigure(0, weight=1)
+
+    # Header
+    header_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
+    header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(20, 10))
+
+    title_label = ctk.CTkLabel(
+        header_frame,
+        text="📹 Live Camera",
+        font=("Segoe UI", 24, "bold"),
+        text_color="#ffffff"
+    )
+    title_label.pack(side="left")
+
+    # Status indicator
+    status_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+    status_frame.pack(side="right")
+
+    status_dot = ctk.CTkLabel(
+        status_frame,
+        text="●",
+        font=("Segoe UI", 20),
+        text_color="#10a37f"
+    )
+    status_dot.pack(side="left", padx=(0, 5))
+
+    status_label = ctk.CTkLabel(
+        status_frame,
+        text="Ready",
+        font=("Segoe UI", 14),
+        text_color="#a0a0a0"
+    )
+    status_label.pack(side="left")
+
+    # Camera container
+    camera_container = ctk.CTkFrame(left_panel, fg_color="#0f1419", corner_radius=12, border_width=2,
+                                    border_color="#2a2f3e")
+    camera_container.grid(row=1, column=0, sticky="nsew", padx=15, pady=10)
+    camera_container.grid_rowconfigure(0, weight=1)
+    camera_container.grid_columnconfigure(0, weight=1)
+
+    video_label = ctk.CTkLabel(camera_container, text="", fg_color="transparent")
+    video_label.grid(row=0, column=0, sticky="nsew", padx=3, pady=3)
+
+    # Confidence indicator
+    confidence_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
+    confidence_frame.grid(row=2, column=0, sticky="ew", padx=20, pady=(10, 20))
+
+    confidence_label = ctk.CTkLabel(
+        confidence_frame,
+        text="Detection Confidence:",
+        font=("Segoe UI", 13),
+        text_color="#a0a0a0"
+    )
+    confidence_label.pack(side="left")
+
+    confidence_value = ctk.CTkLabel(
+        confidence_frame,
+        text="--",
+        font=("Segoe UI", 13, "bold"),
+        text_color="#10a37f"
+    )
+    confidence_value.pack(side="left", padx=10)
+
+    confidence_bar = ctk.CTkProgressBar(
+        confidence_frame,
+        width=200,
+        height=8,
+        progress_color="#10a37f",
+        fg_color="#2a2f3e"
+    )
+    confidence_bar.pack(side="left", padx=10)
+    confidence_bar.set(0)
+
+    throughput_label = ctk.CTkLabel(
+        confidence_frame,
+        text="",
+        font=("Segoe UI", 11),
+        text_color="#6080a0"
+    )
+    throughput_label.pack(side="right")
+
+    # --------------------------------------------------------------------------------------------------------
+    # Right Panel
+    # ------------------------------------------------------------------------------------
+    right_panel = ctk.CTkFrame(root, fg_color="#1a1f2e", corner_radius=15)
+    right_panel.place(relx=0.605, rely=0.025, relwidth=0.38, relheight=0.95)
+
+    right_panel.grid_rowconfigure(0, weight=0)
+    right_panel.grid_rowconfigure(1, weight=1)
+    right_panel.grid_rowconfigure(2, weight=0)
+    right_panel.grid_columnconfigure(0, weight=1)
+
+    # Output header
+    output_header = ctk.CTkLabel(
+        right_panel,
+        text="📝 Translated Text",
+        font=("Segoe UI", 22, "bold"),
+        text_color="#ffffff"
+    )
+    output_header.grid(row=0, column=0, sticky="w", padx=15, pady=(20, 10))
+
+    # Add settings button (⚙️) next to output header
+    settings_btn = ctk.CTkButton(
+        right_panel,
+        text="⚙️",
+        width=45,
+        height=45,
+        corner_radius=10,
+        fg_color="#2a2f3e",
+        hover_color="#3a3f4e",
+        text_color="#ffffff",
+        font=("Segoe UI", 18, "bold"),
+        command=lambda: open_settings_window(root)
+    )
+    settings_btn.grid(row=0, column=0, sticky="e", padx=15, pady=(20, 10))
+
+    # Text output box
+    text_box = ctk.CTkTextbox(
+        right_panel,
+        font=("Segoe UI", 18),
+        fg_color="#0f1419",
+        text_color="#ffffff",
+        border_width=2,
+        border_color="#2a2f3e",
+        wrap="word",
+        corner_radius=12
+    )
+    text_box.grid(row=1, column=0, sticky="nsew", padx=15, pady=10)
+
+    # Action buttons
+    action_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
+    action_frame.grid(row=2, column=0, sticky="ew", padx=15, pady=(10, 20))
+    action_frame.grid_columnconfigure(0, weight=1)
+    action_frame.grid_columnconfigure(1, weight=1)
+
+    # --------------------------------------------------------------------------------------
+    # TTS Engine Setup (offline engine first, cached clips played from memory)
+    # -------------------------------------------------------------------------------------
+    speech_status = queue.Queue()
+    speech = SpeechWorker(components.synthesizer, speech_status)
+
+    SPEECH_STATUS_COLORS = {"generating": "#fbbf24", "speaking": "#3b82f6", "error": "#ef4444", "ready": "#10a37f"}
+
+    def poll_speech_status():
+        """Apply status updates posted by the speech worker (runs on the Tk thread)."""
         try:
-            pygame.mixer.music.stop()
-            if temp_audio_file and os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-        except:
+            while True:
+                state, message = speech_status.get_nowait()
+                status_label.configure(text=message)
+                status_dot.configure(text_color=SPEECH_STATUS_COLORS.get(state, "#10a37f"))
+                if state == "error":
+                    root.after(2000, lambda: status_label.configure(text="Ready"))
+        except queue.Empty:
             pass
-    is_speaking = False
-    status_label.configure(text="Ready")
-    status_dot.configure(text_color="#10a37f")
-
-
-def speak_text():
-    global is_speaking, temp_audio_file
-    settings = load_settings()
-
-    content = text_box.get("1.0", "end-1c").strip()
-    if not content:
-        status_label.configure(text="No text to speak")
-        root.after(1500, lambda: status_label.configure(text="Ready"))
-        return
-
-    if is_speaking:
-        status_label.configure(text="Already speaking...")
-        return
-
-    def speak_in_thread():
-        global is_speaking, temp_audio_file
-        is_speaking = True
-        try:
-            status_label.configure(text="Generating speech...")
-            status_dot.configure(text_color="#fbbf24")
-
-            temp_audio_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3').name
-
-            lang_code = settings["language_code"]
-            tts_obj = gTTS(text=content, lang=lang_code, slow=False)
-            tts_obj.save(temp_audio_file)
-
-            status_label.configure(text="Speaking...")
-            status_dot.configure(text_color="#3b82f6")
-
-            pygame.mixer.music.load(temp_audio_file)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-
-            if os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-        except Exception as e:
-            print(f"TTS Error: {e}")
-            status_label.configure(text="Speech error")
-            root.after(2000, lambda: status_label.configure(text="Ready"))
-        finally:
-            is_speaking = False
-            temp_audio_file = None
-            status_label.configure(text="Ready")
-            status_dot.configure(text_color="#10a37f")
-
-    threading.Thread(target=speak_in_thread, daemon=True).start()
-
-
-clear_btn = ctk.CTkButton(
-    action_frame,
-    text="🗑️ Clear",
-    height=45,
-    corner_radius=10,
-    fg_color="#2a2f3e",
-    hover_color="#3a3f4e",
-    text_color="#ffffff",
-    font=("Segoe UI", 16, "bold"),
-    command=lambda: (stop_speech(), text_box.delete("1.0", "end"))
-)
-clear_btn.grid(row=0, column=0, sticky="ew", padx=(0, 5))
-
-speak_btn = ctk.CTkButton(
-    action_frame,
-    text="🔊 Speak",
-    height=45,
-    corner_radius=10,
-    fg_color="#10a37f",
-    hover_color="#0d8a6b",
-    text_color="#ffffff",
-    font=("Segoe UI", 16, "bold"),
-    command=speak_text
-)
-speak_btn.grid(row=0, column=1, sticky="ew", padx=(5, 0))
-
-copy_btn = ctk.CTkButton(
-    action_frame,
-    text="📋 Copy",
-    height=45,
-    corner_radius=10,
-    fg_color="#3b82f6",
-    hover_color="#2563eb",
-    text_color="#ffffff",
-    font=("Segoe UI", 16, "bold"),
-    command=lambda: root.clipboard_clear() or root.clipboard_append(text_box.get("1.0", "end-1c"))
-)
-copy_btn.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
-
-# ------------------------------------------------------------------------------------
-# Prediction & Hand Box Logic
-# ----------------------------------------------------------------------------------
-prediction_buffer = []
-buffer_start_time = None
-BUFFER_DURATION = 0.1
-FLASH_DURATION = 0.2
-capture_flash = False
-flash_start_time = None
-current_confidence = 0
-
-PADDING = 20
-BOX_THICKNESS = 3
-
-
-def update_frame():
-    global prediction_buffer, buffer_start_time, capture_flash, flash_start_time, current_confidence
-
-    ret, frame = cap.read()
-    if not ret:
-        root.after(10, update_frame)
-        return
-
-    frame_bgr = cv2.flip(frame, 1)
-    rgb_for_mediapipe = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_for_mediapipe)
-
-    current_prediction = None
-    hand_detected = False
-
-    if results.multi_hand_landmarks:
-        hand_detected = True
-        for hand_landmarks in results.multi_hand_landmarks:
-            h, w, _ = frame_bgr.shape
-            xs = [lm.x for lm in hand_landmarks.landmark]
-            ys = [lm.y for lm in hand_landmarks.landmark]
-            x_min, x_max = int(min(xs) * w) - PADDING, int(max(xs) * w) + PADDING
-            y_min, y_max = int(min(ys) * h) - PADDING, int(max(ys) * h) + PADDING
-            x_min, y_min = max(0, x_min), max(0, y_min)
-            x_max, y_max = min(w, x_max), min(h, y_max)
-
-            if capture_flash and (time.time() - flash_start_time <= FLASH_DURATION):
-                overlay = frame_bgr.copy()
-                cv2.rectangle(overlay, (x_min, y_min), (x_max, y_max), (139, 69, 19), -1)
-                frame_bgr = cv2.addWeighted(overlay, 0.4, frame_bgr, 0.6, 0)
-                cv2.putText(frame_bgr, "Recognized!", (x_min, y_min - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (139, 69, 19), 2)
-            else:
-                cv2.rectangle(frame_bgr, (x_min, y_min), (x_max, y_max), (139, 69, 19), BOX_THICKNESS)
-                cv2.rectangle(frame_bgr, (x_min - 1, y_min - 1), (x_max + 1, y_max + 1), (139, 69, 19), 1)
-
-            data = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]).flatten().reshape(1, -1)
-            prediction = model.predict(data)[0]
-            confidence = model.predict_proba(data).max()
-            current_confidence = confidence
-
-            if confidence > 0.3:
-                current_prediction = prediction
-
-    if hand_detected:
-        status_label.configure(text="Detecting..." if not current_prediction else f"Sign: {current_prediction}")
-        status_dot.configure(text_color="#fbbf24")
-        confidence_value.configure(text=f"{current_confidence:.0%}")
-        confidence_bar.set(current_confidence)
+        root.after(50, poll_speech_status)
+
+    def stop_speech():
+        speech.stop()
+
+    def speak_text():
+        settings = load_settings()
+
+        content = text_box.get("1.0", "end-1c").strip()
+        if not content:
+            status_label.configure(text="No text to speak")
+            root.after(1500, lambda: status_label.configure(text="Ready"))
+            return
+
+        # Pressing Speak again interrupts whatever is playing and starts over
+        speech.say(content, settings["language_code"], settings.get("gender", "Male"),
+                   settings.get("speech_rate", DEFAULT_RATE), replace=True)
+
+    def speak_last_word():
+        """Auto-speak: say the word that was just completed by a committed space."""
+        settings = load_settings()
+        if not settings.get("auto_speak", False):
+            return
+        words = text_box.get("1.0", "end-1c").split()
+        if words:
+            speech.say(words[-1], settings["language_code"], settings.get("gender", "Male"),
+                       settings.get("speech_rate", DEFAULT_RATE), mode="word")
+
+    clear_btn = ctk.CTkButton(
+        action_frame,
+        text="🗑️ Clear",
+        height=45,
+        corner_radius=10,
+        fg_color="#2a2f3e",
+        hover_color="#3a3f4e",
+        text_color="#ffffff",
+        font=("Segoe UI", 16, "bold"),
+        command=lambda: (stop_speech(), text_box.delete("1.0", "end"))
+    )
+    clear_btn.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+
+    speak_btn = ctk.CTkButton(
+        action_frame,
+        text="🔊 Speak",
+        height=45,
+        corner_radius=10,
+        fg_color="#10a37f",
+        hover_color="#0d8a6b",
+        text_color="#ffffff",
+        font=("Segoe UI", 16, "bold"),
+        command=speak_text
+    )
+    speak_btn.grid(row=0, column=1, sticky="ew", padx=(5, 0))
+
+    copy_btn = ctk.CTkButton(
+        action_frame,
+        text="📋 Copy",
+        height=45,
+        corner_radius=10,
+        fg_color="#3b82f6",
+        hover_color="#2563eb",
+        text_color="#ffffff",
+        font=("Segoe UI", 16, "bold"),
+        command=lambda: root.clipboard_clear() or root.clipboard_append(text_box.get("1.0", "end-1c"))
+    )
+    copy_btn.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+
+    # ------------------------------------------------------------------------------------
+    # Prediction & Hand Box Logic
+    # ----------------------------------------------------------------------------------
+    capture_flash = False
+    flash_start_time = None
+    current_confidence = 0
+
+    # The decoder sees every inferred frame (the render stage may skip some), so it
+    # runs wherever results arrive and hands committed labels over through a queue
+    model_source = recognizer  # whoever owns the live model: the recognizer, or the inference process
+
+    decoder = make_decoder(model_source.classes)
+    decoder_version = recognizer.model_version
+    commits = queue.Queue()
+    recorder = None  # opt-in session log, created once the model is known
+
+    def decode(result):
+        nonlocal decoder, decoder_version
+        if model_source.model_version != decoder_version:
+            # A hot-swapped model may have different classes
+            decoder, decoder_version = make_decoder(model_source.classes), model_source.model_version
+            if recorder is not None:
+                recorder.model(model_source.classes)
+        t = time.monotonic()
+        proba = result.proba if result.hand else None
+        committed = decoder.update(proba, t)
+        if recorder is not None:
+            recorder.frame(result.landmarks if result.hand else None, proba, t)
+            if committed is not None:
+                recorder.commit(committed, t)
+        if committed is not None:
+            commits.put(committed)
+
+    # Quality tiers adapt to the machine (shown next to the fps); full-rate hand tracking
+    # only while a hand is around, cheap presence probes otherwise
+    governor = LatencyGovernor(recognizer, latency_budget_ms=LATENCY_BUDGET_MS)
+    gate = PresenceGate(governor)
+
+    def infer_and_decode(frame_bgr):
+        result = gate.infer(frame_bgr)
+        decode(result)
+        return result
+
+    # Models saved into models/ (e.g. by train_classifier.py) are loaded in the background and swapped in live
+    if load_settings().get("process_isolation", False):
+        # Capture and inference in their own processes; frames cross in shared memory
+        cap.release()
+        pipeline = ProcessPipeline(getattr(cap, "index", 0), recognizer.model_path, on_result=decode, watch=True,
+                                   source_kwargs={"width": 1280, "height": 720}, presence_gate=True,
+                                   governor=True)
+        model_source = pipeline
+        watcher = None
+        gate = governor = None  # live in the inference process
     else:
-        status_label.configure(text="No hand detected")
-        status_dot.configure(text_color="#ef4444")
-        confidence_value.configure(text="--")
-        confidence_bar.set(0)
-
-    if current_prediction:
-        if buffer_start_time is None:
-            buffer_start_time = time.time()
-            prediction_buffer = [current_prediction]
-        elif time.time() - buffer_start_time >= BUFFER_DURATION:
-            text_box.insert("end", prediction_buffer[0])
+        pipeline = FramePipeline(cap, infer_and_decode)
+        watcher = ModelWatcher(recognizer)
+    if load_settings().get("record_sessions", False):
+        recorder = SessionRecorder(session_path(), model_source.classes,
+                                   video_scale=load_settings().get("record_video_scale") or None,
+                                   model=recognizer.model_path)
+    last_stats_log = time.time()
+
+    def draw_hand_box(frame_bgr, box):
+        x_min, y_min, x_max, y_max = box
+        if capture_flash and (time.time() - flash_start_time <= FLASH_DURATION):
+            overlay = frame_bgr.copy()
+            cv2.rectangle(overlay, (x_min, y_min), (x_max, y_max), (139, 69, 19), -1)
+            frame_bgr = cv2.addWeighted(overlay, 0.4, frame_bgr, 0.6, 0)
+            cv2.putText(frame_bgr, "Recognized!", (x_min, y_min - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (139, 69, 19), 2)
+        else:
+            cv2.rectangle(frame_bgr, (x_min, y_min), (x_max, y_max), (139, 69, 19), BOX_THICKNESS)
+            cv2.rectangle(frame_bgr, (x_min - 1, y_min - 1), (x_max + 1, y_max + 1), (139, 69, 19), 1)
+        return frame_bgr
+
+    def update_frame():
+        """Render stage: consumes the newest inferred frame on the Tk thread."""
+        nonlocal capture_flash, flash_start_time, current_confidence
+        nonlocal last_stats_log
+
+        packet = pipeline.latest()
+        if packet is None:
+            if getattr(pipeline, "error", None):  # a child process of the process pipeline failed
+                status_label.configure(text=f"Stopped - {pipeline.error.split(':', 1)[0]} failed")
+                status_dot.configure(text_color="#ef4444")
+            root.after(RENDER_POLL_MS, update_frame)
+            return
+
+        t_render = time.perf_counter()
+        frame_bgr = packet.frame
+        result = packet.result
+        if recorder is not None:
+            recorder.video(frame_bgr)  # copies a downscaled frame before the overlays are drawn
+
+        current_prediction = None
+        hand_detected = result is not None and result.hand
+
+        if hand_detected:
+            frame_bgr = draw_hand_box(frame_bgr, result.box)
+            current_confidence = result.confidence
+            if current_confidence > recognizer.min_confidence:
+                current_prediction = result.label
+
+        if hand_detected:
+            status_label.configure(text="Detecting..." if not current_prediction else f"Sign: {current_prediction}")
+            status_dot.configure(text_color="#fbbf24")
+            confidence_value.configure(text=f"{current_confidence:.0%}")
+            confidence_bar.set(current_confidence)
+        elif gate is not None and gate.idle:
+            status_label.configure(text="Idle - show a hand to start")
+            status_dot.configure(text_color="#6c757d")
+            confidence_value.configure(text="--")
+            confidence_bar.set(0)
+        else:
+            status_label.configure(text="No hand detected")
+            status_dot.configure(text_color="#ef4444")
+            confidence_value.configure(text="--")
+            confidence_bar.set(0)
+
+        while not commits.empty():
+            label = commits.get_nowait()
+            committed = " " if label_symbol(label) == " " else str(label)
+            text_box.insert("end", committed)
             text_box.see("end")
+            if committed == " ":
+                speak_last_word()
             capture_flash = True
             flash_start_time = time.time()
             status_label.configure(text="Recognized!")
             status_dot.configure(text_color="#10a37f")
-            buffer_start_time = None
-            prediction_buffer = []
-
-    label_w = video_label.winfo_width()
-    label_h = video_label.winfo_height()
-    if label_w > 10 and label_h > 10:
-        frame_h, frame_w, _ = frame_bgr.shape
-        frame_aspect = frame_w / frame_h
-        label_aspect = label_w / label_h
-
-        if frame_aspect > label_aspect:
-            new_h = label_h
-            new_w = int(frame_aspect * new_h)
-            frame_resized = cv2.resize(frame_bgr, (new_w, new_h))
-            x_start = (new_w - label_w) // 2
-            frame_bgr = frame_resized[:, x_start:x_start + label_w]
-        else:
-            new_w = label_w
-            new_h = int(new_w / frame_aspect)
-            frame_resized = cv2.resize(frame_bgr, (new_w, new_h))
-            y_start = (new_h - label_h) // 2
-            frame_bgr = frame_resized[y_start:y_start + label_h, :]
 
-    frame_display = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    img = Image.fromarray(frame_display)
-    ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(label_w, label_h))
-    video_label.configure(image=ctk_img)
-    video_label.image = ctk_img
-
-    root.after(10, update_frame)
-
-
-update_frame()
-root.mainloop()
\ No newline at end of file
+        label_w = video_label.winfo_width()
+        label_h = video_label.winfo_height()
+        with PROFILER.stage("resize+crop"):
+            if label_w > 10 and label_h > 10:
+                frame_h, frame_w, _ = frame_bgr.shape
+                frame_aspect = frame_w / frame_h
+                label_aspect = label_w / label_h
+
+                if frame_aspect > label_aspect:
+                    new_h = label_h
+                    new_w = int(frame_aspect * new_h)
+                    frame_resized = cv2.resize(frame_bgr, (new_w, new_h))
+                    x_start = (new_w - label_w) // 2
+                    frame_bgr = frame_resized[:, x_start:x_start + label_w]
+                else:
+                    new_w = label_w
+                    new_h = int(new_w / frame_aspect)
+                    frame_resized = cv2.resize(frame_bgr, (new_w, new_h))
+                    y_start = (new_h - label_h) // 2
+                    frame_bgr = frame_resized[y_start:y_start + label_h, :]
+        PROFILER.overlay(frame_bgr)
+
+        with PROFILER.stage("cvtColor(display)"):
+            frame_display = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        with PROFILER.stage("PIL/CTkImage"):
+            img = Image.fromarray(frame_display)
+            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(label_w, label_h))
+            video_label.configure(image=ctk_img)
+            video_label.image = ctk_img
+
+        now = time.perf_counter()
+        if PROFILER.enabled:
+            PROFILER.record("render", int(t_render * 1e9), int(now * 1e9))
+        pipeline.render_done(now - t_render)
+        if governor is not None:
+            governor.observe((now - packet.captured_at) * 1000)
+            throughput_label.configure(text=f"{pipeline.summary()} | {governor.tier.name}")
+        else:
+            throughput_label.configure(text=pipeline.summary())
+        if time.time() - last_stats_log >= STATS_LOG_INTERVAL:
+            extra = f" | Governor: {governor.stats()} | Presence: {gate.stats()}" if gate is not None else ""
+            print(f"Pipeline: {pipeline.stats()} | Commits: {decoder.stats()}{extra}")
+            last_stats_log = time.time()
+
+        root.after(RENDER_POLL_MS, update_frame)
+
+    def on_close():
+        PROFILER.export()
+        stop_speech()
+        if watcher is not None:
+            watcher.stop()
+        pipeline.stop()
+        if recorder is not None:
+            recorder.close()
+        cap.release()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    # F3: per-stage timing overlay (starts recording), F4: export the trace to logs/
+    root.bind("<F3>", lambda e: PROFILER.toggle_overlay())
+    root.bind("<F4>", lambda e: PROFILER.export())
+    pipeline.start()
+    if watcher is not None:
+        watcher.start()
+    update_frame()
+    poll_speech_status()
+    if standalone:
+        root.mainloop()
+
+
+if __name__ == "__main__":
+    run_recognition()
@@ -0,0 +1,294 @@
+"""
+Compact, versioned binary artifact for compiled tree classifiers (`.wtm`).
+
+A pickled 200-tree forest is hundreds of MB of Python objects that have to be
+unpickled and then compiled on every start. The artifact instead stores the
+already compiled CompiledForest tables as flat typed arrays:
+
+    magic "WTMF" | u16 version | u16 reserved | u32 header length | JSON header | pad
+    arrays, each 64-byte aligned (offsets in the header are relative to the data start)
+
+The JSON header embeds the class list, feature count/schema, tree depth, leaf
+scale and the dtype/shape/offset of every array, plus free-form metadata.
+Loading memory-maps the file and wraps the arrays without copying, so it takes
+milliseconds and the pages are shared between processes.
+
+Node tables use uint8 feature ids, float32 thresholds (rounded down, which is
+exact for float32 input) and int16 child offsets; identical leaf distributions
+are stored once. Pruning, leaf quantization and float16 thresholds are optional
+and lossy -- `compare()` reports what they cost.
+
+    python model_artifact.py export models/sign_classifier.pkl [--leaf-bits 8] [--max-depth 14]
+    python model_artifact.py info models/sign_classifier.wtm
+    python model_artifact.py demo      # size / load time / accuracy of each variant on synthetic data
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import struct
+import time
+import tracemalloc
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+MAGIC = b"WTMF"
+FORMAT_VERSION = 1
+ARTIFACT_EXT = ".wtm"
+ALIGN = 64
+_PREFIX = struct.Struct("<4sHHI")
+_ARRAYS = ("feature", "threshold", "skip", "leaf_slot", "leaf_values", "roots")
+
+
+def artifact_path(path: str) -> str:
+    """`models/x.pkl` -> `models/x.wtm`."""
+    return os.path.splitext(path)[0] + ARTIFACT_EXT
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+# ------------------------------------------------------------------------------------
+# Writing
+# ------------------------------------------------------------------------------------
+def save_artifact(engine: CompiledForest, path: str, **meta) -> int:
+    """
+    Write a compiled forest atomically. Extra keyword arguments go into the header's `meta`.
+
+    Returns:
+        int: File size in bytes.
+    """
+    from model_registry import feature_schema
+
+    arrays = {name: np.ascontiguousarray(getattr(engine, name)) for name in _ARRAYS}
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        table[name] = {"offset": offset, "dtype": a.dtype.str, "shape": list(a.shape)}
+        offset = _align(offset + a.nbytes)
+    header = json.dumps({
+        "classes": np.asarray(engine.classes_).tolist(),
+        "n_features": int(engine.n_features_in_),
+        "feature_schema": feature_schema(int(engine.n_features_in_)),
+        "max_depth": int(engine.max_depth),
+        "leaf_scale": float(engine.leaf_scale),
+        "arrays": table,
+        "meta": meta,
+    }).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header)))
+        f.write(header)
+        for name, a in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def export_model(model, path: str, max_depth: Optional[int] = None, n_trees: Optional[int] = None,
+                 leaf_bits: Optional[int] = None, half_thresholds: bool = False, **meta) -> CompiledForest:
+    """
+    Compile a fitted sklearn tree ensemble with the given size options and write it
+    to `path`, plus its registry sidecar. `meta` is stored in both.
+    """
+    from model_registry import feature_schema, write_info
+
+    engine = CompiledForest.from_sklearn(model, max_depth=max_depth, n_trees=n_trees, leaf_bits=leaf_bits,
+                                         half_thresholds=half_thresholds, dedupe=True)
+    options = {"max_depth": max_depth, "n_trees": n_trees, "leaf_bits": leaf_bits,
+               "half_thresholds": half_thresholds}
+    save_artifact(engine, path, kind=type(model).__name__, exported_at=time.time(),
+                  options={k: v for k, v in options.items() if v}, **meta)
+    n_features = int(engine.n_features_in_)
+    write_info(path, classes=[str(c) for c in engine.classes_], n_features=n_features,
+               feature_schema=feature_schema(n_features), kind="CompiledForest", **meta)
+    return engine
+
+
+# ------------------------------------------------------------------------------------
+# Reading
+# ------------------------------------------------------------------------------------
+def _parse(buf) -> Tuple[dict, int]:
+    if len(buf) < _PREFIX.size:
+        raise ValueError("Not a model artifact (file too short)")
+    magic, version, _, header_len = _PREFIX.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a model artifact (bad magic)")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Artifact format v{version} is newer than this build supports (v{FORMAT_VERSION})")
+    header = json.loads(bytes(buf[_PREFIX.size:_PREFIX.size + header_len]).decode("utf-8"))
+    return header, _align(_PREFIX.size + header_len)
+
+
+def read_header(path: str) -> dict:
+    """The JSON header (classes, schema, array table, meta) without touching the arrays."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError("Not a model artifact (file too short)")
+        return _parse(prefix + f.read(_PREFIX.unpack(prefix)[3]))[0]
+
+
+def load_artifact(path: str, mmap: bool = True) -> CompiledForest:
+    """
+    Load a `.wtm` file as a ready-to-use CompiledForest.
+
+    With `mmap` the arrays are read-only views of the mapped file (no copy);
+    otherwise the file is read into memory once.
+    """
+    buf = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+    header, data_start = _parse(buf)
+    arrays = {}
+    for name in _ARRAYS:
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        if start + count * dtype.itemsize > len(buf):
+            raise ValueError(f"Truncated model artifact: {name} runs past the end of {path}")
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=start).reshape(spec["shape"])
+    return CompiledForest(classes=np.asarray(header["classes"]), n_features=int(header["n_features"]),
+                          max_depth=int(header["max_depth"]), leaf_scale=float(header["leaf_scale"]), **arrays)
+
+
+# ------------------------------------------------------------------------------------
+# Size / load time / accuracy against the pickle
+# ------------------------------------------------------------------------------------
+def _timed_load(load, repeats: int = 3) -> Tuple[object, float, int]:
+    """Best-of-`repeats` wall time (ms) and peak Python-heap allocation (bytes) of `load()`."""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        obj = load()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    obj = load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return obj, best * 1000, peak
+
+
+def compare(pickle_path: str, wtm_path: str, X: np.ndarray, y: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    Measure an artifact against the pickle it was exported from.
+
+    Load time is joblib.load + compile for the pickle (what SignRecognizer used to
+    do on start) and load_artifact for the artifact, both from the page cache.
+    `X` is any representative feature matrix; with labels `y` accuracy is
+    reported as well, otherwise only agreement with the pickle.
+    """
+    import joblib
+    from forest_engine import compile_model
+
+    ref, pkl_ms, pkl_peak = _timed_load(lambda: compile_model(joblib.load(pickle_path)))
+    art, wtm_ms, wtm_peak = _timed_load(lambda: load_artifact(wtm_path))
+    ref_labels, ref_proba = ref.predict_with_proba(X)
+    labels, proba = art.predict_with_proba(X)
+    out = {
+        "pickle_mb": os.path.getsize(pickle_path) / 1e6, "artifact_mb": os.path.getsize(wtm_path) / 1e6,
+        "pickle_load_ms": pkl_ms, "artifact_load_ms": wtm_ms,
+        "pickle_heap_mb": pkl_peak / 1e6, "artifact_heap_mb": wtm_peak / 1e6,
+        "agreement": float((labels == ref_labels).mean()),
+        "max_proba_diff": float(np.abs(proba - ref_proba).max()),
+    }
+    if y is not None:
+        out["pickle_accuracy"] = float((ref_labels == y).mean())
+        out["artifact_accuracy"] = float((labels == y).mean())
+    return out
+
+
+def format_comparison(r: Dict[str, float]) -> str:
+    lines = [f"size      {r['pickle_mb']:9.2f} MB -> {r['artifact_mb']:8.2f} MB  "
+             f"({r['artifact_mb'] / r['pickle_mb']:.1%})",
+             f"load      {r['pickle_load_ms']:9.1f} ms -> {r['artifact_load_ms']:8.2f} ms",
+             f"heap      {r['pickle_heap_mb']:9.2f} MB -> {r['artifact_heap_mb']:8.2f} MB",
+             f"agreement {r['agreement']:9.2%}     max |dp| {r['max_proba_diff']:.3g}"]
+    if "pickle_accuracy" in r:
+        lines.append(f"accuracy  {r['pickle_accuracy']:9.2%}    -> {r['artifact_accuracy']:8.2%}  "
+                     f"({(r['artifact_accuracy'] - r['pickle_accuracy']) * 100:+.2f} pts)")
+    return "\n".join(lines)
+
+
+def _eval_data(store_dir: Optional[str], n_features: int, rows: int = 5000):
+    """Labelled rows from the dataset store if there is one, else uniform random rows (agreement only)."""
+    if store_dir:
+        from dataset_store import open_store
+        from utils_landmarks import model_input
+        store = open_store(store_dir)
+        if store is not None:
+            X, y = store.load()
+            X = model_input(np.asarray(X, dtype=np.float32).reshape(-1, 63), n_features)
+            return X, np.asarray(y, dtype=str)
+    return np.random.default_rng(0).random((rows, n_features), dtype=np.float32), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export classifiers to the compact .wtm format")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="export a pickled tree classifier and compare against it")
+    ex.add_argument("model")
+    ex.add_argument("-o", "--output", help="default: the model path with a .wtm extension")
+    ex.add_argument("--max-depth", type=int, help="prune trees to this depth")
+    ex.add_argument("--trees", type=int, help="keep only the first N trees")
+    ex.add_argument("--leaf-bits", type=int, choices=[8, 16], help="quantize leaf distributions")
+    ex.add_argument("--half-thresholds", action="store_true", help="float16 thresholds (lossy)")
+    ex.add_argument("--store", default="data/store", help="dataset store used to measure accuracy")
+    sub.add_parser("info", help="print an artifact's header").add_argument("artifact")
+    sub.add_parser("demo", help="compare export options on a synthetic forest")
+    args = parser.parse_args()
+
+    if args.cmd == "info":
+        header = read_header(args.artifact)
+        print(json.dumps({k: v for k, v in header.items() if k != "classes"}, indent=4))
+        print(f"{len(header['classes'])} classes: {' '.join(map(str, header['classes']))}")
+
+    elif args.cmd == "export":
+        import joblib
+        model = joblib.load(args.model)
+        out = args.output or artifact_path(args.model)
+        engine = export_model(model, out, max_depth=args.max_depth, n_trees=args.trees,
+                              leaf_bits=args.leaf_bits, half_thresholds=args.half_thresholds,
+                              source=os.path.basename(args.model))
+        X, y = _eval_data(args.store, int(engine.n_features_in_))
+        print(f"Exported {args.model} -> {out}")
+        print(format_comparison(compare(args.model, out, X, y)))
+
+    else:
+        import tempfile
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+
+        rng = np.random.default_rng(0)
+        centers = rng.random((26, 63))
+        labels = rng.integers(26, size=12000)
+        X = (centers[labels] + rng.normal(0, 0.6, (len(labels), 63))).astype(np.float32)
+        y = np.array([chr(65 + l) for l in labels])
+        model = RandomForestClassifier(n_estimators=200, random_state=42).fit(X[:8000], y[:8000])
+        X_test, y_test = X[8000:], y[8000:]
+
+        variants = [("exact", {}), ("leaf-8", {"leaf_bits": 8}), ("depth-12", {"max_depth": 12}),
+                    ("depth-12 leaf-8", {"max_depth": 12, "leaf_bits": 8}),
+                    ("100 trees", {"n_trees": 100}), ("half-thresholds", {"half_thresholds": True})]
+        with tempfile.TemporaryDirectory() as tmp:
+            pkl = os.path.join(tmp, "model.pkl")
+            joblib.dump(model, pkl)
+            print(f"{'variant':16s} {'MB':>7s} {'size':>6s} {'load ms':>8s} {'heap MB':>8s} "
+                  f"{'agree':>7s} {'acc':>7s} {'d acc':>7s}")
+            for i, (name, options) in enumerate(variants):
+                path = os.path.join(tmp, f"model-{i}.wtm")
+                export_model(model, path, **options)
+                r = compare(pkl, path, X_test, y_test)
+                if name == "exact":
+                    print(f"{'pickle':16s} {r['pickle_mb']:7.2f} {'':6s} {r['pickle_load_ms']:8.1f} "
+                          f"{r['pickle_heap_mb']:8.2f} {'':7s} {r['pickle_accuracy']:7.2%}")
+                print(f"{name:16s} {r['artifact_mb']:7.2f} {r['artifact_mb'] / r['pickle_mb']:6.1%} "
+                      f"{r['artifact_load_ms']:8.2f} {r['artifact_heap_mb']:8.2f} {r['agreement']:7.2%} "
+                      f"{r['artifact_accuracy']:7.2%} {(r['artifact_accuracy'] - r['pickle_accuracy']) * 100:+7.2f}")
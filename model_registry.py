@@ -0,0 +1,314 @@
+"""
+Model registry: lists classifier artifacts, loads them in the background and
+hot-swaps them into a running SignRecognizer.
+
+Artifacts are pickles (`.pkl`/`.joblib`) or compact `.wtm` files written by
+model_artifact; when both exist for one model the `.wtm` is preferred, since it
+loads in milliseconds. Every artifact may have a `<artifact>.json` sidecar with
+its metadata (classes, feature schema, size, measured latency). Sidecars are
+written by `save_model()` at training time and refreshed whenever a model is
+loaded, so listing the registry never unpickles a forest.
+
+Loading happens on a worker thread (joblib memory-maps the tree arrays, so
+processes loading the same file share those pages); the finished engine is
+queued on the recognizer and installed by its inference thread between two
+frames. `ModelWatcher` polls the models directory and picks up freshly
+trained models the same way.
+
+    python model_registry.py            # list models with metadata
+    python model_registry.py --measure  # (re)measure load time and latency
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+MODELS_DIR = "models"
+ARTIFACT_EXTS = (".pkl", ".joblib", ".wtm")
+POLL_INTERVAL = 2.0
+
+
+def sidecar_path(path: str) -> str:
+    return path + ".json"
+
+
+def compact_sibling(path: str) -> str:
+    """The `.wtm` export of a pickle if it exists and is at least as new, else `path`."""
+    from model_artifact import artifact_path
+    wtm = artifact_path(path)
+    if wtm != path and os.path.exists(wtm) and os.path.exists(path) \
+            and os.path.getmtime(wtm) >= os.path.getmtime(path):
+        return wtm
+    return path
+
+
+def read_model(path: str, mmap: bool = True):
+    """Load a pickle, or a `.wtm` artifact (returned as its CompiledForest)."""
+    if path.endswith(".wtm"):
+        from model_artifact import load_artifact
+        return load_artifact(path, mmap=mmap)
+    import joblib
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def feature_schema(n_features: int) -> str:
+    from utils_landmarks import FEATURE_DIM, RAW_DIM
+    return {RAW_DIM: "raw", FEATURE_DIM: "hand"}.get(n_features, "unknown")
+
+
+class ModelInfo:
+    """Metadata for one model artifact."""
+
+    def __init__(self, path: str, **meta):
+        self.path = path
+        self.name = os.path.basename(path)
+        st = os.stat(path)
+        self.size = st.st_size
+        self.mtime = st.st_mtime
+        self.meta = meta
+
+    @property
+    def classes(self) -> Optional[List[str]]:
+        return self.meta.get("classes")
+
+    @property
+    def schema(self) -> str:
+        return self.meta.get("feature_schema", "unknown")
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        return self.meta.get("latency_ms")
+
+    @property
+    def stale(self) -> bool:
+        """True when the sidecar describes an older version of the artifact."""
+        return self.meta.get("artifact_mtime") != self.mtime or self.meta.get("artifact_size") != self.size
+
+    def __repr__(self):
+        lat = f"{self.latency_ms:.3f} ms" if self.latency_ms is not None else "?"
+        n = len(self.classes) if self.classes else "?"
+        return f"ModelInfo({self.name}, {self.size / 1e6:.1f} MB, {n} classes, {self.schema}, {lat})"
+
+
+def read_info(path: str) -> ModelInfo:
+    meta = {}
+    try:
+        with open(sidecar_path(path)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+    return ModelInfo(path, **meta)
+
+
+def write_info(path: str, **meta) -> ModelInfo:
+    """Write (merge) the sidecar for `path`, stamped with the artifact's current size and mtime."""
+    info = read_info(path)
+    info.meta.update(meta, artifact_size=info.size, artifact_mtime=info.mtime)
+    tmp = sidecar_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(info.meta, f, indent=4)
+    os.replace(tmp, sidecar_path(path))
+    return info
+
+
+def save_model(model, path: str, **meta) -> ModelInfo:
+    """
+    Dump a fitted model atomically (so a watcher never sees half a file) plus its sidecar.
+
+    Extra keyword arguments (sample count, accuracy, ...) are stored in the sidecar.
+    """
+    import joblib
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+    n_features = int(getattr(model, "n_features_in_", 0))
+    return write_info(path, classes=[str(c) for c in getattr(model, "classes_", [])], n_features=n_features,
+                      feature_schema=feature_schema(n_features), kind=type(model).__name__,
+                      trained_at=time.time(), **meta)
+
+
+def load_model(path: str, mmap: bool = True):
+    """
+    Load an artifact, measure it, and compile its inference engine.
+
+    Returns:
+        (model, engine, info): `info` carries the measured load time and per-frame latency.
+    """
+    from forest_engine import compile_model
+    from utils_landmarks import FEATURE_DIM, RAW_DIM
+
+    t0 = time.perf_counter()
+    model = read_model(path, mmap=mmap)
+    engine = compile_model(model)
+    load_ms = (time.perf_counter() - t0) * 1000
+    n_features = int(engine.n_features_in_)
+    if n_features not in (RAW_DIM, FEATURE_DIM):
+        raise ValueError(f"{os.path.basename(path)} expects {n_features} features; "
+                         f"the recognizer produces {RAW_DIM} (raw) or {FEATURE_DIM} (hand)")
+
+    x = np.random.default_rng(0).random((1, n_features), dtype=np.float32)
+    engine.predict_one(x)
+    samples = []
+    for _ in range(50):
+        t = time.perf_counter()
+        engine.predict_one(x)
+        samples.append(time.perf_counter() - t)
+    info = write_info(path, classes=[str(c) for c in engine.classes_], n_features=n_features,
+                      feature_schema=feature_schema(n_features), kind=type(model).__name__,
+                      load_ms=round(load_ms, 1), latency_ms=round(float(np.median(samples)) * 1000, 4))
+    return model, engine, info
+
+
+class ModelLoad:
+    """Handle for a background load; poll `done` from a UI timer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = threading.Event()
+        self.info: Optional[ModelInfo] = None
+        self.error: Optional[Exception] = None
+
+
+class ModelRegistry:
+    def __init__(self, models_dir: str = MODELS_DIR):
+        self.models_dir = models_dir
+
+    def paths(self) -> List[str]:
+        if not os.path.isdir(self.models_dir):
+            return []
+        return sorted(os.path.join(self.models_dir, f) for f in os.listdir(self.models_dir)
+                      if f.endswith(ARTIFACT_EXTS))
+
+    def list(self) -> List[ModelInfo]:
+        """Every artifact with its sidecar metadata, newest first."""
+        return sorted((read_info(p) for p in self.paths()), key=lambda i: i.mtime, reverse=True)
+
+    def latest(self) -> Optional[ModelInfo]:
+        models = self.list()
+        return models[0] if models else None
+
+    def resolve(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        `path` if it exists (or its fresher `.wtm` export), else the newest artifact
+        in the registry, else `path` unchanged.
+        """
+        if path and os.path.exists(path):
+            return compact_sibling(path)
+        latest = self.latest()
+        if latest is not None:
+            if path:
+                print(f"Model {path} not found; using {latest.path}")
+            return latest.path
+        return path
+
+    def load_into(self, recognizer, path: str, mmap: bool = True,
+                  on_done: Optional[Callable[[ModelLoad], None]] = None) -> ModelLoad:
+        """
+        Load `path` on a background thread and queue it on `recognizer`.
+
+        The swap itself happens on the recognizer's inference thread before its
+        next frame, so the frame loop never waits on unpickling or compiling.
+        """
+        job = ModelLoad(path)
+
+        def work():
+            try:
+                model, engine, job.info = load_model(path, mmap=mmap)
+                recognizer.swap_model(model, engine, path)
+            except Exception as e:
+                job.error = e
+            job.done.set()
+            if on_done:
+                on_done(job)
+
+        threading.Thread(target=work, name="model-load", daemon=True).start()
+        return job
+
+
+class ModelWatcher:
+    """
+    Polls the models directory and loads any artifact that was added or changed.
+
+    A file is only picked up once its size and mtime are unchanged across two
+    polls, so a model still being written is never loaded. A pickle and its
+    `.wtm` export changing together load once, from the `.wtm`.
+    """
+
+    def __init__(self, recognizer, registry: Optional[ModelRegistry] = None, interval: float = POLL_INTERVAL,
+                 on_swap: Optional[Callable[[ModelLoad], None]] = None):
+        self.recognizer = recognizer
+        self.registry = registry or ModelRegistry()
+        self.interval = interval
+        self.on_swap = on_swap
+        self._seen: Dict[str, tuple] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        snap = {}
+        for p in self.registry.paths():
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            snap[p] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def start(self) -> "ModelWatcher":
+        self._seen = self._snapshot()
+        self._thread = threading.Thread(target=self._run, name="model-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        pending = {}
+        while not self._stop.wait(self.interval):
+            snap = self._snapshot()
+            ready = []
+            for path, sig in snap.items():
+                if self._seen.get(path) == sig:
+                    pending.pop(path, None)
+                elif pending.get(path) == sig:
+                    # Stable for a full interval: load it
+                    self._seen[path] = sig
+                    del pending[path]
+                    ready.append(path)
+                else:
+                    pending[path] = sig
+            for path in dict.fromkeys(compact_sibling(p) for p in ready):
+                print(f"New model detected: {path}")
+                self.registry.load_into(self.recognizer, path, on_done=self._done)
+
+    def _done(self, job: ModelLoad):
+        if job.error is not None:
+            print(f"Model {job.path} not loaded: {job.error}")
+        else:
+            print(f"Model loaded, swapping in on the next frame: {job.info}")
+        if self.on_swap:
+            self.on_swap(job)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List classifier models")
+    parser.add_argument("--dir", default=MODELS_DIR)
+    parser.add_argument("--measure", action="store_true", help="load each model to refresh its metadata")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.dir)
+    for info in registry.list():
+        if args.measure or info.stale:
+            try:
+                info = load_model(info.path)[2]
+            except Exception as e:
+                print(f"{info.name}: failed to load ({e})")
+                continue
+        print(f"{info}  load {info.meta.get('load_ms', '?')} ms")
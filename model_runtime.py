@@ -1,14 +1,16 @@
-import joblib
-import numpy as np
+from recognizer import SignRecognizer
 
 MODEL_PATH = "data/models/sign_classifier.pkl"
 
-class GestureRecognizer:
-    def __init__(self):
-        self.model = joblib.load(MODEL_PATH)
+
+class GestureRecognizer(SignRecognizer):
+    """Landmark-only wrapper kept for older callers; shares SignRecognizer's compiled classifier."""
+
+    def __init__(self, model_path: str = MODEL_PATH):
+        super().__init__(model_path)
+        self.engine
 
     def predict(self, landmarks):
         if landmarks is None:
             return None
-        landmarks = np.array(landmarks).reshape(1, -1)
-        return self.model.predict(landmarks)[0]
+        return self.classify(landmarks)[0]
@@ -0,0 +1,173 @@
+"""
+Candidate search for the sign classifier.
+
+Cross-validates a few model families in parallel (every (candidate, fold)
+pair is its own job), refits each on all data, and measures what matters at
+runtime through the same inference engines the app uses: per-frame latency,
+batch throughput, artifact size and load time. `select()` then picks the
+most accurate candidate whose per-frame latency fits the budget.
+"""
+from __future__ import annotations
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LATENCY_BUDGET_MS = 2.0
+CV_FOLDS = 5
+LATENCY_RUNS = 200
+THROUGHPUT_ROWS = 10_000
+
+
+def make_candidates(seed: int = 42) -> Dict[str, object]:
+    """Unfitted estimators, keyed by report name."""
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return {
+        "rf-50-d12": RandomForestClassifier(n_estimators=50, max_depth=12, random_state=seed),
+        "rf-100-d16": RandomForestClassifier(n_estimators=100, max_depth=16, random_state=seed),
+        "rf-200": RandomForestClassifier(n_estimators=200, random_state=seed),
+        "extra-100": ExtraTreesClassifier(n_estimators=100, random_state=seed),
+        "logreg": make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000)),
+        "knn-5": make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=5)),
+        "mlp-128": make_pipeline(StandardScaler(), MLPClassifier(hidden_layer_sizes=(128,), max_iter=500,
+                                                                 early_stopping=True, random_state=seed)),
+    }
+
+
+def _fit_score(estimator, X, y, train, test) -> float:
+    from sklearn.base import clone
+    model = clone(estimator).fit(X[train], y[train])
+    return float((model.predict(X[test]) == y[test]).mean())
+
+
+def _fit(estimator, X, y):
+    from sklearn.base import clone
+    return clone(estimator).fit(X, y)
+
+
+def _splits(X, y, groups, folds: int, seed: int):
+    """Stratified folds; grouped by collection session when sessions are known, since
+    consecutive frames of one session are near-duplicates and would leak across folds."""
+    from sklearn.model_selection import StratifiedGroupKFold, StratifiedKFold
+    if groups is not None and len(np.unique(groups)) >= folds:
+        return list(StratifiedGroupKFold(folds, shuffle=True, random_state=seed).split(X, y, groups))
+    return list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+
+
+def measure(model, X: np.ndarray) -> dict:
+    """Runtime cost of a fitted model through forest_engine (as used by SignRecognizer)."""
+    import joblib
+    from forest_engine import compile_model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(model, path)
+        size = os.path.getsize(path)
+        t0 = time.perf_counter()
+        engine = compile_model(joblib.load(path, mmap_mode="r"))
+        load_ms = (time.perf_counter() - t0) * 1000
+
+    rows = X[np.random.default_rng(0).integers(len(X), size=LATENCY_RUNS)].astype(np.float32)
+    engine.predict_one(rows[:1])
+    samples = []
+    for i in range(LATENCY_RUNS):
+        t = time.perf_counter()
+        engine.predict_one(rows[i:i + 1])
+        samples.append(time.perf_counter() - t)
+    p50, p95 = np.percentile(np.array(samples) * 1000, [50, 95])
+
+    batch = np.resize(X.astype(np.float32), (THROUGHPUT_ROWS, X.shape[1]))
+    t0 = time.perf_counter()
+    engine.predict_with_proba(batch)
+    throughput = THROUGHPUT_ROWS / (time.perf_counter() - t0)
+    return {"latency_p50_ms": float(p50), "latency_p95_ms": float(p95), "throughput": float(throughput),
+            "size_mb": size / 1e6, "load_ms": float(load_ms)}
+
+
+def search(X: np.ndarray, y: np.ndarray, groups: Optional[np.ndarray] = None,
+           candidates: Optional[Dict[str, object]] = None, folds: int = CV_FOLDS,
+           n_jobs: int = -1, seed: int = 42) -> List[dict]:
+    """
+    Cross-validate and measure every candidate.
+
+    Returns:
+        List[dict]: one report row per candidate (name, cv accuracy mean/std, fit time,
+                    runtime measurements, and the refitted `model`).
+    """
+    from joblib import Parallel, delayed
+
+    candidates = candidates or make_candidates(seed)
+    names = list(candidates)
+    splits = _splits(X, y, groups, folds, seed)
+    print(f"[SELECT] {len(names)} candidates x {len(splits)} folds on {len(X)} samples")
+
+    t0 = time.perf_counter()
+    scores = Parallel(n_jobs=n_jobs)(delayed(_fit_score)(candidates[n], X, y, tr, te)
+                                     for n in names for tr, te in splits)
+    t_cv = time.perf_counter() - t0
+
+    fit_times = {}
+
+    def timed_fit(name):
+        t = time.perf_counter()
+        model = _fit(candidates[name], X, y)
+        return model, time.perf_counter() - t
+
+    fitted = Parallel(n_jobs=n_jobs, prefer="processes")(delayed(timed_fit)(n) for n in names)
+    models = {}
+    for n, (model, secs) in zip(names, fitted):
+        models[n], fit_times[n] = model, secs
+    print(f"[SELECT] Cross-validation {t_cv:.1f}s, refits done")
+
+    report = []
+    for i, name in enumerate(names):
+        acc = np.array(scores[i * len(splits):(i + 1) * len(splits)])
+        row = {"name": name, "cv_accuracy": float(acc.mean()), "cv_std": float(acc.std()),
+               "fit_s": fit_times[name]}
+        row.update(measure(models[name], X))  # sequential, so timings don't contend
+        row["model"] = models[name]
+        report.append(row)
+    return report
+
+
+def select(report: List[dict], budget_ms: float = LATENCY_BUDGET_MS) -> dict:
+    """Most accurate candidate with p95 per-frame latency within budget (fastest if none fit)."""
+    fits = [r for r in report if r["latency_p95_ms"] <= budget_ms]
+    if not fits:
+        best = min(report, key=lambda r: r["latency_p95_ms"])
+        print(f"[SELECT] No candidate fits {budget_ms} ms; falling back to the fastest ({best['name']})")
+        return best
+    return max(fits, key=lambda r: (round(r["cv_accuracy"], 4), -r["latency_p95_ms"]))
+
+
+def format_report(report: List[dict], chosen: Optional[dict] = None, budget_ms: Optional[float] = None) -> str:
+    lines = [f"{'model':12s} {'cv acc':>12s} {'p50 ms':>7s} {'p95 ms':>7s} {'rows/s':>10s} "
+             f"{'size MB':>8s} {'load ms':>8s} {'fit s':>6s}"]
+    for r in sorted(report, key=lambda r: -r["cv_accuracy"]):
+        mark = " *" if chosen is r else ("  " if budget_ms is None or r["latency_p95_ms"] <= budget_ms else " x")
+        lines.append(f"{r['name']:12s} {r['cv_accuracy']:6.2%} ±{r['cv_std']:4.1%} {r['latency_p50_ms']:7.3f} "
+                     f"{r['latency_p95_ms']:7.3f} {r['throughput']:10,.0f} {r['size_mb']:8.2f} "
+                     f"{r['load_ms']:8.1f} {r['fit_s']:6.1f}{mark}")
+    if budget_ms is not None:
+        lines.append(f"(* chosen, x over the {budget_ms} ms per-frame budget)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Smoke run on synthetic hand-like data
+    rng = np.random.default_rng(0)
+    centers = rng.random((10, 63))
+    labels = rng.integers(10, size=3000)
+    X = (centers[labels] + rng.normal(0, 0.08, (3000, 63))).astype(np.float32)
+    y = np.array([chr(65 + l) for l in labels])
+    report = search(X, y, groups=rng.integers(8, size=len(X)), folds=3)
+    chosen = select(report, LATENCY_BUDGET_MS)
+    print(format_report(report, chosen, LATENCY_BUDGET_MS))
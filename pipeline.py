@@ -0,0 +1,214 @@
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import cv2
+
+from instrumentation import PROFILER
+
+
+class LatestQueue:
+    """
+    Bounded hand-off queue between pipeline stages.
+
+    When the queue is full the oldest item is dropped, so a slow consumer
+    always sees the newest frame instead of working through a backlog.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Block until an item is available; returns None on timeout."""
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def get_latest(self) -> Optional[Any]:
+        """Non-blocking: return the newest item (discarding older ones) or None."""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+
+class StageStats:
+    """
+    Rolling throughput and busy-time counters for one pipeline stage.
+
+    `tick()` runs on the stage's thread while `fps` / `busy_ms` are read from the
+    UI thread, so the window is guarded by a lock.
+    """
+
+    def __init__(self, name: str, window: float = 2.0):
+        self.name = name
+        self.window = window
+        self.count = 0
+        self._events = deque()  # (timestamp, busy seconds)
+        self._busy = 0.0        # sum of the busy seconds in the window
+        self._lock = threading.Lock()
+
+    def tick(self, busy: float = 0.0):
+        now = time.perf_counter()
+        with self._lock:
+            self.count += 1
+            self._events.append((now, busy))
+            self._busy += busy
+            while self._events and now - self._events[0][0] > self.window:
+                self._busy -= self._events.popleft()[1]
+
+    @property
+    def fps(self) -> float:
+        with self._lock:
+            if len(self._events) < 2:
+                return 0.0
+            span = self._events[-1][0] - self._events[0][0]
+            return (len(self._events) - 1) / span if span > 0 else 0.0
+
+    @property
+    def busy_ms(self) -> float:
+        with self._lock:
+            if not self._events:
+                return 0.0
+            return 1000.0 * max(self._busy, 0.0) / len(self._events)
+
+
+class FramePacket:
+    """A captured frame travelling through the pipeline."""
+
+    __slots__ = ("frame_id", "captured_at", "frame", "result", "infer_ms")
+
+    def __init__(self, frame_id: int, captured_at: float, frame):
+        self.frame_id = frame_id
+        self.captured_at = captured_at
+        self.frame = frame
+        self.result = None
+        self.infer_ms = 0.0
+
+
+class _StageThread(threading.Thread):
+    def __init__(self, name: str):
+        super().__init__(name=name, daemon=True)
+        self._running = threading.Event()
+
+    def stop(self):
+        self._running.clear()
+
+
+class CaptureWorker(_StageThread):
+    """Reads frames from `cap` as fast as the camera delivers them."""
+
+    def __init__(self, cap, out_q: LatestQueue, stats: StageStats, flip: bool = True):
+        super().__init__("capture")
+        self.cap = cap
+        self.out_q = out_q
+        self.stats = stats
+        self.flip = flip
+
+    def run(self):
+        self._running.set()
+        frame_id = 0
+        while self._running.is_set():
+            t0 = time.perf_counter()
+            with PROFILER.stage("cap.read"):
+                ret, frame = self.cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            if self.flip:
+                with PROFILER.stage("flip"):
+                    frame = cv2.flip(frame, 1)
+            self.out_q.put(FramePacket(frame_id, t0, frame))
+            frame_id += 1
+            self.stats.tick(time.perf_counter() - t0)
+
+
+class InferenceWorker(_StageThread):
+    """Runs `infer_fn(frame)` on the newest captured frame and publishes the result."""
+
+    def __init__(self, in_q: LatestQueue, out_q: LatestQueue, stats: StageStats,
+                 infer_fn: Callable[[Any], Any]):
+        super().__init__("inference")
+        self.in_q = in_q
+        self.out_q = out_q
+        self.stats = stats
+        self.infer_fn = infer_fn
+
+    def run(self):
+        self._running.set()
+        while self._running.is_set():
+            packet = self.in_q.get(timeout=0.1)
+            if packet is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                with PROFILER.stage("infer"):
+                    packet.result = self.infer_fn(packet.frame)
+            except Exception as e:
+                print(f"Inference error: {e}")
+                packet.result = None
+            busy = time.perf_counter() - t0
+            packet.infer_ms = busy * 1000.0
+            self.out_q.put(packet)
+            self.stats.tick(busy)
+
+
+class FramePipeline:
+    """
+    Capture -> inference -> render pipeline.
+
+    Capture and inference run on their own threads and are connected by
+    latest-frame-wins queues; the render step pulls the newest finished
+    packet with `latest()` from the UI thread and calls `render_done()`.
+    """
+
+    def __init__(self, cap, infer_fn: Callable[[Any], Any], flip: bool = True):
+        self.capture_q = LatestQueue(maxsize=1)
+        self.result_q = LatestQueue(maxsize=1)
+        self.capture_stats = StageStats("capture")
+        self.inference_stats = StageStats("inference")
+        self.render_stats = StageStats("render")
+        self._capture = CaptureWorker(cap, self.capture_q, self.capture_stats, flip=flip)
+        self._inference = InferenceWorker(self.capture_q, self.result_q, self.inference_stats, infer_fn)
+
+    def start(self):
+        self._capture.start()
+        self._inference.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._capture.stop()
+        self._inference.stop()
+        self._capture.join(timeout)
+        self._inference.join(timeout)
+
+    def latest(self) -> Optional[FramePacket]:
+        return self.result_q.get_latest()
+
+    def render_done(self, busy: float = 0.0):
+        self.render_stats.tick(busy)
+
+    def stats(self) -> dict:
+        return {
+            s.name: {"fps": s.fps, "busy_ms": s.busy_ms, "frames": s.count}
+            for s in (self.capture_stats, self.inference_stats, self.render_stats)
+        } | {"dropped": {"capture": self.capture_q.dropped, "inference": self.result_q.dropped}}
+
+    def summary(self) -> str:
+        return (f"Cam {self.capture_stats.fps:.0f} | "
+                f"Inf {self.inference_stats.fps:.0f} | "
+                f"UI {self.render_stats.fps:.0f} fps")
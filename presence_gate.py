@@ -0,0 +1,192 @@
+"""
+Hand-presence gating: stop running full hand tracking on every frame while
+nobody is signing.
+
+While a hand is in view every frame goes through the recognizer as usual.
+Once no hand has been seen for `idle_after` seconds the gate goes idle:
+
+- each frame is reduced to a tiny grayscale thumbnail and compared with the
+  previous one (a few microseconds);
+- a presence probe -- hand detection on a `probe_scale` downscaled frame --
+  runs when the thumbnail changes, and at least every `wake_latency` seconds
+  so a hand that appears without much motion is still found;
+- every other frame is skipped and reported as "no hand".
+
+When a probe finds a hand the gate wakes up and runs full inference on that
+same frame, so the decoder sees the sign from its first detected frame.
+
+    python presence_gate.py         # CPU per second idle vs. ungated, wake-up delay (simulated detector)
+"""
+from __future__ import annotations
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from instrumentation import PROFILER
+
+IDLE_AFTER_S = 2.0
+WAKE_LATENCY_S = 0.25
+PROBE_SCALE = 0.25
+MOTION_SIZE = (64, 36)
+MOTION_DIFF = 15      # per-pixel gray level change that counts as motion
+MOTION_SHARE = 0.01   # share of thumbnail pixels that must change to trigger a probe
+
+
+class PresenceGate:
+    """
+    Drop-in wrapper around a SignRecognizer's `infer()` (other attributes pass through).
+
+    Args:
+        recognizer: Anything with infer(frame) -> Prediction and detect(frame) -> landmarks or None.
+        idle_after (float): Seconds without a hand before switching to presence probes.
+        wake_latency (float): Longest gap between two presence probes while idle.
+        probe_scale (float): Downscale factor of the frame used for presence probes.
+        motion_share (float): Thumbnail change that triggers a probe right away (0 disables).
+    """
+
+    def __init__(self, recognizer, idle_after: float = IDLE_AFTER_S, wake_latency: float = WAKE_LATENCY_S,
+                 probe_scale: float = PROBE_SCALE, motion_share: float = MOTION_SHARE):
+        self.recognizer = recognizer
+        self.idle_after = idle_after
+        self.wake_latency = wake_latency
+        self.probe_scale = probe_scale
+        self.motion_share = motion_share
+        self.idle = False
+        self._last_hand: Optional[float] = None
+        self._last_probe = float("-inf")
+        self._idle_since = 0.0
+        self._thumb: Optional[np.ndarray] = None
+        self.frames = 0
+        self.tracked = 0
+        self.probes = 0
+        self.skipped = 0
+        self.wakeups = 0
+        self.idle_s = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.recognizer, name)
+
+    def _empty(self):
+        from recognizer import Prediction
+        return Prediction()
+
+    def _motion(self, frame) -> bool:
+        thumb = cv2.cvtColor(cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_NEAREST), cv2.COLOR_BGR2GRAY)
+        prev, self._thumb = self._thumb, thumb
+        if prev is None or not self.motion_share:
+            return False
+        return (cv2.absdiff(thumb, prev) > MOTION_DIFF).mean() >= self.motion_share
+
+    def _probe(self, frame) -> bool:
+        self.probes += 1
+        with PROFILER.stage("presence.probe"):
+            small = cv2.resize(frame, None, fx=self.probe_scale, fy=self.probe_scale, interpolation=cv2.INTER_AREA)
+            return self.recognizer.detect(small) is not None
+
+    def wake(self, t: Optional[float] = None):
+        """Return to full-rate tracking (e.g. when the user clicks into the window)."""
+        t = time.monotonic() if t is None else t
+        if self.idle:
+            self.idle = False
+            self.wakeups += 1
+            self.idle_s += t - self._idle_since
+            print(f"Presence: hand in view, tracking every frame (idle {t - self._idle_since:.1f}s)")
+        self._last_hand = t
+
+    def infer(self, frame_bgr, t: Optional[float] = None):
+        """Like SignRecognizer.infer(); skipped frames return an empty (no hand) Prediction."""
+        t = time.monotonic() if t is None else t
+        self.frames += 1
+        if self._last_hand is None:
+            self._last_hand = t
+
+        if self.idle:
+            moved = self._motion(frame_bgr)
+            if not moved and t - self._last_probe < self.wake_latency:
+                self.skipped += 1
+                return self._empty()
+            self._last_probe = t
+            if not self._probe(frame_bgr):
+                self.skipped += 1
+                return self._empty()
+            self.wake(t)
+
+        self.tracked += 1
+        pred = self.recognizer.infer(frame_bgr)
+        if pred.hand:
+            self._last_hand = t
+        elif t - self._last_hand >= self.idle_after:
+            self.idle = True
+            self._idle_since = self._last_probe = t
+            self._thumb = None
+            print(f"Presence: no hand for {self.idle_after:.1f}s, probing every {self.wake_latency:.2f}s")
+        return pred
+
+    def stats(self) -> dict:
+        return {"state": "idle" if self.idle else "tracking", "frames": self.frames, "tracked": self.tracked,
+                "probes": self.probes, "skipped": self.skipped, "wakeups": self.wakeups,
+                "idle_s": round(self.idle_s, 1)}
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------------------------
+class _SimulatedRecognizer:
+    """Stand-in for MediaPipe: cost grows with frame size, a bright patch counts as a hand."""
+
+    model_version = 0
+    classes = np.array(["A"])
+
+    def detect(self, frame):
+        blurred = frame
+        for _ in range(4):
+            blurred = cv2.GaussianBlur(blurred, (9, 9), 0)
+        return np.zeros((21, 3), np.float32) if blurred.max() > 200 else None
+
+    def infer(self, frame):
+        from recognizer import Prediction
+        lm = self.detect(frame)
+        return Prediction("A", 1.0, np.ones(1), (0, 0, 1, 1), lm) if lm is not None else Prediction()
+
+
+if __name__ == "__main__":
+    fps, seconds = 30, 20
+    rng = np.random.default_rng(0)
+    background = rng.integers(40, 120, (720, 1280, 3), dtype=np.uint8)
+    hand_at = [(0.0, 3.0), (14.3, 17.0)]  # hand visible in these intervals
+
+    def frames():
+        for i in range(fps * seconds):
+            t = i / fps
+            frame = background.copy()
+            frame[rng.integers(720, size=200), rng.integers(1280, size=200)] = 130  # sensor noise
+            if any(a <= t < b for a, b in hand_at):
+                cv2.circle(frame, (640, 360), 120, (230, 230, 230), -1)
+            yield t, frame
+
+    def run(model):
+        """CPU share of a core while nobody is in view (after the idle timeout), and wake-up delay."""
+        idle_cpu, first_seen = 0.0, None
+        idle_from, idle_to = hand_at[0][1] + IDLE_AFTER_S, hand_at[1][0]
+        for t, frame in frames():
+            c0 = time.process_time()
+            pred = model.infer(frame, t) if isinstance(model, PresenceGate) else model.infer(frame)
+            if idle_from <= t < idle_to:
+                idle_cpu += time.process_time() - c0
+            if pred.hand and t >= hand_at[1][0] and first_seen is None:
+                first_seen = t
+        return idle_cpu / (idle_to - idle_from) * 100, (first_seen - hand_at[1][0]) * 1000
+
+    print(f"{seconds}s of synthetic 720p at {fps} fps; hand visible {hand_at}")
+    print(f"{'mode':12s} {'wake s':>6s} {'motion':>6s} {'idle CPU':>9s} {'wake ms':>8s} {'skipped':>9s} {'probes':>6s}")
+    cpu, delay = run(_SimulatedRecognizer())
+    print(f"{'ungated':12s} {'':6s} {'':6s} {cpu:8.1f}% {delay:8.0f}")
+    for wake in (0.1, 0.25, 0.5):
+        for motion in (MOTION_SHARE, 0.0):
+            gate = PresenceGate(_SimulatedRecognizer(), wake_latency=wake, motion_share=motion)
+            cpu, delay = run(gate)
+            s = gate.stats()
+            print(f"{'gated':12s} {wake:6.2f} {'on' if motion else 'off':>6s} {cpu:8.1f}% {delay:8.0f} "
+                  f"{s['skipped']:4d}/{s['frames']:<4d} {s['probes']:6d}")
@@ -0,0 +1,433 @@
+"""
+Process-isolated capture -> inference -> render pipeline.
+
+Capture and inference each run in their own process, so MediaPipe and the
+classifier never compete with the UI thread for the GIL. Frames travel
+through a `multiprocessing.shared_memory` ring buffer instead of being
+pickled: the capture process writes (and mirrors) each frame straight into
+the next slot and publishes its sequence number; readers copy the newest
+slot out and re-check the sequence number to detect a frame that was
+overwritten mid-copy. Only small results -- the Prediction (landmarks,
+label, probabilities) and timings -- come back over a queue.
+
+`ProcessPipeline` has the same interface as `pipeline.FramePipeline`, so the
+GUI can switch execution modes without changes to its render loop.
+
+    python process_pipeline.py          # UI frame rate: threads vs processes under GIL-heavy inference
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from instrumentation import PROFILER
+from pipeline import FramePacket, StageStats
+
+RING_SLOTS = 4
+MAX_SHAPE = (1080, 1920, 3)
+
+# Header layout (int64): [latest seq, frames written, capture busy ns, reserved]
+# followed by one (seq, height, width, captured_at ns) record per slot
+_HDR = 4
+_SLOT_META = 4
+
+
+class FrameRing:
+    """
+    Fixed-size ring of frame slots in shared memory, single writer, many readers.
+
+    A slot's sequence number is set to -1 while it is being written, so a reader
+    that sees the same (non-negative) sequence number before and after copying
+    knows the copy is consistent.
+    """
+
+    def __init__(self, name: Optional[str] = None, slots: int = RING_SLOTS, max_shape=MAX_SHAPE):
+        self.slots = slots
+        self.max_shape = tuple(max_shape)
+        self.slot_bytes = int(np.prod(self.max_shape))
+        meta_bytes = 8 * (_HDR + slots * _SLOT_META)
+        self._data_offset = (meta_bytes + 63) // 64 * 64
+        size = self._data_offset + slots * self.slot_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.name = self.shm.name
+        self._meta = np.ndarray(_HDR + slots * _SLOT_META, dtype=np.int64, buffer=self.shm.buf)
+        self._slots = self._meta[_HDR:].reshape(slots, _SLOT_META)
+        if self.owner:
+            self._meta[:] = 0
+            self._meta[0] = -1
+            self._slots[:, 0] = -1
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self._meta[0])
+
+    @property
+    def frames_written(self) -> int:
+        return int(self._meta[1])
+
+    def _view(self, slot: int, h: int, w: int) -> np.ndarray:
+        return np.ndarray((h, w, 3), dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self._data_offset + slot * self.slot_bytes)
+
+    def write(self, frame: np.ndarray, captured_at: float, flip: bool = False) -> int:
+        """Copy (optionally mirroring, in the same pass) a BGR frame into the next slot."""
+        h, w = frame.shape[:2]
+        if h * w * 3 > self.slot_bytes:
+            raise ValueError(f"frame {w}x{h} exceeds the ring's {self.max_shape[1]}x{self.max_shape[0]} slots")
+        t0 = time.perf_counter_ns()
+        seq = int(self._meta[0]) + 1
+        slot = seq % self.slots
+        rec = self._slots[slot]
+        rec[0] = -1
+        dst = self._view(slot, h, w)
+        if flip:
+            cv2.flip(frame, 1, dst=dst)
+        else:
+            np.copyto(dst, frame)
+        rec[1], rec[2], rec[3] = h, w, int(captured_at * 1e9)
+        rec[0] = seq
+        self._meta[0] = seq
+        self._meta[1] += 1
+        self._meta[2] += time.perf_counter_ns() - t0
+        return seq
+
+    def read(self, after: int = -1, out: Optional[np.ndarray] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Copy out the newest frame if its sequence number is greater than `after`.
+
+        Returns:
+            (seq, captured_at, frame) or None. `out` is reused when it has the right shape.
+        """
+        for _ in range(3):
+            seq = int(self._meta[0])
+            if seq <= after:
+                return None
+            rec = self._slots[seq % self.slots]
+            if rec[0] != seq:
+                continue
+            h, w, t_ns = int(rec[1]), int(rec[2]), int(rec[3])
+            src = self._view(seq % self.slots, h, w)
+            if out is None or out.shape != src.shape:
+                out = np.empty_like(src)
+            np.copyto(out, src)
+            if rec[0] == seq:
+                return seq, t_ns / 1e9, out
+        return None
+
+    def close(self):
+        self._meta = self._slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Spawned children share the parent's resource tracker, so the extra registration
+        # is a no-op and the block is still unlinked exactly once, by its creator
+        return shared_memory.SharedMemory(name=name)
+
+
+# ------------------------------------------------------------------------------------
+# Child processes
+# ------------------------------------------------------------------------------------
+def _capture_main(source_spec, source_kwargs, ring_name: str, slots: int, max_shape, flip: bool, new_frame,
+                  results, stop):
+    from frame_source import open_source
+    ring = FrameRing(ring_name, slots, max_shape)
+    cap = None
+    try:
+        cap = open_source(source_spec, realtime=True, **source_kwargs)
+        while not stop.is_set():
+            with PROFILER.stage("cap.read"):
+                ok, frame = cap.read()
+            if not ok:
+                if not getattr(cap, "live", False):
+                    break
+                time.sleep(0.01)
+                continue
+            with PROFILER.stage("ring.write"):
+                ring.write(frame, time.monotonic(), flip=flip)
+            new_frame.set()
+    except Exception as e:
+        results.put(("error", "capture", repr(e)))  # e.g. a frame larger than the ring's slots
+    finally:
+        if cap is not None:
+            cap.release()
+        ring.close()
+        PROFILER.export(prefix="trace-capture")  # each process keeps its own trace
+
+
+def recognizer_factory(model_path: Optional[str] = None, watch: bool = False, presence_gate: bool = False,
+                       governor: bool = False):
+    """Default inference backend: a SignRecognizer built inside the inference process."""
+    from recognizer import SignRecognizer
+    recognizer = SignRecognizer(model_path).load(warm_up=True)
+    if watch:
+        from model_registry import ModelWatcher
+        ModelWatcher(recognizer).start()
+    model = recognizer
+    if governor:
+        from latency_governor import LatencyGovernor
+        model = LatencyGovernor(model)
+    if presence_gate:
+        from presence_gate import PresenceGate
+        model = PresenceGate(model)
+    return model
+
+
+def _inference_main(factory, factory_args, ring_name: str, slots: int, max_shape, new_frame, results, stop):
+    ring = FrameRing(ring_name, slots, max_shape)
+    try:
+        model = factory(*factory_args)
+        version = None
+        tier = None
+        last_seq = -1
+        frame = None
+        while not stop.is_set():
+            if not new_frame.wait(0.1):
+                continue
+            new_frame.clear()
+            with PROFILER.stage("ring.read"):
+                got = ring.read(last_seq, frame)
+            if got is None:
+                continue
+            last_seq, captured_at, frame = got
+            t0 = time.perf_counter()
+            with PROFILER.stage("infer"):
+                pred = model.infer(frame)
+            infer_ms = (time.perf_counter() - t0) * 1000
+            if model.model_version != version:
+                version = model.model_version
+                results.put(("model", version, [str(c) for c in model.classes]))
+            current = getattr(model, "tier", None)  # quality tier, when a LatencyGovernor is in the chain
+            if current is not None and current.name != tier:
+                tier = current.name
+                results.put(("tier", tier))
+            if pred.landmarks is not None:
+                pred.landmarks = np.array(pred.landmarks)  # detach from the recognizer's ring buffer
+            results.put(("result", last_seq, captured_at, pred, infer_ms))
+    except Exception as e:
+        results.put(("error", "inference", repr(e)))
+    finally:
+        ring.close()
+        PROFILER.export(prefix="trace-inference")
+
+
+# ------------------------------------------------------------------------------------
+# GUI side
+# ------------------------------------------------------------------------------------
+class ProcessPipeline:
+    """
+    Drop-in replacement for FramePipeline that runs capture and inference in child processes.
+
+    `latest()` returns the newest captured frame (copied out of the ring) together
+    with the newest inference result, so the UI renders at camera rate even when
+    inference is slower. Every result is passed to `on_result` (on a receiver
+    thread, in order) -- use it for anything that must see all frames, like the
+    commit decoder. `classes` / `model_version` follow the inference process's model,
+    `tier` its latency governor's quality tier (if enabled). `error` is set, and
+    printed, when either child process fails or dies.
+    """
+
+    def __init__(self, source_spec=0, model_path: Optional[str] = None, flip: bool = True,
+                 on_result: Optional[Callable[[Any], None]] = None, watch: bool = False,
+                 slots: int = RING_SLOTS, max_shape=MAX_SHAPE, source_kwargs: Optional[dict] = None,
+                 factory=recognizer_factory, factory_args=None, presence_gate: bool = False,
+                 governor: bool = False):
+        self.ctx = mp.get_context("spawn")
+        self.ring = FrameRing(None, slots, max_shape)
+        self.on_result = on_result
+        self.classes = []
+        self.model_version = -1
+        self.tier = None
+        self.error = None
+        self._new_frame = self.ctx.Event()
+        self._stop = self.ctx.Event()
+        self._results = self.ctx.Queue()
+        args = (self.ring.name, slots, tuple(max_shape))
+        self._capture = self.ctx.Process(target=_capture_main, name="capture", daemon=True,
+                                         args=(source_spec, source_kwargs or {}) + args
+                                         + (flip, self._new_frame, self._results, self._stop))
+        self._inference = self.ctx.Process(
+            target=_inference_main, name="inference", daemon=True,
+            args=(factory, factory_args if factory_args is not None else (model_path, watch, presence_gate, governor))
+            + args + (self._new_frame, self._results, self._stop))
+        self._receiver = threading.Thread(target=self._receive, name="results", daemon=True)
+        self._result = None
+        self._result_ms = 0.0
+        self._last_seq = -1
+        self._frame = None
+        self._cap_sample = (time.perf_counter(), 0)
+        self._cap_fps = 0.0
+        self.capture_stats = StageStats("capture")
+        self.inference_stats = StageStats("inference")
+        self.render_stats = StageStats("render")
+        self.ready = threading.Event()
+
+    def start(self):
+        self._inference.start()
+        self._capture.start()
+        self._receiver.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        for p in (self._capture, self._inference):
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._receiver.join(timeout)
+        self.ring.close()
+
+    def _receive(self):
+        while not self._stop.is_set():
+            try:
+                msg = self._results.get(timeout=0.1)
+            except queue.Empty:
+                self._check_children()
+                continue
+            if msg[0] == "result":
+                _, seq, captured_at, pred, infer_ms = msg
+                self._result, self._result_ms = pred, infer_ms
+                self.inference_stats.tick(infer_ms / 1000.0)
+                if self.on_result is not None:
+                    self.on_result(pred)
+            elif msg[0] == "tier":
+                self.tier = msg[1]
+            elif msg[0] == "model":
+                self.model_version, self.classes = msg[1], msg[2]
+                self.ready.set()
+            else:
+                self._fail(msg[1], msg[2])
+
+    def _fail(self, stage: str, error: str):
+        if self.error is None:
+            self.error = f"{stage}: {error}"
+            print(f"{stage.capitalize()} process failed: {error}")
+        self.ready.set()
+
+    def _check_children(self):
+        # A crash that skipped the child's own error report (segfault, kill)
+        for p in (self._capture, self._inference):
+            if p.exitcode not in (None, 0) and not self._stop.is_set():
+                self._fail(p.name, f"exited with code {p.exitcode}")
+
+    def latest(self) -> Optional[FramePacket]:
+        got = self.ring.read(self._last_seq)
+        if got is None:
+            return None
+        self._last_seq, captured_at, frame = got
+        packet = FramePacket(self._last_seq, captured_at, frame)
+        packet.result = self._result
+        packet.infer_ms = self._result_ms
+        return packet
+
+    def render_done(self, busy: float = 0.0):
+        self.render_stats.tick(busy)
+
+    def _capture_rate(self) -> float:
+        now, count = time.perf_counter(), self.ring.frames_written
+        t_prev, c_prev = self._cap_sample
+        if now - t_prev >= 1.0:
+            self._cap_fps = (count - c_prev) / (now - t_prev)
+            self._cap_sample = (now, count)
+        return self._cap_fps
+
+    def stats(self) -> dict:
+        written = max(1, self.ring.frames_written)
+        return {
+            "capture": {"fps": self._capture_rate(), "busy_ms": self.ring._meta[2] / written / 1e6,
+                        "frames": self.ring.frames_written},
+            "inference": {"fps": self.inference_stats.fps, "busy_ms": self.inference_stats.busy_ms,
+                          "frames": self.inference_stats.count},
+            "render": {"fps": self.render_stats.fps, "busy_ms": self.render_stats.busy_ms,
+                       "frames": self.render_stats.count},
+            "mode": "processes",
+        }
+
+    def summary(self) -> str:
+        return (f"Cam {self._capture_rate():.0f} | "
+                f"Inf {self.inference_stats.fps:.0f} | "
+                f"UI {self.render_stats.fps:.0f} fps (proc)" + (f" | {self.tier}" if self.tier else ""))
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------------------------
+class _GilHeavyModel:
+    """Stand-in inference that holds the GIL like Python-side pre/post-processing does."""
+
+    model_version = 0
+    classes = ["A"]
+
+    def __init__(self, busy_ms: float):
+        self.busy_s = busy_ms / 1000.0
+
+    def infer(self, frame):
+        from recognizer import Prediction
+        t_end = time.perf_counter() + self.busy_s
+        x = 0
+        while time.perf_counter() < t_end:
+            x += 1
+        return Prediction("A", 1.0, np.ones(1, np.float32), (0, 0, 10, 10), None)
+
+
+def _gil_heavy_factory(busy_ms: float):
+    return _GilHeavyModel(busy_ms)
+
+
+def _render_loop(pipeline, seconds: float) -> float:
+    """Simulated UI thread: resize + colour-convert each new frame, polling like main.py does."""
+    t_end = time.perf_counter() + seconds
+    frames = 0
+    while time.perf_counter() < t_end:
+        packet = pipeline.latest()
+        if packet is None:
+            time.sleep(0.002)
+            continue
+        t0 = time.perf_counter()
+        small = cv2.resize(packet.frame, (960, 540))
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        pipeline.render_done(time.perf_counter() - t0)
+        frames += 1
+    return frames / seconds
+
+
+if __name__ == "__main__":
+    import os
+    from frame_source import SyntheticSource
+    from pipeline import FramePipeline
+
+    seconds, busy_ms = 4.0, 25.0
+    print(f"{os.cpu_count()} CPUs; synthetic 60 fps 720p camera, inference holds the GIL {busy_ms:.0f} ms/frame")
+
+    model = _GilHeavyModel(busy_ms)
+    threads = FramePipeline(SyntheticSource(1280, 720, n_frames=None, fps=60, realtime=True), model.infer)
+    threads.start()
+    time.sleep(0.5)
+    ui = _render_loop(threads, seconds)
+    print(f"  threads:   UI {ui:5.1f} fps | {threads.summary()}")
+    threads.stop()
+
+    procs = ProcessPipeline("synthetic", flip=True, max_shape=(720, 1280, 3),
+                            source_kwargs={"width": 1280, "height": 720, "n_frames": None, "fps": 60},
+                            factory=_gil_heavy_factory, factory_args=(busy_ms,))
+    procs.start()
+    procs.ready.wait(10)
+    time.sleep(0.5)
+    ui = _render_loop(procs, seconds)
+    print(f"  processes: UI {ui:5.1f} fps | {procs.summary()}")
+    procs.stop()
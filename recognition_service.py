@@ -0,0 +1,507 @@
+"""
+Local recognition service shared by several signing stations.
+
+One process owns the classifier; clients connect over a Unix socket (or
+localhost TCP) and send either landmark vectors or camera frames. Landmark
+requests from all connections are micro-batched: the batcher waits at most
+`max_wait_ms` after the oldest queued request (or until `max_batch` rows)
+and classifies everything in one vectorized call. Frames get a MediaPipe
+tracking graph per connection, so each station keeps its own hand tracking.
+
+    python recognition_service.py serve --address unix:/tmp/wavetome.sock --watch
+    python recognition_service.py bench --streams 1 4 16 64
+
+Client side:
+
+    with RecognitionClient("unix:/tmp/wavetome.sock") as client:
+        pred = client.classify(landmarks)      # (21, 3) or (63,)
+        pred = client.infer(frame_bgr)         # Prediction with box + landmarks
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from recognizer import Prediction
+
+DEFAULT_ADDRESS = "unix:/tmp/wavetome.sock" if hasattr(socket, "AF_UNIX") else "tcp:127.0.0.1:8765"
+MAX_BATCH = 256
+MAX_WAIT_MS = 2.0
+RAW_DIM = 63
+
+# Wire format: every message is a header followed by `length` body bytes
+_HEADER = struct.Struct("<IBI")        # body length, kind, request id
+_FRAME = struct.Struct("<HHB")         # height, width, encoding
+_RESULT = struct.Struct("<HHI")        # rows, classes, model version
+_HAND = struct.Struct("<B4h")          # hand found, box
+
+MSG_INFO, MSG_LANDMARKS, MSG_FRAME, MSG_STATS, MSG_ERROR = 1, 2, 3, 4, 255
+ENC_RAW, ENC_JPEG = 0, 1
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """'unix:/path', 'tcp:host:port' or 'host:port' -> (socket family, address)."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    if address.startswith("tcp:"):
+        address = address[4:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytearray]:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:])
+        if k == 0:
+            return None
+        got += k
+    return buf
+
+
+def send_message(sock: socket.socket, kind: int, req_id: int, *parts: bytes):
+    body_len = sum(len(p) for p in parts)
+    sock.sendall(b"".join((_HEADER.pack(body_len, kind, req_id),) + parts))
+
+
+def recv_message(sock: socket.socket) -> Optional[Tuple[int, int, bytearray]]:
+    """(kind, request id, body), or None when the peer closed the connection."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    length, kind, req_id = _HEADER.unpack(header)
+    body = _recv_exact(sock, length) if length else bytearray()
+    if body is None:
+        return None
+    return kind, req_id, body
+
+
+# ------------------------------------------------------------------------------------
+# Server
+# ------------------------------------------------------------------------------------
+class MicroBatcher:
+    """
+    Collects landmark rows from many connections and classifies them together.
+
+    A batch closes when it holds `max_batch` rows, when the oldest request in
+    it has waited `max_wait_ms`, or as soon as every streaming client has a
+    request in it -- connections send one request at a time, so nothing else
+    can arrive and a single station never pays the deadline.
+    """
+
+    def __init__(self, recognizer, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.recognizer = recognizer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.clients = 0
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.max_rows = 0
+        self.busy_s = 0.0
+
+    def start(self) -> "MicroBatcher":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def submit(self, rows: np.ndarray) -> Future:
+        """Queue (k, 63) float32 rows; the future resolves to ((k, K) proba, model version)."""
+        fut = Future()
+        self._queue.put((time.perf_counter(), rows, fut))
+        return fut
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            n = len(first[1])
+            deadline = first[0] + self.max_wait
+            while n < self.max_batch and len(batch) < self.clients:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n += len(item[1])
+            self._classify(batch, n)
+
+    def _classify(self, batch, n: int):
+        t0 = time.perf_counter()
+        try:
+            X = batch[0][1] if len(batch) == 1 else np.concatenate([rows for _, rows, _ in batch])
+            _, proba = self.recognizer.classify_batch(X)
+            version = self.recognizer.model_version
+        except Exception as e:
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+        start = 0
+        for _, rows, fut in batch:
+            fut.set_result((proba[start:start + len(rows)], version))
+            start += len(rows)
+        self.busy_s += time.perf_counter() - t0
+        self.requests += len(batch)
+        self.rows += n
+        self.batches += 1
+        self.max_rows = max(self.max_rows, n)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "rows": self.rows, "batches": self.batches,
+                "mean_batch_rows": self.rows / max(1, self.batches), "max_batch_rows": self.max_rows,
+                "classifier_busy_s": round(self.busy_s, 3)}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """One thread per client connection; requests on a connection are answered in order."""
+
+    def setup(self):
+        if self.request.family != getattr(socket, "AF_UNIX", None):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.hands = None
+        self.buffer = None
+        self.streaming = False
+
+    def _count(self, delta: int):
+        with self.server.lock:
+            self.server.service.batcher.clients += delta
+
+    def finish(self):
+        if self.streaming:
+            self._count(-1)
+        if self.hands is not None:
+            self.hands.close()
+
+    def handle(self):
+        service = self.server.service
+        while True:
+            msg = recv_message(self.request)
+            if msg is None:
+                return
+            kind, req_id, body = msg
+            if kind in (MSG_LANDMARKS, MSG_FRAME) and not self.streaming:
+                # Only connections that classify count towards closing a batch early
+                self.streaming = True
+                self._count(1)
+            try:
+                if kind == MSG_LANDMARKS:
+                    rows = np.frombuffer(body, dtype=np.float32).reshape(-1, RAW_DIM)
+                    send_message(self.request, MSG_LANDMARKS, req_id, self._predict(service, rows))
+                elif kind == MSG_FRAME:
+                    send_message(self.request, MSG_FRAME, req_id, *self._frame(service, body))
+                elif kind == MSG_INFO:
+                    send_message(self.request, MSG_INFO, req_id, json.dumps(service.info()).encode())
+                elif kind == MSG_STATS:
+                    send_message(self.request, MSG_STATS, req_id, json.dumps(service.batcher.stats()).encode())
+                else:
+                    raise ValueError(f"unknown message kind {kind}")
+            except Exception as e:
+                send_message(self.request, MSG_ERROR, req_id, str(e).encode())
+
+    @staticmethod
+    def _predict(service, rows: np.ndarray) -> bytes:
+        proba, version = service.batcher.submit(rows).result()
+        proba = np.ascontiguousarray(proba, dtype=np.float32)
+        labels = proba.argmax(axis=1).astype(np.int16)
+        return _RESULT.pack(len(proba), proba.shape[1], version) + labels.tobytes() + proba.tobytes()
+
+    def _frame(self, service, body: bytearray) -> Tuple[bytes, ...]:
+        import cv2
+        from utils_landmarks import LandmarkBuffer
+        h, w, enc = _FRAME.unpack_from(body)
+        data = np.frombuffer(body, dtype=np.uint8, offset=_FRAME.size)
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR) if enc == ENC_JPEG else data.reshape(h, w, 3)
+        if self.hands is None:
+            self.hands = service.recognizer.make_hands(static=False)
+            self.buffer = LandmarkBuffer()
+        results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return (_HAND.pack(0, 0, 0, 0, 0),)
+        pts = self.buffer.fill(results.multi_hand_landmarks[0])
+        box = self.buffer.box(frame.shape[1], frame.shape[0], service.recognizer.padding)
+        return _HAND.pack(1, *box), pts.tobytes(), self._predict(service, self.buffer.row())
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer if hasattr(socket, "AF_UNIX")
+                  else socketserver.TCPServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RecognitionService:
+    def __init__(self, recognizer, address: str = DEFAULT_ADDRESS, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS):
+        self.recognizer = recognizer
+        self.address = address
+        self.batcher = MicroBatcher(recognizer, max_batch, max_wait_ms)
+        family, addr = parse_address(address)
+        if family == getattr(socket, "AF_UNIX", None):
+            if os.path.exists(addr):
+                os.unlink(addr)
+            self.server = _UnixServer(addr, _Handler)
+        else:
+            self.server = _TCPServer(addr, _Handler)
+            if addr[1] == 0:
+                self.address = "tcp:%s:%d" % self.server.server_address[:2]
+        self.server.service = self
+        self.server.lock = threading.Lock()
+        self._thread = None
+
+    def info(self) -> dict:
+        return {"classes": [str(c) for c in self.recognizer.classes], "version": self.recognizer.model_version,
+                "model": self.recognizer.model_path, "max_batch": self.batcher.max_batch,
+                "max_wait_ms": self.batcher.max_wait * 1000}
+
+    def start(self) -> "RecognitionService":
+        """Serve on a background thread (for in-process use and benchmarks)."""
+        self.batcher.start()
+        self._thread = threading.Thread(target=self.server.serve_forever, name="recognition-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.batcher.start()
+        print(f"Recognition service on {self.address} ({len(self.recognizer.classes)} classes)")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._thread is not None:
+            self.server.shutdown()
+        self.server.server_close()
+        self.batcher.stop()
+        family, addr = parse_address(self.address)
+        if family == getattr(socket, "AF_UNIX", None) and os.path.exists(addr):
+            os.unlink(addr)
+
+
+# ------------------------------------------------------------------------------------
+# Client
+# ------------------------------------------------------------------------------------
+class ServiceError(RuntimeError):
+    pass
+
+
+class RecognitionClient:
+    """
+    Blocking client for one stream (not thread-safe; use one client per camera).
+
+    Results come back as `recognizer.Prediction` objects, so front ends can
+    swap a local SignRecognizer for the service without other changes.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = 5.0):
+        family, addr = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(addr)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._req = 0
+        self.version = -1
+        self.classes: List[str] = []
+        self.refresh()
+
+    def _call(self, kind: int, *parts: bytes) -> bytearray:
+        self._req += 1
+        send_message(self.sock, kind, self._req, *parts)
+        msg = recv_message(self.sock)
+        if msg is None:
+            raise ConnectionError("recognition service closed the connection")
+        rkind, _, body = msg
+        if rkind == MSG_ERROR:
+            raise ServiceError(body.decode(errors="replace"))
+        return body
+
+    def refresh(self) -> dict:
+        info = json.loads(self._call(MSG_INFO))
+        self.classes = info["classes"]
+        self.version = info["version"]
+        return info
+
+    def stats(self) -> dict:
+        return json.loads(self._call(MSG_STATS))
+
+    def _decode(self, body, offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        n, k, version = _RESULT.unpack_from(body, offset)
+        offset += _RESULT.size
+        labels = np.frombuffer(body, dtype=np.int16, count=n, offset=offset)
+        proba = np.frombuffer(body, dtype=np.float32, count=n * k, offset=offset + 2 * n).reshape(n, k)
+        if version != self.version:
+            self.refresh()  # the service hot-swapped its model
+        return labels, proba
+
+    def classify_batch(self, landmarks) -> List[Prediction]:
+        """Classify (N, 63) / (N, 21, 3) landmarks; returns one Prediction per row."""
+        X = np.ascontiguousarray(landmarks, dtype=np.float32).reshape(-1, RAW_DIM)
+        labels, proba = self._decode(self._call(MSG_LANDMARKS, X.tobytes()))
+        return [Prediction(self.classes[l], float(p[l]), p, None, x.reshape(21, 3))
+                for l, p, x in zip(labels, proba, X)]
+
+    def classify(self, landmarks) -> Prediction:
+        return self.classify_batch(landmarks)[0]
+
+    def infer(self, frame_bgr, jpeg_quality: Optional[int] = 80) -> Prediction:
+        """Detect and classify on the service (JPEG-encoded unless `jpeg_quality` is None)."""
+        h, w = frame_bgr.shape[:2]
+        if jpeg_quality is None:
+            payload = (_FRAME.pack(h, w, ENC_RAW), np.ascontiguousarray(frame_bgr).tobytes())
+        else:
+            import cv2
+            ok, data = cv2.imencode(".jpg", frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            payload = (_FRAME.pack(h, w, ENC_JPEG), data.tobytes())
+        body = self._call(MSG_FRAME, *payload)
+        found, *box = _HAND.unpack_from(body)
+        if not found:
+            return Prediction()
+        landmarks = np.frombuffer(body, dtype=np.float32, count=RAW_DIM, offset=_HAND.size).reshape(21, 3)
+        labels, proba = self._decode(body, _HAND.size + RAW_DIM * 4)
+        return Prediction(self.classes[labels[0]], float(proba[0].max()), proba[0], tuple(box), landmarks)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------------------------------------------------------------------
+# Load generator / benchmark
+# ------------------------------------------------------------------------------------
+def _stream_worker(address: str, seconds: float, fps: float, seed: int, start_at: float, out):
+    """One simulated station: sends a landmark vector per frame and records round-trip times."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((256, RAW_DIM), dtype=np.float32)
+    latencies = []
+    with RecognitionClient(address, timeout=30) as client:
+        time.sleep(max(0.0, start_at - time.time()))
+        t_end = time.perf_counter() + seconds
+        next_t = time.perf_counter()
+        i = 0
+        while time.perf_counter() < t_end:
+            t0 = time.perf_counter()
+            client.classify(X[i % len(X)])
+            latencies.append(time.perf_counter() - t0)
+            i += 1
+            if fps > 0:
+                next_t += 1.0 / fps
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+    out.put(latencies)
+
+
+def run_load(address: str, streams: int, seconds: float = 3.0, fps: float = 30.0) -> dict:
+    """Drive `streams` concurrent client processes against `address`; returns throughput and latency."""
+    import multiprocessing as mp
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    start_at = time.time() + 1.0 + 0.05 * streams  # let every process connect before the clock starts
+    procs = [ctx.Process(target=_stream_worker, args=(address, seconds, fps, i, start_at, out), daemon=True)
+             for i in range(streams)]
+    for p in procs:
+        p.start()
+    lat = np.concatenate([np.asarray(out.get(), dtype=np.float64) for _ in procs]) * 1000
+    for p in procs:
+        p.join()
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {"streams": streams, "requests": len(lat), "throughput": len(lat) / seconds,
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def _bench_recognizer(model_path: Optional[str]):
+    from recognizer import SignRecognizer
+    if model_path is None:
+        from model_registry import ModelRegistry
+        model_path = ModelRegistry().resolve()
+    if model_path and os.path.exists(model_path):
+        return SignRecognizer(model_path)
+    # No trained model around: benchmark a forest of the production size on random data
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(0)
+    X = rng.random((5000, RAW_DIM), dtype=np.float32)
+    y = np.array([chr(65 + i) for i in range(26)])[rng.integers(26, size=len(X))]
+    print("No model found; benchmarking a 200-tree forest trained on random data")
+    return SignRecognizer(model=RandomForestClassifier(n_estimators=200, random_state=0, n_jobs=-1).fit(X, y))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local multi-stream recognition service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the service")
+    serve.add_argument("--address", default=DEFAULT_ADDRESS)
+    serve.add_argument("--model", default=None, help="model artifact (default: newest in models/)")
+    serve.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    serve.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    serve.add_argument("--watch", action="store_true", help="hot-swap models saved into models/")
+    bench = sub.add_parser("bench", help="load-test a service (an in-process one unless --address is given)")
+    bench.add_argument("--address", default=None)
+    bench.add_argument("--model", default=None)
+    bench.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    bench.add_argument("--seconds", type=float, default=3.0)
+    bench.add_argument("--fps", type=float, default=30.0, help="frames per second per stream (0 = flat out)")
+    bench.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        from recognizer import SignRecognizer
+        recognizer = SignRecognizer(args.model) if args.model else _bench_recognizer(None)
+        service = RecognitionService(recognizer.load(warm_up=False), args.address, args.max_batch, args.max_wait_ms)
+        if args.watch:
+            from model_registry import ModelWatcher
+            ModelWatcher(recognizer).start()
+        service.serve_forever()
+        return
+
+    service = None
+    address = args.address
+    if address is None:
+        recognizer = _bench_recognizer(args.model)
+        recognizer.engine
+        service = RecognitionService(recognizer, "tcp:127.0.0.1:0", max_wait_ms=args.max_wait_ms).start()
+        address = service.address
+    print(f"{'streams':>7s} {'req/s':>9s} {'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'rows/batch':>10s}")
+    with RecognitionClient(address) as probe:
+        for n in args.streams:
+            before = probe.stats()
+            r = run_load(address, n, args.seconds, args.fps)
+            after = probe.stats()
+            batches = max(1, after["batches"] - before["batches"])
+            rows = (after["rows"] - before["rows"]) / batches
+            print(f"{n:7d} {r['throughput']:9.0f} {r['p50_ms']:7.2f} {r['p95_ms']:7.2f} {r['p99_ms']:7.2f} {rows:10.1f}")
+    if service is not None:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
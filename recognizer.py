@@ -0,0 +1,258 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from instrumentation import PROFILER
+from utils_landmarks import LandmarkBuffer, bounding_box, model_input
+
+MODEL_PATH = "models/sign_classifier_v3.pkl"
+N_LANDMARKS = 21
+
+
+class Prediction:
+    """Result for one frame or landmark vector."""
+
+    __slots__ = ("label", "confidence", "proba", "box", "landmarks")
+
+    def __init__(self, label=None, confidence=0.0, proba=None, box=None, landmarks=None):
+        self.label = label              # top class (even if below min_confidence)
+        self.confidence = confidence    # probability of the top class
+        self.proba = proba              # full probability vector, ordered like `classes`
+        self.box = box                  # (x_min, y_min, x_max, y_max) in pixels, or None
+        self.landmarks = landmarks      # (21, 3) normalized landmarks (reused buffer from detect()), or None
+
+    @property
+    def hand(self) -> bool:
+        return self.landmarks is not None
+
+    def __repr__(self):
+        return f"Prediction(label={self.label!r}, confidence={self.confidence:.2f})"
+
+
+class SignRecognizer:
+    """
+    Hand tracking + sign classification hot path shared by every front end.
+
+    The MediaPipe graph and the classifier are created lazily on first use
+    (or eagerly with `load()`), so constructing a recognizer is cheap.
+
+    Entry points:
+        process_frame(frame)  -> (annotated frame, label or None, fps)  # live loops
+        infer(frame)          -> Prediction                            # one frame
+        process_batch(items)  -> List[Prediction]                      # frames or landmark arrays
+        stream(source)        -> Iterator[Prediction]                  # FrameSource / spec / iterable
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, min_confidence: float = 0.3,
+                 min_detection_confidence: float = 0.7, min_tracking_confidence: float = 0.7,
+                 flip: bool = False, padding: int = 20, model=None, model_complexity: int = 1):
+        self.model_path = model_path
+        self.min_confidence = min_confidence
+        self.model_complexity = model_complexity
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.flip = flip
+        self.padding = padding
+        self._model = model
+        self._engine = None
+        self._hands = None
+        self._static_hands = None
+        self._swaps = deque()
+        self.model_version = 0
+        self._buffer = LandmarkBuffer()
+        self._last_t = None
+        self.fps = 0.0
+
+    # -- lazy components ----------------------------------------------------------------
+    @property
+    def model(self):
+        if self._model is None:
+            from model_registry import ModelRegistry, read_model
+            self.model_path = ModelRegistry().resolve(self.model_path)
+            self._model = read_model(self.model_path)
+        return self._model
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from forest_engine import compile_model
+            self._engine = compile_model(self.model)
+        return self._engine
+
+    @property
+    def classes(self) -> np.ndarray:
+        return self.engine.classes_
+
+    @property
+    def hands(self):
+        if self._hands is None:
+            self._hands = self.make_hands(static=False)
+        return self._hands
+
+    def make_hands(self, static: bool):
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(
+            static_image_mode=static,
+            max_num_hands=1,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence
+        )
+
+    def set_model_complexity(self, complexity: int):
+        """Switch the tracking graph's landmark model (0: lite, 1: full); rebuilt on the next frame."""
+        if complexity != self.model_complexity:
+            self.model_complexity = complexity
+            if self._hands is not None:
+                self._hands.close()
+                self._hands = None
+
+    def swap_model(self, model, engine=None, path: Optional[str] = None):
+        """
+        Queue a new classifier (e.g. from ModelRegistry.load_into on another thread).
+
+        It is installed at the start of the next infer() call, so a frame is never
+        classified half with the old and half with the new model.
+        """
+        if engine is None:
+            from forest_engine import compile_model
+            engine = compile_model(model)
+        self._swaps.append((model, engine, path))
+
+    def _apply_swaps(self):
+        while self._swaps:
+            self._model, self._engine, path = self._swaps.popleft()
+            if path:
+                self.model_path = path
+            self.model_version += 1
+
+    def load(self, warm_up: bool = True) -> "SignRecognizer":
+        """Initialize the classifier and the tracking graph now instead of on the first frame."""
+        self.engine
+        if warm_up:
+            # The first process() call loads the TFLite models
+            self.hands.process(np.zeros((240, 320, 3), dtype=np.uint8))
+        return self
+
+    def close(self):
+        for hands in (self._hands, self._static_hands):
+            if hands is not None:
+                hands.close()
+        self._hands = self._static_hands = None
+
+    # -- hot path -------------------------------------------------------------------------
+    def detect(self, frame_bgr, hands=None) -> Optional[np.ndarray]:
+        """
+        Run MediaPipe on a BGR frame; returns a (21, 3) float32 landmark array or None.
+
+        The array lives in a reused ring buffer (see LandmarkBuffer) and is overwritten
+        a few frames later; `.copy()` it to keep it.
+        """
+        hands = hands or self.hands
+        with PROFILER.stage("cvtColor"):
+            rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        with PROFILER.stage("hands.process"):
+            results = hands.process(rgb)
+        if not results.multi_hand_landmarks:
+            return None
+        return self._buffer.fill(results.multi_hand_landmarks[0])
+
+    def hand_box(self, landmarks: np.ndarray, shape) -> Tuple[int, int, int, int]:
+        h, w = shape[:2]
+        return bounding_box(landmarks, w, h, self.padding)
+
+    def classify(self, landmarks) -> Tuple[object, np.ndarray]:
+        """Classify one hand; returns (label, probability vector)."""
+        engine = self.engine
+        with PROFILER.stage("classify"):
+            return engine.predict_one(model_input(landmarks, engine.n_features_in_))
+
+    def classify_batch(self, landmarks) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify (N, 63) / (N, 21, 3) landmarks in one vectorized call; returns (labels, (N, K) proba)."""
+        if self._swaps:
+            self._apply_swaps()
+        engine = self.engine
+        return engine.predict_with_proba(model_input(landmarks, engine.n_features_in_))
+
+    def infer(self, frame_bgr) -> Prediction:
+        """Detect and classify the hand in one (already flipped, if needed) frame."""
+        if self._swaps:
+            self._apply_swaps()
+        landmarks = self.detect(frame_bgr)
+        if landmarks is None:
+            return Prediction()
+        label, proba = self.classify(landmarks)
+        h, w = frame_bgr.shape[:2]
+        return Prediction(label, float(proba.max()), proba, self._buffer.box(w, h, self.padding), landmarks)
+
+    def process_frame(self, frame_bgr):
+        """Live-loop entry point: returns (annotated frame, confident label or None, fps)."""
+        now = time.perf_counter()
+        if self._last_t is not None:
+            inst = 1.0 / max(now - self._last_t, 1e-6)
+            self.fps = inst if self.fps == 0.0 else 0.9 * self.fps + 0.1 * inst
+        self._last_t = now
+
+        if self.flip:
+            with PROFILER.stage("flip"):
+                frame_bgr = cv2.flip(frame_bgr, 1)
+        pred = self.infer(frame_bgr)
+        label = None
+        if pred.hand:
+            x_min, y_min, x_max, y_max = pred.box
+            cv2.rectangle(frame_bgr, (x_min, y_min), (x_max, y_max), (139, 69, 19), 3)
+            if pred.confidence > self.min_confidence:
+                label = pred.label
+                cv2.putText(frame_bgr, f"{label} {pred.confidence:.0%}", (x_min, max(20, y_min - 10)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (139, 69, 19), 2)
+        return frame_bgr, label, self.fps
+
+    def process_batch(self, items: Union[np.ndarray, Iterable]) -> List[Prediction]:
+        """
+        Classify many frames or landmark arrays with a single classifier call.
+
+        `items` is either a landmark array of shape (N, 63) / (N, 21, 3) or an
+        iterable of BGR frames. Frames are treated as independent images
+        (static-mode MediaPipe), so their order does not matter.
+        """
+        if isinstance(items, np.ndarray) and items.ndim in (2, 3) and items.shape[-1] in (3, 63) \
+                and items.dtype != np.uint8:
+            landmarks = items.reshape(-1, N_LANDMARKS, 3)
+            labels, proba = self.classify_batch(landmarks)
+            return [Prediction(l, float(p.max()), p, None, lm) for l, p, lm in zip(labels, proba, landmarks)]
+
+        if self._static_hands is None:
+            self._static_hands = self.make_hands(static=True)
+        frames = list(items)
+        found = []
+        for i, f in enumerate(frames):
+            lm = self.detect(f, self._static_hands)
+            if lm is not None:
+                found.append((i, lm.copy()))
+        results = [Prediction() for _ in frames]
+        if found:
+            labels, proba = self.classify_batch(np.stack([lm for _, lm in found]))
+            for (i, lm), label, p in zip(found, labels, proba):
+                results[i] = Prediction(label, float(p.max()), p, self.hand_box(lm, frames[i].shape), lm)
+        return results
+
+    def stream(self, source) -> Iterator[Prediction]:
+        """
+        Yield a Prediction per frame from a FrameSource, an open_source() spec
+        (camera index, video file, image directory, "synthetic") or any
+        iterable of BGR frames. Uses the tracking graph, so frames should be
+        consecutive.
+        """
+        if isinstance(source, (int, str)):
+            from frame_source import open_source
+            with open_source(source) as src:
+                yield from self.stream(src)
+            return
+        for frame in source:
+            if self.flip:
+                frame = cv2.flip(frame, 1)
+            yield self.infer(frame)
@@ -0,0 +1,303 @@
+"""
+Compact append-only session log: what the recognizer saw and did, frame by frame.
+
+A session file (`.wtms`) is a short header followed by length-prefixed records:
+
+    magic "WTMS" | u16 version | u16 reserved | u32 header length | JSON header
+    record: u8 kind | u32 payload length | payload
+
+    FRAME   u32 dt (µs since the previous frame) | u8 flags | landmarks | probabilities
+    COMMIT  u32 dt | utf-8 label                  (the symbol committed at that frame)
+    MODEL   JSON class list                       (the classifier changed)
+    VIDEO   u32 dt | JPEG                         (optional downscaled frame)
+
+Landmarks are quantized to 1/4096 of the frame (int16). Between keyframes --
+every `KEYFRAME_EVERY` frames, and whenever the hand reappears -- only the
+per-coordinate difference to the previous frame is stored, as int8 when it
+fits (the usual case), so a tracked frame takes ~100 bytes including a uint8
+probability vector. Frames without a hand take 10 bytes.
+
+`SessionRecorder` does all encoding and I/O on a background writer thread; the
+hot path only queues copies of the arrays. `read_session()` decodes a file back
+into arrays. See session_replay.py for replaying logs through the current
+classifier and decoder.
+"""
+from __future__ import annotations
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"WTMS"
+FORMAT_VERSION = 1
+SESSION_DIR = os.path.join("logs", "sessions")
+SESSION_EXT = ".wtms"
+LM_SCALE = 4096
+KEYFRAME_EVERY = 30
+FLUSH_INTERVAL = 1.0
+VIDEO_SCALE = 0.25  # default downscale for the optional VIDEO records
+
+FRAME, COMMIT, MODEL, VIDEO = 1, 2, 3, 4
+HAND, KEYFRAME, SMALL_DELTA = 1, 2, 4
+
+_PREFIX = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<BI")
+_STAMP = struct.Struct("<IB")
+_DT = struct.Struct("<I")
+
+
+class SessionRecorder:
+    """
+    Records a live session to `path` from any thread.
+
+    Args:
+        path: Output file (see session_path()).
+        classes: Class labels of the probability vectors.
+        video_scale (Optional[float]): Also store JPEG frames downscaled by this factor (passed to video()).
+        **meta: Stored in the header (model path, decoder settings, ...).
+    """
+
+    def __init__(self, path: str, classes: Sequence, video_scale: Optional[float] = None, **meta):
+        self.path = path
+        self.video_scale = video_scale
+        self.frames = 0
+        self.bytes_written = 0
+        self._t0 = time.monotonic()
+        self._queue = queue.SimpleQueue()
+        header = {"classes": [str(c) for c in classes], "started_at": time.time(), "lm_scale": LM_SCALE,
+                  "keyframe_every": KEYFRAME_EVERY, "video_scale": video_scale, "meta": meta}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        blob = json.dumps(header).encode("utf-8")
+        self._file.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(blob)) + blob)
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    # -- hot path (any thread) -------------------------------------------------------------
+    def frame(self, landmarks: Optional[np.ndarray], proba: Optional[np.ndarray], t: Optional[float] = None):
+        """Queue one inferred frame (landmarks/proba None when there was no hand)."""
+        t = time.monotonic() if t is None else t
+        self.frames += 1
+        self._queue.put((FRAME, t, None if landmarks is None else np.array(landmarks, np.float32),
+                         None if proba is None else np.array(proba, np.float32)))
+
+    def commit(self, label, t: Optional[float] = None):
+        self._queue.put((COMMIT, time.monotonic() if t is None else t, str(label)))
+
+    def model(self, classes: Sequence):
+        self._queue.put((MODEL, None, [str(c) for c in classes]))
+
+    def video(self, frame_bgr, t: Optional[float] = None):
+        """Queue a downscaled copy of a displayed frame (no-op unless video_scale is set)."""
+        if self.video_scale:
+            import cv2
+            small = cv2.resize(frame_bgr, None, fx=self.video_scale, fy=self.video_scale,
+                               interpolation=cv2.INTER_AREA)
+            self._queue.put((VIDEO, time.monotonic() if t is None else t, small))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        print(f"Session: {self.frames} frames, {self.bytes_written / 1e3:.1f} kB -> {self.path}")
+
+    # -- writer thread -------------------------------------------------------------------------
+    def _run(self):
+        last_t = self._t0
+        prev_q: Optional[np.ndarray] = None
+        since_key = 0
+        last_flush = time.monotonic()
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            out = bytearray()
+            stop = False
+            for item in items:
+                if item is None:
+                    stop = True
+                    break
+                kind, t = item[0], item[1]
+                if t is not None:
+                    dt = _DT.pack(max(0, int(round((t - last_t) * 1e6))))
+                    last_t = t
+                if kind == FRAME:
+                    payload, prev_q, since_key = _encode_frame(item[2], item[3], prev_q, since_key)
+                    payload = dt + payload
+                elif kind == COMMIT:
+                    payload = dt + item[2].encode("utf-8")
+                elif kind == MODEL:
+                    payload = json.dumps(item[2]).encode("utf-8")
+                else:
+                    import cv2
+                    payload = dt + cv2.imencode(".jpg", item[2], [cv2.IMWRITE_JPEG_QUALITY, 70])[1].tobytes()
+                out += _RECORD.pack(kind, len(payload)) + payload
+            self._file.write(out)
+            self.bytes_written += len(out)
+            if stop:
+                self._file.flush()
+                return
+            if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                last_flush = time.monotonic()
+
+
+def _encode_frame(landmarks, proba, prev_q, since_key) -> Tuple[bytes, Optional[np.ndarray], int]:
+    if landmarks is None:
+        return bytes([0]), None, 0
+    q = np.clip(np.rint(landmarks.reshape(-1) * LM_SCALE), -32768, 32767).astype(np.int16)
+    p = np.rint(np.clip(proba, 0.0, 1.0) * 255).astype(np.uint8).tobytes() if proba is not None else b""
+    if prev_q is not None and since_key < KEYFRAME_EVERY:
+        delta = q.astype(np.int32) - prev_q
+        largest = np.abs(delta).max()
+        if largest <= 127:
+            return bytes([HAND | SMALL_DELTA]) + delta.astype(np.int8).tobytes() + p, q, since_key + 1
+        if largest <= 32767:
+            return bytes([HAND]) + delta.astype(np.int16).tobytes() + p, q, since_key + 1
+    return bytes([HAND | KEYFRAME]) + q.tobytes() + p, q, 1
+
+
+def session_path(directory: str = SESSION_DIR) -> str:
+    return os.path.join(directory, f"session-{time.strftime('%Y%m%d-%H%M%S')}{SESSION_EXT}")
+
+
+def transcript(commits: Sequence[Tuple[float, str]]) -> str:
+    """Committed labels as text: letters as labelled, the space class as " "."""
+    from commit_decoder import label_symbol
+    return "".join(" " if label_symbol(label) == " " else str(label) for _, label in commits)
+
+
+# ------------------------------------------------------------------------------------
+# Reading
+# ------------------------------------------------------------------------------------
+class Session:
+    """A decoded session log."""
+
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self.header = header
+        self.classes: List[str] = header["classes"]
+        self.t = np.zeros(0)                 # (N,) seconds since the session started
+        self.hand = np.zeros(0, bool)        # (N,)
+        self.landmarks = np.zeros((0, 21, 3), np.float32)  # (N, 21, 3), NaN where there was no hand
+        self.proba: List[Optional[np.ndarray]] = []        # per frame, in the classes active at that frame
+        self.class_changes: List[Tuple[int, List[str]]] = [(0, self.classes)]  # (first frame, classes)
+        self.commits: List[Tuple[float, str]] = []
+        self.video: List[Tuple[float, bytes]] = []         # (t, JPEG)
+
+    @property
+    def transcript(self) -> str:
+        return transcript(self.commits)
+
+    @property
+    def duration(self) -> float:
+        return float(self.t[-1]) if len(self.t) else 0.0
+
+    def __repr__(self):
+        return (f"Session({os.path.basename(self.path)}, {len(self.t)} frames, {self.duration:.1f}s, "
+                f"{int(self.hand.sum())} with a hand, {len(self.commits)} commits)")
+
+
+def read_session(path: str) -> Session:
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _, header_len = _PREFIX.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a session log")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Session format v{version} is newer than this build supports (v{FORMAT_VERSION})")
+    pos = _PREFIX.size + header_len
+    session = Session(path, json.loads(data[_PREFIX.size:pos].decode("utf-8")))
+    scale = float(session.header.get("lm_scale", LM_SCALE))
+    n_classes = len(session.classes)
+
+    times, hands, lms = [], [], []
+    t = 0.0
+    q = np.zeros(63, np.int32)
+    nan = np.full(63, np.nan, np.float32)
+    while pos + _RECORD.size <= len(data):
+        kind, length = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        payload = data[pos:pos + length]
+        pos += length
+        if len(payload) < length:
+            break  # truncated tail (the app was killed mid-write)
+        if kind == MODEL:
+            classes = json.loads(payload.decode("utf-8"))
+            session.class_changes.append((len(times), classes))
+            n_classes = len(classes)
+            continue
+        t += _DT.unpack_from(payload, 0)[0] / 1e6
+        if kind == COMMIT:
+            session.commits.append((t, payload[_DT.size:].decode("utf-8")))
+        elif kind == VIDEO:
+            session.video.append((t, payload[_DT.size:]))
+        elif kind == FRAME:
+            flags = payload[_DT.size]
+            times.append(t)
+            hands.append(bool(flags & HAND))
+            if not flags & HAND:
+                lms.append(nan)
+                session.proba.append(None)
+                continue
+            body = payload[_STAMP.size:]
+            if flags & KEYFRAME:
+                q = np.frombuffer(body, np.int16, 63).astype(np.int32)
+                body = body[126:]
+            elif flags & SMALL_DELTA:
+                q = q + np.frombuffer(body, np.int8, 63)
+                body = body[63:]
+            else:
+                q = q + np.frombuffer(body, np.int16, 63)
+                body = body[126:]
+            lms.append(q / scale)
+            session.proba.append(np.frombuffer(body, np.uint8, n_classes) / 255.0 if body else None)
+    session.t = np.asarray(times)
+    session.hand = np.asarray(hands, bool)
+    session.landmarks = np.asarray(lms, np.float32).reshape(-1, 21, 3)
+    return session
+
+
+if __name__ == "__main__":
+    # Round trip and size on a synthetic fingerspelling session
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    classes = [chr(c) for c in range(65, 91)] + ["Space", "nothing"]
+    base = rng.random((21, 3)).astype(np.float32) * [0.3, 0.4, 0.05] + [0.35, 0.3, -0.02]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "s" + SESSION_EXT)
+        rec = SessionRecorder(path, classes, model="synthetic")
+        truth, hot = [], 0.0
+        lm = base.copy()
+        for i in range(9000):  # 5 minutes at 30 fps
+            t = i / 30
+            hand = (i // 150) % 4 != 3
+            lm = lm + rng.normal(0, 0.002, lm.shape).astype(np.float32)
+            proba = rng.dirichlet(np.full(len(classes), 0.2)) if hand else None
+            t0 = time.perf_counter()
+            rec.frame(lm if hand else None, proba, t)
+            hot += time.perf_counter() - t0
+            truth.append(lm.copy() if hand else None)
+            if i % 45 == 0 and hand:
+                rec.commit(classes[i % 26], t)
+        queued_us = hot / 9000 * 1e6
+        rec.close()
+        t0 = time.perf_counter()
+        session = read_session(path)
+        read_ms = (time.perf_counter() - t0) * 1000
+        err = max(np.abs(session.landmarks[i] - lm).max() for i, lm in enumerate(truth) if lm is not None)
+        size = os.path.getsize(path)
+        print(session)
+        print(f"{size / 1e3:.1f} kB for {len(session.t)} frames ({size / len(session.t):.0f} B/frame, "
+              f"raw float32 landmarks + proba would be {(63 + len(classes)) * 4} B); "
+              f"max landmark error {err:.5f}; {queued_us:.1f} µs per frame on the hot path; read in {read_ms:.0f} ms")
+        assert err <= 0.5 / LM_SCALE + 1e-6 and len(session.commits) > 0
@@ -0,0 +1,267 @@
+"""
+Replay recorded sessions (see session_log.py) through the current classifier
+and commit decoder, and diff the result against what was typed live.
+
+Replay runs far faster than real time. All tracked frames of a session are
+classified in one batch by the compiled engine, and the decoder is fed the
+recorded frame times, so time-dependent behaviour (release after `release_s`,
+repeats) matches the live run. With `--recorded-proba` the classifier is
+skipped and the probabilities logged live go through the decoder, which
+isolates decoder changes from model changes.
+
+Per session it reports the transcript character error rate against the live
+transcript (edit distance / live length) and how much later (+) or earlier (-)
+the matching commits land.
+
+    python session_replay.py logs/sessions                       # every session, current model
+    python session_replay.py a.wtms b.wtms --model models/x.wtm  # a candidate model
+    python session_replay.py logs/sessions --recorded-proba      # decoder changes only
+    python session_replay.py logs/sessions --max-cer 0.05        # exit status 1 past 5% drift
+    python session_replay.py --demo 100                          # synthetic sessions: throughput check
+"""
+from __future__ import annotations
+import argparse
+import difflib
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from commit_decoder import make_decoder
+from session_log import SESSION_DIR, SESSION_EXT, Session, read_session, transcript
+from utils_landmarks import model_input
+
+
+def session_files(paths: Sequence[str]) -> List[str]:
+    """Expand directories into the session logs they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(SESSION_EXT))
+        else:
+            files.append(path)
+    return files
+
+
+def load_engine(path: Optional[str] = None):
+    """Compiled engine for `path` (default: what the recognizer would load); returns (engine, path)."""
+    from forest_engine import compile_model
+    from model_registry import ModelRegistry, read_model
+    from recognizer import MODEL_PATH
+    path = ModelRegistry().resolve(path or MODEL_PATH)
+    if path is None or not os.path.exists(path):
+        raise FileNotFoundError(f"No model found (looked for {path or MODEL_PATH} and models/)")
+    return compile_model(read_model(path)), path
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+# ------------------------------------------------------------------------------------
+# Replay
+# ------------------------------------------------------------------------------------
+def replay(session: Session, engine=None, recorded_proba: bool = False,
+           decoder_factory: Callable = make_decoder) -> dict:
+    """
+    Run one session through a classifier and a fresh decoder.
+
+    Args:
+        session: A decoded session log.
+        engine: Compiled classifier (forest_engine.compile_model); required unless recorded_proba.
+        recorded_proba (bool): Decode the probabilities logged live instead of reclassifying.
+        decoder_factory: classes -> decoder with update(proba, t); defaults to the app's decoder.
+
+    Returns:
+        dict: frames, duration_s, replay_ms, speedup (x real time), recorded/replayed transcripts,
+              cer, matched commits, latency delta p50/max (ms), and top-1 agreement with the
+              live classifier (None when not comparable).
+    """
+    t0 = time.perf_counter()
+    n = len(session.t)
+    rows: List[Optional[np.ndarray]] = [None] * n
+    agreement = None
+    if recorded_proba:
+        rows = session.proba
+        changes = session.class_changes
+    else:
+        if engine is None:
+            raise ValueError("replay() needs an engine unless recorded_proba is set")
+        tracked = np.flatnonzero(session.hand)
+        if len(tracked):
+            _, proba = engine.predict_with_proba(model_input(session.landmarks[tracked], engine.n_features_in_))
+            for i, p in zip(tracked.tolist(), proba):
+                rows[i] = p
+        classes = [str(c) for c in engine.classes_]
+        changes = [(0, classes)]
+        if len(session.class_changes) == 1 and session.class_changes[0][1] == classes:
+            live = [(p.argmax(), rows[i].argmax()) for i, p in enumerate(session.proba) if p is not None]
+            if live:
+                agreement = float(np.mean([a == b for a, b in live]))
+
+    commits = []
+    boundaries = {first: classes for first, classes in changes}
+    decoder = None
+    times = session.t.tolist()
+    for i in range(n):
+        if i in boundaries:
+            decoder = decoder_factory(boundaries[i])
+        label = decoder.update(rows[i], times[i])
+        if label is not None:
+            commits.append((times[i], str(label)))
+    replay_ms = (time.perf_counter() - t0) * 1000
+
+    recorded, replayed = session.transcript, transcript(commits)
+    live_labels = [label for _, label in session.commits]
+    blocks = difflib.SequenceMatcher(None, live_labels, [label for _, label in commits],
+                                     autojunk=False).get_matching_blocks()
+    deltas = [(commits[b + k][0] - session.commits[a + k][0]) * 1000
+              for a, b, size in blocks for k in range(size)]
+    return {
+        "path": session.path,
+        "frames": n,
+        "duration_s": session.duration,
+        "replay_ms": replay_ms,
+        "speedup": session.duration / max(replay_ms / 1000, 1e-9),
+        "recorded": recorded,
+        "replayed": replayed,
+        "cer": edit_distance(recorded, replayed) / max(1, len(recorded)),
+        "matched": len(deltas),
+        "latency_delta_p50_ms": float(np.median(deltas)) if deltas else None,
+        "latency_delta_max_ms": float(np.max(np.abs(deltas))) if deltas else None,
+        "agreement": agreement,
+    }
+
+
+def format_result(result: dict) -> str:
+    lat = result["latency_delta_p50_ms"]
+    agree = result["agreement"]
+    return (f"{os.path.basename(result['path']):34s} {result['duration_s']:7.1f}s {result['frames']:7d} "
+            f"{result['replay_ms']:8.1f} {result['speedup']:8.0f}x {result['cer']:6.1%} "
+            f"{'-' if lat is None else f'{lat:+.0f}':>7s} {'-' if agree is None else f'{agree:.1%}':>7s}")
+
+
+HEADER = (f"{'session':34s} {'length':>8s} {'frames':>7s} {'replay ms':>8s} {'speed':>9s} {'CER':>6s} "
+          f"{'dt ms':>7s} {'top-1':>7s}")
+
+
+def replay_all(paths: Sequence[str], engine=None, recorded_proba: bool = False, verbose: bool = False,
+               max_cer: Optional[float] = None) -> List[dict]:
+    """Replay every session in `paths`, printing one row each and a summary."""
+    results = []
+    print(HEADER)
+    t0 = time.perf_counter()
+    for path in session_files(paths):
+        try:
+            session = read_session(path)
+        except (OSError, ValueError) as e:
+            print(f"{os.path.basename(path):34s} skipped: {e}")
+            continue
+        result = replay(session, engine, recorded_proba)
+        results.append(result)
+        print(format_result(result))
+        if verbose and result["recorded"] != result["replayed"]:
+            print(f"    live:   {result['recorded']!r}\n    replay: {result['replayed']!r}")
+    if not results:
+        print("No sessions replayed")
+        return results
+
+    duration = sum(r["duration_s"] for r in results)
+    wall_s = time.perf_counter() - t0
+    changed = [r for r in results if r["recorded"] != r["replayed"]]
+    failed = [r for r in results if max_cer is not None and r["cer"] > max_cer]
+    print(f"{len(results)} sessions, {sum(r['frames'] for r in results)} frames, {duration / 60:.1f} min recorded, "
+          f"read and replayed in {wall_s:.2f}s ({duration / max(wall_s, 1e-9):.0f}x real time); "
+          f"mean CER {np.mean([r['cer'] for r in results]):.2%}, {len(changed)} transcripts changed"
+          + (f", {len(failed)} over --max-cer {max_cer:.1%}" if max_cer is not None else ""))
+    return results
+
+
+# ------------------------------------------------------------------------------------
+# Synthetic sessions (for --demo)
+# ------------------------------------------------------------------------------------
+def synthetic_sessions(directory: str, count: int, seconds: float = 60.0, fps: float = 30.0, seed: int = 0):
+    """
+    Record `count` fake fingerspelling sessions into `directory` the way the app would
+    (classifier + decoder live); returns the engine used.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from forest_engine import compile_model
+    from session_log import SessionRecorder
+
+    rng = np.random.default_rng(seed)
+    labels = [chr(c) for c in range(65, 91)] + ["Space"]
+    shapes = rng.random((len(labels), 21, 3)).astype(np.float32) * [0.3, 0.4, 0.05] + [0.35, 0.3, -0.02]
+    y = rng.integers(len(labels), size=4000)
+    X = shapes[y] + rng.normal(0, 0.02, (len(y), 21, 3)).astype(np.float32)
+    model = RandomForestClassifier(n_estimators=40, max_depth=12, random_state=seed, n_jobs=1)
+    model.fit(X.reshape(len(X), -1), np.array(labels)[y])
+    engine = compile_model(model)
+    classes = [str(c) for c in engine.classes_]
+    order = [labels.index(c) for c in classes]
+    shapes = shapes[order]
+
+    for s in range(count):
+        # Hold a sign ~0.6 s, drop the hand ~0.3 s, repeat
+        n = int(seconds * fps)
+        k = rng.integers(len(classes), size=n // 27 + 1)
+        sign = np.repeat(k, 27)[:n]
+        hand = (np.arange(n) % 27) < 18
+        lm = shapes[sign] + rng.normal(0, 0.025, (n, 21, 3)).astype(np.float32)
+        _, proba = engine.predict_with_proba(lm.reshape(n, -1))
+        decoder = make_decoder(classes)
+        rec = SessionRecorder(os.path.join(directory, f"synthetic-{s:04d}{SESSION_EXT}"), classes, model="synthetic")
+        for i in range(n):
+            t = i / fps
+            p = proba[i] if hand[i] else None
+            rec.frame(lm[i] if hand[i] else None, p, t)
+            label = decoder.update(p, t)
+            if label is not None:
+                rec.commit(label, t)
+        rec.close()
+    return engine
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay session logs through the current model and decoder")
+    parser.add_argument("paths", nargs="*", default=[SESSION_DIR], help=f"session files or directories "
+                                                                        f"(default {SESSION_DIR})")
+    parser.add_argument("--model", help="classifier to replay with (default: the recognizer's)")
+    parser.add_argument("--recorded-proba", action="store_true",
+                        help="decode the probabilities recorded live (decoder changes only)")
+    parser.add_argument("--max-cer", type=float, help="exit with status 1 if any session's CER exceeds this")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print changed transcripts")
+    parser.add_argument("--demo", type=int, metavar="N", help="record and replay N synthetic one-minute sessions")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            engine = synthetic_sessions(tmp, args.demo)
+            print(f"Recorded {args.demo} synthetic sessions in {time.perf_counter() - t0:.1f}s")
+            results = replay_all([tmp], engine, verbose=args.verbose, max_cer=args.max_cer)
+            replay_all([tmp], recorded_proba=True, max_cer=args.max_cer)
+    else:
+        engine = None
+        if not args.recorded_proba:
+            engine, path = load_engine(args.model)
+            print(f"Model: {path}")
+        results = replay_all(args.paths, engine, args.recorded_proba, args.verbose, args.max_cer)
+    if args.max_cer is not None and any(r["cer"] > args.max_cer for r in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 # smoothing.py
-from collections import deque, Counter
-from typing import Optional
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 class MajoritySmoother:
@@ -8,6 +10,9 @@ class MajoritySmoother:
         """
         Majority vote smoother to stabilize noisy predictions.
 
+        Per-label counts are updated on append and eviction, and labels are kept in
+        buckets by count, so push() is O(1) whatever the window size.
+
         Args:
             window (int): Number of past predictions to consider.
             min_votes (Optional[int]): Minimum votes needed for a label to be emitted.
@@ -16,32 +21,292 @@ class MajoritySmoother:
         self.window = window
         self.min_votes = min_votes if min_votes is not None else max(3, window // 2 + 1)
         self.buf = deque(maxlen=window)
+        self.counts: Dict[str, int] = {}
+        # _buckets[c] holds the labels seen exactly c times (dicts keep insertion order)
+        self._buckets: List[Dict[str, None]] = [{} for _ in range(window + 1)]
+        self._max = 0
+
+    def _inc(self, label: str):
+        c = self.counts.get(label, 0)
+        if c:
+            del self._buckets[c][label]
+        self.counts[label] = c + 1
+        self._buckets[c + 1][label] = None
+        if c + 1 > self._max:
+            self._max = c + 1
+
+    def _dec(self, label: str):
+        c = self.counts[label]
+        del self._buckets[c][label]
+        if c == 1:
+            del self.counts[label]
+        else:
+            self.counts[label] = c - 1
+            self._buckets[c - 1][label] = None
+        if c == self._max and not self._buckets[c]:
+            self._max = c - 1
 
-    def push(self, label: Optional[str]) -> Optional[str]:
+    def push(self, label: Optional[str], confidence: Optional[float] = None) -> Optional[str]:
         """
         Push a new label into the buffer and return the smoothed result.
 
         Args:
             label (Optional[str]): New prediction (or None for no detection).
+            confidence (Optional[float]): Ignored; accepted so all smoothers share one signature.
 
         Returns:
             Optional[str]: Smoothed prediction, or None if no dominant label yet.
         """
+        if len(self.buf) == self.window:
+            old = self.buf[0]
+            if old is not None:
+                self._dec(old)
         self.buf.append(label)
+        if label is not None:
+            self._inc(label)
 
-        if len(self.buf) < self.window:
+        if len(self.buf) < self.window or self._max < self.min_votes:
             return None
+        return next(iter(self._buckets[self._max]))
 
-        vals = [v for v in self.buf if v is not None]
-        if not vals:
-            return None
+    def clear(self):
+        """Reset the buffer."""
+        self.buf.clear()
+        self.counts.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+        self._max = 0
+
+
+class WeightedSmoother:
+    def __init__(self, window: int = 7, min_weight: Optional[float] = None):
+        """
+        Confidence-weighted vote over the last `window` predictions.
+
+        Each label scores the sum of its classifier probabilities in the window, so a
+        few confident frames outvote many uncertain ones.
+
+        Args:
+            window (int): Number of past predictions to consider.
+            min_weight (Optional[float]): Minimum summed confidence for a label to be
+                                          emitted. If None, defaults to window / 2.
+        """
+        self.window = window
+        self.min_weight = min_weight if min_weight is not None else window / 2
+        self.buf = deque(maxlen=window)
+        self.scores: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._leader: Optional[str] = None
 
-        top, cnt = Counter(vals).most_common(1)[0]
+    def push(self, label: Optional[str], confidence: Optional[float] = 1.0) -> Optional[str]:
+        """
+        Push a prediction with its confidence and return the smoothed result.
 
-        if cnt >= self.min_votes:
-            return top
-        return None
+        O(1) except when the current leader loses weight, which rescans the labels
+        present in the window (bounded by the number of classes, not the window).
+        """
+        weight = 1.0 if confidence is None else float(confidence)
+        if len(self.buf) == self.window:
+            old, old_w = self.buf[0]
+            if old is not None:
+                n = self._counts[old] - 1
+                if n:
+                    self._counts[old] = n
+                    self.scores[old] -= old_w
+                else:
+                    # Drop the label entirely so float residue never accumulates
+                    del self._counts[old], self.scores[old]
+                if old == self._leader:
+                    self._leader = max(self.scores, key=self.scores.get) if self.scores else None
+        self.buf.append((label, weight))
+        if label is not None:
+            self._counts[label] = self._counts.get(label, 0) + 1
+            self.scores[label] = self.scores.get(label, 0.0) + weight
+            if self._leader is None or self.scores[label] > self.scores[self._leader]:
+                self._leader = label
+
+        if len(self.buf) < self.window or self._leader is None:
+            return None
+        return self._leader if self.scores[self._leader] >= self.min_weight else None
 
     def clear(self):
         """Reset the buffer."""
         self.buf.clear()
+        self.scores.clear()
+        self._counts.clear()
+        self._leader = None
+
+
+class DecaySmoother:
+    def __init__(self, half_life: float = 4.0, min_share: float = 0.5, weighted: bool = True):
+        """
+        Exponential time-decay vote: every frame all scores decay by the same factor
+        and the new label gains its confidence, so recent frames count most and no
+        window has to be kept at all.
+
+        Scores are stored in inflated units (divided by the global decay so far), so a
+        push touches one label and is O(1); the uniform decay never changes the order.
+
+        Args:
+            half_life (float): Frames after which a vote counts half.
+            min_share (float): Emit the leader once its score reaches this share of the
+                               steady-state score of an unbroken full-confidence run.
+            weighted (bool): Weight votes by confidence (otherwise every vote counts 1).
+        """
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.min_score = min_share / (1.0 - self.decay)
+        self.weighted = weighted
+        self.scores: Dict[str, float] = {}
+        self._scale = 1.0       # true score = stored score * _scale
+        self._leader: Optional[str] = None
+
+    def push(self, label: Optional[str], confidence: Optional[float] = 1.0) -> Optional[str]:
+        """Push a prediction and return the smoothed result (see __init__)."""
+        self._scale *= self.decay
+        if self._scale < 1e-100:
+            self.scores = {k: v * self._scale for k, v in self.scores.items() if v * self._scale > 1e-12}
+            self._scale = 1.0
+            if self._leader not in self.scores:
+                self._leader = max(self.scores, key=self.scores.get) if self.scores else None
+        if label is not None:
+            weight = 1.0 if confidence is None or not self.weighted else float(confidence)
+            self.scores[label] = self.scores.get(label, 0.0) + weight / self._scale
+            if self._leader is None or self.scores[label] > self.scores[self._leader]:
+                self._leader = label
+
+        if self._leader is None:
+            return None
+        return self._leader if self.scores[self._leader] * self._scale >= self.min_score else None
+
+    def clear(self):
+        """Reset all scores."""
+        self.scores.clear()
+        self._scale = 1.0
+        self._leader = None
+
+
+# ------------------------------------------------------------------------------------
+# Offline batch mode
+# ------------------------------------------------------------------------------------
+def _encode(labels: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Label codes in order of first appearance, -1 for None."""
+    names: Dict[str, int] = {}
+    codes = np.fromiter((-1 if l is None else names.setdefault(l, len(names)) for l in labels),
+                        dtype=np.int64, count=len(labels))
+    return codes, list(names)
+
+
+def _decayed_sums(votes: np.ndarray, decay: float) -> np.ndarray:
+    """s[t] = decay * s[t-1] + votes[t], computed in chunks of closed-form cumsums."""
+    out = np.empty_like(votes)
+    chunk = max(1, int(200 / -np.log10(decay)))  # keep decay**-chunk far below float64 overflow
+    carry = np.zeros(votes.shape[1])
+    for start in range(0, len(votes), chunk):
+        v = votes[start:start + chunk]
+        p = decay ** np.arange(1, len(v) + 1)[:, None]
+        out[start:start + len(v)] = p * (carry + np.cumsum(v / p, axis=0))
+        carry = out[start + len(v) - 1]
+    return out
+
+
+def smooth_sequence(labels: Sequence[Optional[str]], confidences: Optional[Sequence[float]] = None,
+                    mode: str = "majority", window: int = 7, min_votes: Optional[int] = None,
+                    min_weight: Optional[float] = None, half_life: float = 4.0,
+                    min_share: float = 0.5) -> List[Optional[str]]:
+    """
+    Smooth a whole recorded prediction sequence at once (for offline evaluation).
+
+    Produces the same output as pushing the sequence frame by frame through the
+    matching streaming smoother, but with a handful of NumPy passes.
+
+    Args:
+        labels: Per-frame predictions (None for no detection).
+        confidences: Per-frame top-class probabilities (defaults to 1.0).
+        mode (str): "majority", "weighted" or "decay".
+        window, min_votes, min_weight, half_life, min_share: As for the streaming classes.
+
+    Returns:
+        List[Optional[str]]: Smoothed label per frame.
+    """
+    codes, names = _encode(labels)
+    if not names:
+        return [None] * len(codes)
+    if mode == "majority" or confidences is None:
+        weights = np.ones(len(codes))
+    else:
+        weights = np.asarray(confidences, dtype=np.float64)
+    votes = np.zeros((len(codes), len(names)))
+    hit = codes >= 0
+    votes[np.flatnonzero(hit), codes[hit]] = weights[hit]
+
+    if mode in ("majority", "weighted"):
+        csum = np.cumsum(votes, axis=0)
+        scores = csum.copy()
+        scores[window:] -= csum[:-window]
+        if mode == "majority":
+            threshold = min_votes if min_votes is not None else max(3, window // 2 + 1)
+        else:
+            threshold = min_weight if min_weight is not None else window / 2
+        warm = np.arange(len(codes)) >= window - 1
+    elif mode == "decay":
+        decay = 0.5 ** (1.0 / half_life)
+        scores = _decayed_sums(votes, decay)
+        threshold = min_share / (1.0 - decay)
+        warm = np.ones(len(codes), dtype=bool)
+    else:
+        raise ValueError(f"Unknown mode {mode!r} (expected 'majority', 'weighted' or 'decay')")
+
+    best = scores.argmax(axis=1)
+    ok = warm & (scores[np.arange(len(codes)), best] >= threshold - 1e-9)
+    return [names[b] if emit else None for b, emit in zip(best, ok)]
+
+
+if __name__ == "__main__":
+    import time
+    from collections import Counter
+
+    def reference(seq, window):
+        # The original list + Counter implementation, for the equivalence check
+        buf, out = deque(maxlen=window), []
+        min_votes = max(3, window // 2 + 1)
+        for label in seq:
+            buf.append(label)
+            vals = [v for v in buf if v is not None]
+            top = None
+            if len(buf) == window and vals:
+                top, cnt = Counter(vals).most_common(1)[0]
+                top = top if cnt >= min_votes else None
+            out.append(top)
+        return out
+
+    rng = np.random.default_rng(0)
+    alphabet = [None, "A", "B", "C", "D"]
+    # Runs of a label with noise, like a live session
+    runs = rng.choice(len(alphabet), 400)
+    seq = [alphabet[c] if rng.random() > 0.25 else alphabet[rng.integers(len(alphabet))]
+           for c in np.repeat(runs, rng.integers(3, 25, len(runs)))]
+    conf = rng.uniform(0.2, 1.0, len(seq))
+
+    for window in (7, 15):
+        s = MajoritySmoother(window)
+        stream = [s.push(l) for l in seq]
+        assert stream == reference(seq, window) == smooth_sequence(seq, window=window), window
+    w = WeightedSmoother(7)
+    assert [w.push(l, c) for l, c in zip(seq, conf)] == smooth_sequence(seq, conf, mode="weighted")
+    d = DecaySmoother(4.0)
+    assert [d.push(l, c) for l, c in zip(seq, conf)] == smooth_sequence(seq, conf, mode="decay")
+    print(f"Streaming == batch == original on {len(seq)} frames")
+
+    n = 200_000
+    big = (seq * (n // len(seq) + 1))[:n]
+    big_conf = np.resize(conf, n)
+    for window in (7, 31, 127, 511):
+        for name, smoother in (("majority", MajoritySmoother(window)), ("weighted", WeightedSmoother(window))):
+            t0 = time.perf_counter()
+            for l, c in zip(big, big_conf):
+                smoother.push(l, c)
+            us = (time.perf_counter() - t0) / n * 1e6
+            print(f"  window {window:4d} {name:9s} push: {us:.2f} us")
+    t0 = time.perf_counter()
+    smooth_sequence(big, big_conf, mode="decay")
+    print(f"  batch decay: {n / (time.perf_counter() - t0):,.0f} frames/s")
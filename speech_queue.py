@@ -0,0 +1,190 @@
+from __future__ import annotations
+import queue
+import re
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from tts_engine import DEFAULT_RATE, SpeechSynthesizer
+
+MAX_CHUNK_WORDS = 12
+LOOKAHEAD_CHUNKS = 2
+_SENTENCE_RE = re.compile(r"[^.!?;:\n]+[.!?;:]*")
+
+
+def split_chunks(text: str, mode: str = "sentence", max_words: int = MAX_CHUNK_WORDS) -> List[str]:
+    """
+    Split text into speakable chunks.
+
+    Args:
+        text (str): Text to speak.
+        mode (str): "sentence" splits on punctuation, "word" yields single words.
+        max_words (int): Long sentences are cut into pieces of at most this many words,
+                         which bounds the synthesis time of any single chunk.
+    """
+    words_only = mode == "word"
+    pieces = text.split() if words_only else [s.strip() for s in _SENTENCE_RE.findall(text)]
+    chunks = []
+    for piece in pieces:
+        words = piece.split()
+        for i in range(0, len(words), max_words):
+            chunks.append(" ".join(words[i:i + max_words]))
+    return [c for c in chunks if c]
+
+
+class _Job:
+    __slots__ = ("generation", "chunks", "language_code", "gender", "rate", "submitted")
+
+    def __init__(self, generation, chunks, language_code, gender, rate):
+        self.generation = generation
+        self.chunks = chunks
+        self.language_code = language_code
+        self.gender = gender
+        self.rate = rate
+        self.submitted = time.perf_counter()
+
+
+class SpeechWorker:
+    """
+    Persistent speech queue with chunked synthesis and barge-in.
+
+    A synthesis thread renders chunk N+1 while a playback thread plays chunk
+    N, so time-to-first-audio only depends on the first chunk. `stop()` and
+    `say(..., replace=True)` bump a generation counter that makes both
+    threads drop everything queued so far. Status changes are posted to
+    `status_queue` as (state, message) tuples for the UI thread to poll;
+    the worker never touches widgets.
+    """
+
+    def __init__(self, synthesizer: SpeechSynthesizer, status_queue: Optional[queue.Queue] = None):
+        self.synthesizer = synthesizer
+        self.status_queue = status_queue if status_queue is not None else queue.Queue()
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._ready: "queue.Queue[tuple]" = queue.Queue(maxsize=LOOKAHEAD_CHUNKS)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._playing = threading.Event()
+        self._pending = 0
+        self.first_audio_ms: List[float] = []
+
+        threading.Thread(target=self._synth_loop, name="speech-synth", daemon=True).start()
+        threading.Thread(target=self._play_loop, name="speech-play", daemon=True).start()
+
+    # -- public API (any thread) -----------------------------------------------------
+    def say(self, text: str, language_code: str, gender: str = "Male", rate: float = DEFAULT_RATE,
+            replace: bool = False, mode: str = "sentence"):
+        chunks = split_chunks(text, mode)
+        if not chunks:
+            return
+        with self._lock:
+            if replace:
+                self._cancel_locked()
+            self._pending += 1
+            self._jobs.put(_Job(self._generation, chunks, language_code, gender, rate))
+
+    def stop(self):
+        with self._lock:
+            self._cancel_locked()
+        self._post("ready", "Ready")
+
+    @property
+    def busy(self) -> bool:
+        return self._pending > 0 or self._playing.is_set()
+
+    def metrics(self) -> dict:
+        """Time-to-first-audio statistics (ms) over all utterances so far."""
+        if not self.first_audio_ms:
+            return {"utterances": 0}
+        samples = np.asarray(self.first_audio_ms)
+        p50, p95 = np.percentile(samples, [50, 95])
+        return {"utterances": len(samples), "ttfa_p50_ms": float(p50), "ttfa_p95_ms": float(p95),
+                "ttfa_last_ms": float(samples[-1])}
+
+    # -- internals --------------------------------------------------------------------
+    def _cancel_locked(self):
+        self._generation += 1
+        self._pending = 0
+        for q in (self._jobs, self._ready):
+            try:
+                while True:
+                    q.get_nowait()
+            except queue.Empty:
+                pass
+        self.synthesizer.stop()
+
+    def _current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _post(self, state: str, message: str):
+        self.status_queue.put((state, message))
+
+    def _synth_loop(self):
+        while True:
+            job = self._jobs.get()
+            if not self._current(job.generation):
+                continue
+            self._post("generating", "Generating speech...")
+            for i, chunk in enumerate(job.chunks):
+                if not self._current(job.generation):
+                    break
+                try:
+                    audio = self.synthesizer.synthesize(chunk, job.language_code, job.gender, job.rate)
+                except Exception as e:
+                    print(f"TTS Error: {e}")
+                    self._post("error", "Speech error")
+                    with self._lock:
+                        if self._current(job.generation):
+                            self._pending = max(0, self._pending - 1)
+                    break
+                last = i == len(job.chunks) - 1
+                while self._current(job.generation):
+                    try:
+                        self._ready.put((job, i, audio, last), timeout=0.05)
+                        break
+                    except queue.Full:
+                        continue
+
+    def _play_loop(self):
+        while True:
+            job, index, audio, last = self._ready.get()
+            if not self._current(job.generation):
+                continue
+            self._playing.set()
+            if index == 0:
+                ttfa = (time.perf_counter() - job.submitted) * 1000.0
+                self.first_audio_ms.append(ttfa)
+                self._post("speaking", "Speaking...")
+            try:
+                # Check and start together: a stop()/replace in between would cancel before the
+                # channel exists and the stale chunk would play over the new speech
+                with self._lock:
+                    channel = self.synthesizer.play(audio) if self._current(job.generation) else None
+                while channel is not None and self._current(job.generation) and self.synthesizer.is_playing():
+                    time.sleep(0.02)
+                if channel is not None and not self._current(job.generation):
+                    channel.stop()
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                self._post("error", "Speech error")
+            if last and self._current(job.generation):
+                with self._lock:
+                    self._pending = max(0, self._pending - 1)
+            self._playing.clear()
+            if self._current(job.generation) and self._ready.empty() and self._pending == 0:
+                self._post("ready", "Ready")
+
+
+if __name__ == "__main__":
+    # Time-to-first-audio should stay flat as the transcript grows
+    worker = SpeechWorker(SpeechSynthesizer())
+    sentence = "This is a test sentence for streaming speech. "
+    for n in (1, 4, 16):
+        before = len(worker.first_audio_ms)
+        worker.say(sentence * n, "en", replace=True)
+        while len(worker.first_audio_ms) == before:
+            time.sleep(0.01)
+        print(f"{n:2d} sentences: time to first audio {worker.first_audio_ms[-1]:.1f} ms")
+        worker.stop()
+    print(worker.metrics())
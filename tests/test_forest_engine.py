@@ -0,0 +1,110 @@
+import types
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from forest_engine import CompiledForest, compile_model
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((1500, 63), dtype=np.float32)
+    y = np.array(list("ABCDEFGHIJ"))[(X[:, :10].argmax(axis=1) + (X[:, 10] > 0.5)) % 10]
+    return X, y
+
+
+def assert_matches(model, X):
+    engine = compile_model(model)
+    assert isinstance(engine, CompiledForest)
+    labels, proba = engine.predict_with_proba(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_array_equal(engine.predict(X), model.predict(X))
+    np.testing.assert_allclose(proba, model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=30, random_state=0),
+    ExtraTreesClassifier(n_estimators=30, random_state=0),
+    DecisionTreeClassifier(random_state=0),
+    # Best-first builder: nodes are not stored in preorder
+    RandomForestClassifier(n_estimators=10, max_leaf_nodes=40, random_state=0),
+    # Stumps: every tree is a single split
+    RandomForestClassifier(n_estimators=10, max_depth=1, random_state=0),
+], ids=["forest", "extra-trees", "tree", "best-first", "stumps"])
+def test_compiled_matches_sklearn(model, data):
+    X, y = data
+    model.fit(X[:1000], y[:1000])
+    assert_matches(model, X)
+    assert_matches(model, X[1000:1001])  # a single frame
+
+
+def test_single_class_forest(data):
+    X, _ = data
+    # One class only: every tree is a lone leaf
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X[:50], np.zeros(50, dtype=int))
+    assert_matches(model, X[:20])
+
+
+def _caterpillar(n_chain: int):
+    """
+    Hand-built tree whose root's left subtree is a chain of `n_chain` splits, each with a
+    leaf on its right, so the root's right child is 2 * n_chain + 1 nodes away.
+    """
+    left, right, feature, threshold, value = [], [], [], [], []
+
+    def node(f, t, v=(1.0, 1.0, 1.0)):
+        left.append(-1), right.append(-1), feature.append(f), threshold.append(t), value.append(v)
+        return len(left) - 1
+
+    root = node(1, 0.5)
+    parent, side = root, left
+    for k in range(n_chain):
+        split = node(0, n_chain - k - 0.5)
+        side[parent] = split
+        right[split] = node(-2, -2.0, (k % 2, 1 - k % 2, 0.0))
+        parent, side = split, left
+    left[parent] = node(-2, -2.0, (0.0, 0.0, 1.0))
+    right[root] = node(-2, -2.0, (1.0, 0.0, 4.0))
+
+    tree = types.SimpleNamespace(
+        children_left=np.array(left), children_right=np.array(right), feature=np.array(feature),
+        threshold=np.array(threshold, dtype=np.float64), value=np.array(value, dtype=np.float64)[:, None, :],
+        max_depth=n_chain + 1, n_outputs=1)
+    model = types.SimpleNamespace(estimators_=[types.SimpleNamespace(tree_=tree)], n_features_in_=2,
+                                  classes_=np.array([0, 1, 2]))
+    return model, tree
+
+
+def _walk(tree, x):
+    node = 0
+    while tree.children_left[node] != -1:
+        go_right = np.float32(x[tree.feature[node]]) > tree.threshold[node]
+        node = tree.children_right[node] if go_right else tree.children_left[node]
+    v = tree.value[node, 0]
+    return v / v.sum()
+
+
+@pytest.mark.parametrize("n_chain", [16382, 16383, 16384])
+def test_skip_at_the_int16_limit(n_chain):
+    # 16383 links put the root's skip at exactly 32767, the largest int16
+    model, tree = _caterpillar(n_chain)
+    engine = CompiledForest.from_sklearn(model)
+    assert int(engine.skip.max()) == 2 * n_chain + 1
+    assert np.iinfo(engine.skip.dtype).max > engine.skip.max()
+
+    X = np.array([[0.0, 1.0], [0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [n_chain, 0.0], [n_chain + 1, 0.0]],
+                 dtype=np.float32)
+    expected = np.array([_walk(tree, x) for x in X])
+    np.testing.assert_allclose(engine.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_legacy_int16_skip_does_not_overflow():
+    # Tables compiled before the dtype fix (or loaded from an old .wtm) may hold 32767 in int16
+    model, tree = _caterpillar(16383)
+    engine = CompiledForest.from_sklearn(model)
+    engine.skip = engine.skip.astype(np.int16)
+    X = np.array([[0.0, 1.0], [0.0, 0.0], [5.0, 0.0]], dtype=np.float32)
+    np.testing.assert_allclose(engine.predict_proba(X), [_walk(tree, x) for x in X], rtol=0, atol=1e-12)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from conftest import ROOT
+from dataset_store import LandmarkStore
+
+
+def _run(args, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+def _fill(store, n, labels, seed):
+    rng = np.random.default_rng(seed)
+    shapes = rng.random((len(labels), 21, 3)).astype(np.float32) * [0.15, 0.25, 0.05] + [0.4, 0.35, -0.02]
+    ids = rng.integers(len(labels), size=n)
+    store.append(shapes[ids] + rng.normal(0, 0.01, (n, 21, 3)), [labels[i] for i in ids])
+
+
+def test_cli_model_loads_in_a_fresh_process(tmp_path):
+    store_dir, model = str(tmp_path / "store"), str(tmp_path / "incremental.pkl")
+    store = LandmarkStore(store_dir)
+    _fill(store, 300, ["A", "B", "C"], seed=0)
+    _run([os.path.join(ROOT, "incremental_model.py"), "init", "--store", store_dir, "--model", model], cwd=ROOT)
+
+    _fill(store, 100, ["D"], seed=1)
+    _run([os.path.join(ROOT, "incremental_model.py"), "update", "--store", store_dir, "--model", model], cwd=ROOT)
+
+    # What the app's ModelWatcher does: read_model in another process
+    out = _run(["-c", "import sys; from model_registry import read_model; m = read_model(sys.argv[1]); "
+                      "print(type(m).__module__, ' '.join(m.classes_))", model], cwd=str(tmp_path))
+    assert out.stdout.split() == ["incremental_model", "A", "B", "C", "D"]
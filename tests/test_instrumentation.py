@@ -0,0 +1,107 @@
+import csv
+import json
+import threading
+import time
+
+from instrumentation import _NULL_STAGE, Profiler
+
+# 10 instrumented stages per frame must stay under 0.1% of a 30 fps frame
+STAGES_PER_FRAME = 10
+FRAME_NS = 1e9 / 30
+BUDGET_NS = 0.001 * FRAME_NS / STAGES_PER_FRAME
+
+
+def test_disabled_stage_is_the_shared_null_stage():
+    profiler = Profiler(enabled=False)
+    assert profiler.stage("a") is _NULL_STAGE
+    assert profiler.stage("b") is _NULL_STAGE
+    with profiler.stage("a"):
+        pass
+    assert profiler.summary() == {}
+    assert profiler.export("unused") is None  # nothing recorded, nothing written
+
+
+def test_disabled_overhead_per_stage_is_negligible():
+    profiler = Profiler(enabled=False)
+    n = 50_000
+
+    def bare():
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            pass
+        return (time.perf_counter_ns() - t0) / n
+
+    def instrumented():
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            with profiler.stage("stage"):
+                pass
+        return (time.perf_counter_ns() - t0) / n
+
+    cost = min(instrumented() for _ in range(5)) - min(bare() for _ in range(5))
+    assert cost < BUDGET_NS, f"disabled stage costs {cost:.0f} ns (budget {BUDGET_NS:.0f} ns)"
+
+
+def _recorded_profiler():
+    profiler = Profiler(enabled=True)
+    for _ in range(3):
+        with profiler.stage("capture"):
+            time.sleep(0.001)
+        with profiler.stage("hands.process"):
+            pass
+
+    def worker():
+        with profiler.stage("classify"):
+            pass
+
+    t = threading.Thread(target=worker, name="inference")
+    t.start()
+    t.join()
+    return profiler
+
+
+def test_summary_percentiles():
+    summary = _recorded_profiler().summary()
+    assert set(summary) == {"capture", "hands.process", "classify"}
+    assert summary["capture"]["n"] == 3
+    assert summary["capture"]["p50"] >= 1.0  # ms
+    assert summary["capture"]["p50"] <= summary["capture"]["p95"] <= summary["capture"]["p99"]
+
+
+def test_export_chrome_trace(tmp_path):
+    path = tmp_path / "sub" / "trace.json"
+    assert _recorded_profiler().export_chrome_trace(str(path)) == 7
+
+    trace = json.loads(path.read_text())
+    events = trace["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == 7
+    for e in spans:
+        assert {"name", "cat", "pid", "tid", "ts", "dur"} <= set(e)
+        assert e["ts"] >= 0 and e["dur"] >= 0
+    assert [e["name"] for e in spans].count("capture") == 3
+    assert all(e["dur"] >= 1000 for e in spans if e["name"] == "capture")  # µs
+    names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M" and e["name"] == "thread_name"}
+    assert "inference" in names.values()
+    assert {e["tid"] for e in spans} <= set(names)
+
+
+def test_export_csv(tmp_path):
+    path = tmp_path / "trace.csv"
+    assert _recorded_profiler().export_csv(str(path)) == 7
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 7
+    assert list(rows[0]) == ["stage", "thread", "start_ms", "duration_ms"]
+    assert {r["stage"] for r in rows} == {"capture", "hands.process", "classify"}
+    assert {r["thread"] for r in rows if r["stage"] == "classify"} == {"inference"}
+    assert all(float(r["start_ms"]) >= 0 and float(r["duration_ms"]) >= 0 for r in rows)
+
+
+def test_export_writes_both_formats(tmp_path):
+    base = _recorded_profiler().export(str(tmp_path), prefix="t")
+    with open(base + ".json") as f:
+        assert len([e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]) == 7
+    with open(base + ".csv") as f:
+        assert len(f.read().splitlines()) == 8
@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import StageStats
+
+
+def test_busy_ms_and_fps_over_the_window():
+    stats = StageStats("s", window=10.0)
+    for busy in (0.001, 0.002, 0.003):
+        stats.tick(busy)
+    assert stats.count == 3
+    assert stats.busy_ms == pytest.approx(2.0)
+    assert stats.fps > 0
+
+
+def test_old_events_leave_the_busy_sum():
+    stats = StageStats("s", window=0.05)
+    stats.tick(1.0)
+    time.sleep(0.1)
+    stats.tick(0.004)
+    assert stats.busy_ms == pytest.approx(4.0)
+
+
+def test_reads_while_another_thread_ticks():
+    # The UI thread reads fps/busy_ms while capture and inference threads tick
+    stats = StageStats("s", window=0.001)
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            stats.tick(0.001)
+
+    threads = [threading.Thread(target=writer) for _ in range(2)]
+    for t in threads:
+        t.start()
+    try:
+        t_end = time.perf_counter() + 1.0
+        while time.perf_counter() < t_end:
+            stats.busy_ms
+            stats.fps
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+    assert stats.count > 0
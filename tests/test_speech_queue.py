@@ -0,0 +1,79 @@
+import threading
+import time
+
+from speech_queue import SpeechWorker
+
+
+class FakeChannel:
+    def __init__(self, audio):
+        self.audio = audio
+        self.playing = True
+
+    def stop(self):
+        self.playing = False
+
+
+class FakeSynthesizer:
+    """Clips play until stopped, like a long utterance."""
+
+    def __init__(self):
+        self.channels = []
+        self._channel = None
+
+    def synthesize(self, text, language_code, gender, rate):
+        return text.encode()
+
+    def play(self, audio):
+        self._channel = FakeChannel(audio)
+        self.channels.append(self._channel)
+        return self._channel
+
+    def is_playing(self):
+        return self._channel is not None and self._channel.playing
+
+    def stop(self):
+        if self._channel is not None:
+            self._channel.stop()
+        self._channel = None
+
+
+def _wait_for(condition, timeout=2.0):
+    t_end = time.monotonic() + timeout
+    while time.monotonic() < t_end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_barge_in_between_the_check_and_play_silences_the_old_chunk():
+    synth = FakeSynthesizer()
+    worker = SpeechWorker(synth)
+    current = worker._current
+    fired = []
+
+    def racing_current(generation):
+        # The playback thread has just decided the old chunk is current; barge in right then
+        result = current(generation)
+        if threading.current_thread().name == "speech-play" and not fired:
+            fired.append(True)
+            threading.Thread(target=worker.say, args=("new words", "en"), kwargs={"replace": True}).start()
+            time.sleep(0.1)
+        return result
+
+    worker._current = racing_current
+    worker.say("old words", "en")
+    assert _wait_for(lambda: any(c.audio == b"new words" for c in synth.channels))
+    old = [c for c in synth.channels if c.audio == b"old words"]
+    assert _wait_for(lambda: not any(c.playing for c in old)), "stale chunk still playing"
+    assert [c.audio for c in synth.channels if c.playing] == [b"new words"]
+    worker.stop()
+
+
+def test_stop_silences_playback():
+    synth = FakeSynthesizer()
+    worker = SpeechWorker(synth)
+    worker.say("hello there", "en")
+    assert _wait_for(lambda: synth.channels and synth.channels[-1].playing)
+    worker.stop()
+    assert _wait_for(lambda: not any(c.playing for c in synth.channels))
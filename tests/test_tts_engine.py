@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import tts_engine
+from tts_engine import AudioCache, SpeechSynthesizer, TTSBackend
+
+
+class OnlineBackend(TTSBackend):
+    name = "online"
+    offline = False
+
+    def synthesize(self, text, language_code, gender, rate):
+        return b"online:" + text.encode()
+
+
+class OfflineBackend(TTSBackend):
+    name = "offline"
+
+    def synthesize(self, text, language_code, gender, rate):
+        return b"offline:" + text.encode()
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    monkeypatch.setitem(tts_engine.BACKENDS, "online", OnlineBackend)
+    monkeypatch.setitem(tts_engine.BACKENDS, "offline", OfflineBackend)
+
+
+def test_fallback_clips_are_not_persisted(tmp_path, backends):
+    synth = SpeechSynthesizer(["online"], cache=AudioCache(cache_dir=str(tmp_path)))
+    assert synth.synthesize("hello", "en") == b"online:hello"
+    assert os.listdir(tmp_path) == []
+
+    # Once the offline engine is there, a restart must not replay the fallback clip
+    synth = SpeechSynthesizer(["offline", "online"], cache=AudioCache(cache_dir=str(tmp_path)))
+    assert synth.synthesize("hello", "en") == b"offline:hello"
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_disk_hits_survive_a_restart(tmp_path):
+    key = AudioCache.make_key("thank you", "en", "Male", 1.0)
+    AudioCache(cache_dir=str(tmp_path)).put(key, b"clip")
+    cache = AudioCache(cache_dir=str(tmp_path))
+    assert cache.get(key) == b"clip"
+    assert cache.get(AudioCache.make_key("other", "en", "Male", 1.0)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -1,68 +1,180 @@
 import os
-import cv2
+import argparse
+import json
 import numpy as np
-import joblib
 from sklearn.ensemble import RandomForestClassifier
-import mediapipe as mp
+
+from dataset_store import STORE_DIR, open_store
+from landmark_augment import CHUNK_SIZE, augment_stream
+from landmark_ingest import ingest_images
+from model_artifact import artifact_path, export_model
+from model_registry import save_model
+from model_selection import CV_FOLDS, LATENCY_BUDGET_MS, format_report, search, select
+from utils_landmarks import FEATURE_DIM, RAW_DIM, model_input
 
 # Paths
 WEBCAM_DATA_DIR = "data"  # your own .npy gesture folders
 EXTERNAL_IMG_DIR = "external_asl_images/combine_asl_dataset"  # images from Kaggle dataset
 MODEL_PATH = "models/sign_classifier.pkl"
+REPORT_PATH = "models/selection_report.json"
+
+
+def load_webcam_data(data_dir=WEBCAM_DATA_DIR):
+    X, y = [], []
+    for gesture in reversed(os.listdir(data_dir)):
+        gesture_path = os.path.join(data_dir, gesture)
+        if os.path.isdir(gesture_path):
+            for fname in reversed(os.listdir(gesture_path)):
+                if fname.endswith(".npy"):
+                    file_path = os.path.join(gesture_path, fname)
+                    print(f"[WEBCAM DATA] Loading {file_path}")
+                    X.append(np.load(file_path))
+                    y.append(gesture)
+    return X, y
+
+
+def stream_store(store, n_features, X_ext, y_ext):
+    """
+    Classifier input for the external samples followed by every store row.
+
+    The store is read in `iter_chunks` slices and each slice is converted straight into its
+    rows of one preallocated matrix, so the raw landmarks are never copied out as a whole.
+    """
+    n_ext = len(X_ext)
+    X = np.empty((n_ext + store.count, n_features), dtype=np.float32)
+    classes = np.asarray(store.classes, dtype=str)
+    y = np.empty(len(X), dtype=np.result_type(np.asarray(y_ext, dtype=str), classes))
+    if n_ext:
+        X[:n_ext] = model_input(X_ext, n_features)
+        y[:n_ext] = y_ext
+    row = n_ext
+    for feats, codes in store.iter_chunks():
+        X[row:row + len(feats)] = model_input(feats, n_features)
+        y[row:row + len(feats)] = classes[codes]
+        row += len(feats)
+    return X, y
+
+
+def fit_augmented(estimator, X_raw, y, n_features, n_augment, seed=0, chunk_size=CHUNK_SIZE, n_jobs=-1,
+                  X_real=None):
+    """
+    Fit a fresh copy of `estimator` on the real samples plus `n_augment` augmented ones.
+
+    Augmented samples are streamed from landmark_augment in chunks and never all held in
+    memory. Forests grow their trees chunk by chunk (warm_start): each chunk's trees see the
+    real samples plus that chunk. Other models see the real samples plus one chunk.
+    `X_real` is the classifier input for `X_raw` when the caller has already built it.
+    """
+    from sklearn.base import clone
+    model = clone(estimator)
+    if X_real is None:
+        X_real = model_input(X_raw, n_features)
+    if not hasattr(model, "n_estimators"):
+        chunk, labels = next(augment_stream(X_raw, y, min(n_augment, chunk_size), chunk_size, seed))
+        print(f"[AUGMENT] {type(model).__name__} can't grow per chunk; training on one chunk of {len(chunk)}")
+        return model.fit(np.concatenate([X_real, model_input(chunk, n_features)]), np.concatenate([y, labels]))
+
+    n_trees = model.n_estimators
+    n_chunks = min(-(-n_augment // chunk_size), n_trees)  # at least one tree per chunk
+    chunk_size = -(-n_augment // n_chunks)                 # equal chunks
+    model.set_params(warm_start=True, n_jobs=n_jobs)
+    for i, (chunk, labels) in enumerate(augment_stream(X_raw, y, n_augment, chunk_size, seed)):
+        model.set_params(n_estimators=round((i + 1) * n_trees / n_chunks))
+        model.fit(np.concatenate([X_real, model_input(chunk, n_features)]), np.concatenate([y, labels]))
+        print(f"[AUGMENT] chunk {i + 1}/{n_chunks}: {len(chunk)} samples, {model.n_estimators} trees")
+    model.set_params(warm_start=False)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the sign classifier")
+    parser.add_argument("--store", default=STORE_DIR, help="landmark dataset store directory")
+    parser.add_argument("--features", choices=["hand", "raw"], default="hand",
+                        help="normalized hand features (88) or raw landmark coordinates (63)")
+    parser.add_argument("--external", action="store_true",
+                        help=f"also train on the image dataset in {EXTERNAL_IMG_DIR}")
+    parser.add_argument("--workers", type=int, default=None, help="landmark extraction processes")
+    parser.add_argument("--reduce", type=int, default=1, help="decode external images at 1/N resolution")
+    parser.add_argument("--budget-ms", type=float, default=LATENCY_BUDGET_MS,
+                        help="per-frame (p95) classifier latency budget for model selection")
+    parser.add_argument("--folds", type=int, default=CV_FOLDS)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel training jobs (-1: all cores)")
+    parser.add_argument("--no-select", action="store_true",
+                        help="skip the candidate search and train the default 200-tree forest")
+    parser.add_argument("--no-export", action="store_true",
+                        help=f"don't write the compact .wtm artifact next to {MODEL_PATH}")
+    parser.add_argument("--augment", type=int, default=0, metavar="N",
+                        help="refit the chosen model with N augmented samples streamed in chunks "
+                             "(model selection still cross-validates on real samples only)")
+    parser.add_argument("--seed", type=int, default=0, help="augmentation seed")
+    args = parser.parse_args()
+
+    X_ext, y_ext = np.zeros((0, RAW_DIM), dtype=np.float32), np.array([], dtype=str)
+    n_features = FEATURE_DIM if args.features == "hand" else RAW_DIM
+
+    # 1. From external image dataset (parallel, cached by image content hash)
+    if args.external:
+        X_ext, y_ext, stats = ingest_images(EXTERNAL_IMG_DIR, workers=args.workers, reduce=args.reduce)
+        print(f"[EXTERNAL DATA] {len(X_ext)} samples from {stats['images']} images "
+              f"({stats['extracted']} newly extracted, {stats['no_hand']} without a hand) "
+              f"in {stats['total_s']:.1f}s")
+
+    # 2. From your webcam-collected samples (dataset store, or legacy .npy folders)
+    store = open_store(args.store)
+    groups = None
+    if store is not None:
+        X, y = stream_store(store, n_features, X_ext, y_ext)
+        X_raw = None  # raw landmarks are only gathered if --augment needs them
+        # Cross-validation folds are split by collection session; every image is its own group
+        sessions = np.asarray(store.column("sessions"), dtype=np.int64)
+        offset = int(sessions.max()) + 1 if len(sessions) else 0
+        groups = np.concatenate([offset + np.arange(len(X_ext)), sessions])
+        print(f"[WEBCAM DATA] {store.count} samples from {args.store}")
+    else:
+        print(f"[WEBCAM DATA] No store at {args.store}; reading .npy folders "
+              f"(run 'python dataset_store.py import --npy {WEBCAM_DATA_DIR}' to convert)")
+        X_cam, y_cam = load_webcam_data()
+        X_raw = np.concatenate([X_ext, np.asarray(X_cam, dtype=np.float32).reshape(-1, RAW_DIM)])
+        y = np.concatenate([y_ext, np.asarray(y_cam, dtype=str)])
+        X = model_input(X_raw, n_features)
+
+    print(f"Training on {len(X)} samples across {len(set(y))} classes ({X.shape[1]} features).")
+
+    if args.no_select:
+        clf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=args.jobs)
+        clf.fit(X, y)
+        meta = {"candidate": "rf-200"}
+    else:
+        report = search(X, y, groups, folds=args.folds, n_jobs=args.jobs)
+        chosen = select(report, args.budget_ms)
+        print(format_report(report, chosen, args.budget_ms))
+        os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+        with open(REPORT_PATH, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "chosen": chosen["name"],
+                       "candidates": [{k: v for k, v in r.items() if k != "model"} for r in report]}, f, indent=4)
+        clf = chosen["model"]
+        meta = {k: chosen[k] for k in ("cv_accuracy", "latency_p95_ms")}
+        meta.update(candidate=chosen["name"], latency_ms=round(chosen["latency_p50_ms"], 4))
+    if args.augment:
+        if X_raw is None:
+            # augment_stream only reads the rows it draws, so the store can stay memory-mapped
+            X_raw = store.features() if not len(X_ext) else np.concatenate([X_ext, store.features()])
+        clf = fit_augmented(clf, X_raw, y, n_features, args.augment, seed=args.seed, n_jobs=args.jobs,
+                            X_real=X)
+        meta.update(augmented=args.augment, augment_seed=args.seed)
+    if hasattr(clf, "n_jobs"):
+        clf.n_jobs = None  # parallel fitting only; per-frame inference is single-threaded
+
+    # Atomic write + metadata sidecar, so a running app's ModelWatcher can pick it up live
+    info = save_model(clf, MODEL_PATH, n_samples=len(X), **meta)
+    print(f"Saved trained model to {MODEL_PATH}: {info}")
+
+    # Tree models also get the compact artifact, which the app prefers (mmap load in milliseconds)
+    if not args.no_export and hasattr(clf, "estimators_") and hasattr(clf.estimators_[0], "tree_"):
+        wtm = artifact_path(MODEL_PATH)
+        export_model(clf, wtm, source=os.path.basename(MODEL_PATH), n_samples=len(X), **meta)
+        print(f"Exported {wtm} ({os.path.getsize(wtm) / 1e6:.1f} MB)")
+
 
-# Setup Mediapipe for landmark extraction
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.7)
-mp_draw = mp.solutions.drawing_utils
-
-def extract_landmarks_from_image(img_path):
-    img = cv2.imread(img_path)
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    results = hands.process(img)
-    if not results.multi_hand_landmarks:
-        return None
-    # take the first hand
-    landmarks = []
-    for lm in results.multi_hand_landmarks[0].landmark:
-        landmarks.extend([lm.x, lm.y, lm.z])
-    return np.array(landmarks, dtype=np.float32)
-
-X, y = [], []
-
-# 1. From external image dataset
-# for label in os.listdir(EXTERNAL_IMG_DIR):
-#     label_dir = os.path.join(EXTERNAL_IMG_DIR, label)
-#     if os.path.isdir(label_dir):
-#         for fname in os.listdir(label_dir):
-#             if fname.lower().endswith((".jpg", ".jpeg", ".png")):
-#                 img_path = os.path.join(label_dir, fname)
-#                 print(f"[EXTERNAL DATA] Processing {img_path}")
-#                 pts = extract_landmarks_from_image(img_path)
-#                 if pts is not None:
-#                     X.append(pts)
-#                     y.append(label)
-#                 else:
-#                     print(f"⚠️ No hand detected in {img_path}")
-
-# 2. From your webcam-collected .npy files
-for gesture in reversed(os.listdir(WEBCAM_DATA_DIR)):
-    gesture_path = os.path.join(WEBCAM_DATA_DIR, gesture)
-    if os.path.isdir(gesture_path):
-        for fname in reversed(os.listdir(gesture_path)):
-            if fname.endswith(".npy"):
-                file_path = os.path.join(gesture_path, fname)
-                print(f"[WEBCAM DATA] Loading {file_path}")
-                X.append(np.load(file_path))
-                y.append(gesture)
-
-X = np.array(X)
-y = np.array(y)
-
-print(f"Training on {len(X)} samples across {len(set(y))} classes.")
-
-clf = RandomForestClassifier(n_estimators=200, random_state=42)
-clf.fit(X, y)
-
-os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-joblib.dump(clf, MODEL_PATH)
-print(f"Saved trained model to {MODEL_PATH}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+from __future__ import annotations
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import pygame
+
+CACHE_DIR = os.path.join("cache", "tts")
+MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+DISK_CACHE_BYTES = 512 * 1024 * 1024
+DEFAULT_RATE = 1.0
+
+CacheKey = Tuple[str, str, str, float]
+
+
+def rate_multiplier(rate: float) -> float:
+    """Clamp the `speech_rate` setting (1.0 = the engine's normal pace) to 0.5x - 2.0x."""
+    return min(2.0, max(0.5, rate))
+
+
+# ------------------------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------------------------
+class TTSBackend:
+    """Turns text into an in-memory audio clip (WAV/OGG/MP3 bytes)."""
+
+    name = "base"
+    offline = True
+
+    def available(self) -> bool:
+        return True
+
+    def synthesize(self, text: str, language_code: str, gender: str, rate: float) -> bytes:
+        raise NotImplementedError
+
+
+class Pyttsx3Backend(TTSBackend):
+    """
+    Local engine (SAPI5 on Windows, NSSpeechSynthesizer on macOS, eSpeak on Linux).
+
+    pyttsx3 can only render to a file, so the clip is written to a scratch
+    WAV once, read back into memory and deleted; playback never touches disk.
+    """
+
+    name = "pyttsx3"
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()
+        self._base_rate = 200
+
+    def available(self) -> bool:
+        try:
+            import pyttsx3  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._base_rate = self._engine.getProperty("rate") or 200
+        return self._engine
+
+    def _pick_voice(self, engine, language_code: str, gender: str):
+        voices = engine.getProperty("voices") or []
+        gender = gender.lower()
+        word = re.compile(rf"\b{re.escape(gender)}\b")
+
+        def score(v):
+            langs = " ".join(str(l) for l in (getattr(v, "languages", None) or [])).lower()
+            text = f"{v.id} {v.name} {langs}".lower()
+            s = 0
+            if language_code.lower() in langs or f"{language_code.lower()}_" in text or f"{language_code.lower()}-" in text:
+                s += 2
+            # Exact field or whole word: "male" must not match "female"
+            if (getattr(v, "gender", None) or "").lower() == gender or word.search(text):
+                s += 1
+            return s
+
+        best = max(voices, key=score, default=None)
+        return best.id if best is not None and score(best) > 0 else None
+
+    def synthesize(self, text: str, language_code: str, gender: str, rate: float) -> bytes:
+        with self._lock:
+            engine = self._get_engine()
+            voice = self._pick_voice(engine, language_code, gender)
+            if voice:
+                engine.setProperty("voice", voice)
+            engine.setProperty("rate", int(self._base_rate * rate_multiplier(rate)))
+
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class GTTSBackend(TTSBackend):
+    """Google TTS; needs the network, kept only as a fallback."""
+
+    name = "gtts"
+    offline = False
+
+    def available(self) -> bool:
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text: str, language_code: str, gender: str, rate: float) -> bytes:
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=language_code, slow=rate_multiplier(rate) < 0.75).write_to_fp(buf)
+        return buf.getvalue()
+
+
+BACKENDS = {"pyttsx3": Pyttsx3Backend, "gtts": GTTSBackend}
+
+
+# ------------------------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------------------------
+class AudioCache:
+    """
+    Size-bounded LRU cache of synthesized clips.
+
+    Hot entries live in memory; with `cache_dir` set, clips are also kept on
+    disk (bounded separately) so common phrases survive restarts.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_BYTES, cache_dir: Optional[str] = CACHE_DIR,
+                 max_disk_bytes: int = DISK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, language_code: str, gender: str, rate: float) -> CacheKey:
+        return (text.strip(), language_code, gender, round(float(rate), 2))
+
+    def _disk_path(self, key: CacheKey) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.audio")
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+                self._put_memory(key, data)
+                with self._lock:
+                    self.hits += 1
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, data: bytes, persist: bool = True):
+        """
+        Store a clip in memory and, unless `persist` is False, on disk.
+
+        Args:
+            key (CacheKey): Key from `make_key`.
+            data (bytes): Encoded audio clip.
+            persist (bool): Also write the clip to `cache_dir`.
+        """
+        self._put_memory(key, data)
+        if self.cache_dir and persist:
+            with open(self._disk_path(key), "wb") as f:
+                f.write(data)
+            self._evict_disk()
+
+    def _put_memory(self, key: CacheKey, data: bytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _evict_disk(self):
+        files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".audio")]
+        stats = sorted(((os.stat(p), p) for p in files), key=lambda sp: sp[0].st_mtime)
+        total = sum(st.st_size for st, _ in stats)
+        for st, path in stats:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= st.st_size
+
+
+# ------------------------------------------------------------------------------------
+# Synthesizer
+# ------------------------------------------------------------------------------------
+class SpeechSynthesizer:
+    """
+    Cached text-to-speech with in-memory playback.
+
+    Backends are tried in order; the default prefers the offline engine
+    (pyttsx3, pinned in requirements.txt) and only falls back to gTTS when no
+    local engine is installed.
+    """
+
+    def __init__(self, backends: Optional[List[str]] = None, cache: Optional[AudioCache] = None):
+        names = backends or ["pyttsx3", "gtts"]
+        self.backends = [b for b in (BACKENDS[n]() for n in names) if b.available()]
+        if not self.backends:
+            raise RuntimeError(f"No TTS backend available (tried: {', '.join(names)})")
+        self.cache = cache if cache is not None else AudioCache()
+        self._channel = None
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+    def synthesize(self, text: str, language_code: str, gender: str = "Male", rate: float = DEFAULT_RATE) -> bytes:
+        key = AudioCache.make_key(text, language_code, gender, rate)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        last_error = None
+        for backend in self.backends:
+            try:
+                data = backend.synthesize(key[0], language_code, gender, rate)
+            except Exception as e:
+                last_error = e
+                continue
+            # Fallback clips stay in memory only: the key has no backend, so a persisted
+            # gTTS clip would keep shadowing the offline voice once it is installed
+            self.cache.put(key, data, persist=backend.offline)
+            return data
+        raise RuntimeError(f"Speech synthesis failed: {last_error}")
+
+    def play(self, audio: bytes):
+        """Start playback from memory; returns the pygame Channel."""
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        self._channel = sound.play()
+        return self._channel
+
+    def is_playing(self) -> bool:
+        return self._channel is not None and self._channel.get_busy()
+
+    def stop(self):
+        if self._channel is not None:
+            self._channel.stop()
+        self._channel = None
+
+    def speak(self, text: str, language_code: str, gender: str = "Male", rate: float = DEFAULT_RATE):
+        """Synthesize (or fetch from cache) and start playback."""
+        return self.play(self.synthesize(text, language_code, gender, rate))
+
+
+if __name__ == "__main__":
+    # Cold vs. cached time-to-playback for a few common phrases
+    synth = SpeechSynthesizer()
+    print(f"Backends: {[b.name for b in synth.backends]}")
+    for phrase in ["hello", "thank you", "hello"]:
+        t0 = time.perf_counter()
+        synth.speak(phrase, "en")
+        print(f"{phrase!r}: playback started after {(time.perf_counter() - t0) * 1000:.1f} ms")
+        while synth.is_playing():
+            time.sleep(0.05)
+    print(f"Cache hits {synth.cache.hits}, misses {synth.cache.misses}")
@@ -1,7 +1,28 @@
-import mediapipe as mp
+import time
+from itertools import combinations
+
 import numpy as np
 
-mp_hands = mp.solutions.hands
+N_LANDMARKS = 21
+WRIST = 0
+MIDDLE_MCP = 9
+INDEX_MCP = 5
+PINKY_MCP = 17
+FINGERTIPS = (4, 8, 12, 16, 20)
+FINGERS = ((1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16), (17, 18, 19, 20))
+
+# (a, b, c) triplets: the joint angle is measured at b, between b->a and b->c
+_ANGLE_TRIPLETS = np.array([
+    (chain[i - 1], chain[i], chain[i + 1])
+    for finger in FINGERS
+    for chain in [(WRIST,) + finger]
+    for i in range(1, 4)
+])
+_TIP_PAIRS = np.array(list(combinations(FINGERTIPS, 2)))
+
+RAW_DIM = N_LANDMARKS * 3
+FEATURE_DIM = RAW_DIM + len(_TIP_PAIRS) + len(_ANGLE_TRIPLETS)  # 63 + 10 + 15 = 88
+
 
 def extract_landmarks(results):
     if not results.multi_hand_landmarks:
@@ -11,3 +32,224 @@ def extract_landmarks(results):
         for lm in hand_landmarks.landmark:
             landmarks.extend([lm.x, lm.y, lm.z])
     return np.array(landmarks)
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """MediaPipe landmark list (or anything array-like) -> (21, 3) float32 array."""
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    if len(landmarks) and hasattr(landmarks[0], "x"):
+        return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+    return np.asarray(landmarks, dtype=np.float32).reshape(N_LANDMARKS, 3)
+
+
+class LandmarkBuffer:
+    """
+    Hot-path converter from MediaPipe landmarks to float32 without per-frame allocation.
+
+    `fill()` writes x/y/z into a preallocated (21, 3) float32 array in a single pass
+    over the protobuf list; the bounding box and the (1, 63) classifier row are views
+    or reductions of that same array. A small ring of buffers is cycled so a result
+    handed to another thread stays valid for `slots - 1` further frames; copy it to
+    keep it longer.
+    """
+
+    def __init__(self, slots: int = 8):
+        self._ring = np.zeros((slots, N_LANDMARKS, 3), dtype=np.float32)
+        self._flat = self._ring.reshape(slots, RAW_DIM)
+        # memoryview item assignment stores a Python float as float32 without going
+        # through numpy's scalar machinery (~1.5x faster than ndarray.__setitem__)
+        self._views = [memoryview(row) for row in self._flat]
+        self._slot = 0
+
+    def fill(self, landmarks) -> np.ndarray:
+        """Copy a landmark list into the next buffer; returns its (21, 3) view."""
+        if hasattr(landmarks, "landmark"):
+            landmarks = landmarks.landmark
+        self._slot = (self._slot + 1) % len(self._ring)
+        mv = self._views[self._slot]
+        j = 0
+        for lm in landmarks:
+            mv[j] = lm.x
+            mv[j + 1] = lm.y
+            mv[j + 2] = lm.z
+            j += 3
+        return self._ring[self._slot]
+
+    def row(self) -> np.ndarray:
+        """(1, 63) float32 view of the most recently filled buffer (classifier input)."""
+        return self._flat[self._slot:self._slot + 1]
+
+    def box(self, width: int, height: int, padding: int = 0):
+        """bounding_box() of the most recently filled buffer, without numpy reductions on 21 values."""
+        mv = self._views[self._slot]
+        xs, ys = mv[0::3], mv[1::3]
+        return (max(0, int(min(xs) * width) - padding), max(0, int(min(ys) * height) - padding),
+                min(width, int(max(xs) * width) + padding), min(height, int(max(ys) * height) + padding))
+
+
+def bounding_box(pts: np.ndarray, width: int, height: int, padding: int = 0):
+    """Pixel box (x_min, y_min, x_max, y_max) around (21, 3) normalized landmarks, clipped to the frame."""
+    lo = pts[:, :2].min(axis=0)
+    hi = pts[:, :2].max(axis=0)
+    return (max(0, int(lo[0] * width) - padding), max(0, int(lo[1] * height) - padding),
+            min(width, int(hi[0] * width) + padding), min(height, int(hi[1] * height) + padding))
+
+
+def _as_batch(hand) -> tuple:
+    if hasattr(hand, "landmark") or (not isinstance(hand, np.ndarray) and len(hand) and hasattr(hand[0], "x")):
+        return landmarks_to_array(hand)[None], True
+    pts = np.asarray(hand, dtype=np.float32)
+    single = pts.ndim == 1 or (pts.ndim == 2 and pts.shape == (N_LANDMARKS, 3))
+    return pts.reshape(-1, N_LANDMARKS, 3), single
+
+
+def normalize_hand(pts: np.ndarray, mirror: bool = True) -> np.ndarray:
+    """
+    Wrist-relative, scale- and mirror-normalized landmarks.
+
+    Args:
+        pts (np.ndarray): (N, 21, 3) landmarks.
+        mirror (bool): Flip left hands onto right-hand orientation, using the sign of
+                       the palm normal (index MCP x pinky MCP around the wrist).
+
+    Returns:
+        np.ndarray: (N, 21, 3) float32, wrist at the origin, wrist->middle-MCP length 1.
+    """
+    rel = pts - pts[:, WRIST:WRIST + 1]
+    scale = np.linalg.norm(rel[:, MIDDLE_MCP], axis=-1)
+    rel = rel / np.where(scale > 1e-6, scale, 1.0)[:, None, None]
+    if mirror:
+        a, b = rel[:, INDEX_MCP], rel[:, PINKY_MCP]
+        side = np.where(a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0] < 0, -1.0, 1.0).astype(rel.dtype)
+        rel[..., 0] *= side[:, None]
+    return rel
+
+
+def extract_features(hand, mirror: bool = True) -> np.ndarray:
+    """
+    Vectorized hand features for one hand or a batch.
+
+    Args:
+        hand: MediaPipe landmark list, (21, 3) / (63,) array, or a batch of shape
+              (N, 21, 3) / (N, 63).
+        mirror (bool): Normalize left and right hands to the same orientation.
+
+    Returns:
+        np.ndarray: float32 features of length FEATURE_DIM (88) -- normalized coordinates (63),
+                    pairwise fingertip distances (10) and finger joint angles in radians (15) --
+                    shaped (88,) for a single hand or (N, 88) for a batch.
+    """
+    pts, single = _as_batch(hand)
+    rel = normalize_hand(pts.astype(np.float32, copy=False), mirror=mirror)
+
+    # Work in a (3, 21, N) coordinate-major layout: gathering landmarks then copies
+    # contiguous rows of N values instead of striding over 3-float records
+    c = np.ascontiguousarray(rel.transpose(2, 1, 0))
+    tips = c[:, _TIP_PAIRS[:, 0]] - c[:, _TIP_PAIRS[:, 1]]
+    dists = np.sqrt(np.einsum("dkn,dkn->kn", tips, tips))
+
+    joints = c[:, _ANGLE_TRIPLETS[:, 1]]
+    v1 = c[:, _ANGLE_TRIPLETS[:, 0]] - joints
+    v2 = c[:, _ANGLE_TRIPLETS[:, 2]] - joints
+    denom = np.sqrt(np.einsum("dkn,dkn->kn", v1, v1) * np.einsum("dkn,dkn->kn", v2, v2))
+    cos = np.einsum("dkn,dkn->kn", v1, v2) / np.where(denom > 1e-9, denom, 1.0)
+    angles = np.arccos(np.clip(cos, -1.0, 1.0))
+
+    feats = np.concatenate([rel.reshape(len(rel), -1), dists.T, angles.T], axis=1).astype(np.float32, copy=False)
+    return feats[0] if single else feats
+
+
+def model_input(landmarks, n_features: int) -> np.ndarray:
+    """
+    Build classifier input for a model trained on `n_features` columns.
+
+    Models trained on raw coordinates (63) get the flattened landmarks; models trained
+    with `extract_features` (88) get the engineered features. Returns (N, n_features).
+    """
+    pts, _ = _as_batch(landmarks)
+    if n_features == RAW_DIM:
+        return pts.reshape(len(pts), RAW_DIM)
+    if n_features == FEATURE_DIM:
+        return extract_features(pts).reshape(len(pts), FEATURE_DIM)
+    raise ValueError(f"No feature schema produces {n_features} columns (known: {RAW_DIM}, {FEATURE_DIM})")
+
+
+def _bench_conversion(n: int = 20000):
+    """Old list-based conversion vs. LandmarkBuffer: time and temporary memory per frame."""
+    import timeit
+    import tracemalloc
+
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in np.random.default_rng(1).random((N_LANDMARKS, 3)):
+            hand.landmark.add(x=x, y=y, z=z)
+        kind = "protobuf"
+    except ImportError:
+        class _Lm:
+            __slots__ = ("x", "y", "z")
+
+            def __init__(self, x, y, z):
+                self.x, self.y, self.z = float(x), float(y), float(z)
+
+        class _Hand:
+            def __init__(self):
+                self.landmark = [_Lm(*p) for p in np.random.default_rng(1).random((N_LANDMARKS, 3))]
+        hand = _Hand()
+        kind = "stand-in objects (mediapipe not installed)"
+
+    w, h, pad = 1280, 720, 20
+
+    def old():
+        xs = [lm.x for lm in hand.landmark]
+        ys = [lm.y for lm in hand.landmark]
+        box = (max(0, int(min(xs) * w) - pad), max(0, int(min(ys) * h) - pad),
+               min(w, int(max(xs) * w) + pad), min(h, int(max(ys) * h) + pad))
+        data = np.array([[lm.x, lm.y, lm.z] for lm in hand.landmark]).flatten().reshape(1, -1)
+        return box, data.astype(np.float32)
+
+    buf = LandmarkBuffer()
+
+    def new():
+        buf.fill(hand)
+        return buf.box(w, h, pad), buf.row()
+
+    print(f"Landmark conversion ({kind}):")
+    for name, fn in (("lists + np.array", old), ("LandmarkBuffer", new)):
+        fn()
+        us = min(timeit.repeat(fn, number=n, repeat=3)) / n * 1e6
+        # What a frame allocates is freed again by its end, so measure it while the frame runs:
+        # the traced high-water mark of each frame above what was live when it started
+        tracemalloc.start()
+        transient = []
+        for _ in range(1000):
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = fn()
+            _, peak = tracemalloc.get_traced_memory()
+            transient.append(peak - start)
+            del result
+        tracemalloc.stop()
+        print(f"  {name:18s} {us:6.2f} us/frame, {np.median(transient):6.0f} B allocated at the frame's peak "
+              f"(max {max(transient)})")
+
+
+if __name__ == "__main__":
+    _bench_conversion()
+
+    # Microbenchmark: per-frame cost and batch throughput
+    rng = np.random.default_rng(0)
+    one = rng.random((N_LANDMARKS, 3), dtype=np.float32)
+    batch = rng.random((100_000, N_LANDMARKS, 3), dtype=np.float32)
+
+    n = 5000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        extract_features(one)
+    per_frame_us = (time.perf_counter() - t0) / n * 1e6
+
+    t0 = time.perf_counter()
+    extract_features(batch)
+    rate = len(batch) / (time.perf_counter() - t0)
+    print(f"extract_features: {per_frame_us:.1f} us/frame, batch {rate:,.0f} hands/s ({FEATURE_DIM} features)")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+import importlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+MODEL_PATH = "models/sign_classifier_v3.pkl"
+STARTUP_LOG = os.path.join("logs", "startup.jsonl")
+
+# (phase, share of the progress bar); shares reflect typical cold-start cost
+PHASES = (
+    ("imports", 0.40),
+    ("model", 0.20),
+    ("mediapipe", 0.20),
+    ("speech", 0.05),
+    ("camera", 0.15),
+)
+HEAVY_MODULES = ("numpy", "cv2", "mediapipe", "joblib", "sklearn.ensemble", "pygame", "PIL.Image")
+
+
+class Components:
+    """Everything the recognition window needs, already initialized."""
+
+    def __init__(self):
+        self.recognizer = None
+        self.cap = None
+        self.synthesizer = None
+
+
+class WarmStart:
+    """
+    Loads the heavy recognition components on a background thread.
+
+    The splash screen polls `progress` / `phase`; once `ready` is set the
+    components can be handed straight to `main.run_recognition()`.
+    Per-phase durations end up in `timings` (seconds) and are appended to
+    logs/startup.jsonl so startup regressions can be tracked.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, camera_index: int = 0,
+                 on_phase: Optional[Callable[[str], None]] = None):
+        self.model_path = model_path
+        self.camera_index = camera_index
+        self.on_phase = on_phase
+        self.components = Components()
+        self.timings = {}
+        self.phase = None
+        self.progress = 0.0
+        self.error = None
+        self.ready = threading.Event()
+        self._thread = None
+
+    def start(self) -> "WarmStart":
+        self._thread = threading.Thread(target=self.run, name="warm-start", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self):
+        """Run every phase in order (blocking)."""
+        t_total = time.perf_counter()
+        try:
+            for phase, share in PHASES:
+                self.phase = phase
+                if self.on_phase:
+                    self.on_phase(phase)
+                t0 = time.perf_counter()
+                getattr(self, f"_load_{phase}")()
+                self.timings[phase] = time.perf_counter() - t0
+                self.progress = min(1.0, self.progress + share)
+        except Exception as e:
+            self.error = e
+            print(f"Warm start failed during '{self.phase}': {e}")
+        self.timings["total"] = time.perf_counter() - t_total
+        self.phase = "ready" if self.error is None else "error"
+        self.progress = 1.0
+        self._log()
+        self.ready.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Components:
+        self.ready.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.components
+
+    def report(self) -> str:
+        parts = [f"{name} {secs * 1000:.0f} ms" for name, secs in self.timings.items()]
+        return "Startup: " + ", ".join(parts)
+
+    # -- phases -----------------------------------------------------------------------
+    def _load_imports(self):
+        for name in HEAVY_MODULES:
+            importlib.import_module(name)
+
+    def _load_model(self):
+        from recognizer import SignRecognizer
+        self.components.recognizer = SignRecognizer(self.model_path)
+        self.components.recognizer.engine
+
+    def _load_mediapipe(self):
+        # First process() call loads the TFLite models; pay for it here, not on the first live frame
+        self.components.recognizer.load(warm_up=True)
+
+    def _load_speech(self):
+        import pygame
+        from tts_engine import SpeechSynthesizer
+        pygame.mixer.init()
+        self.components.synthesizer = SpeechSynthesizer()
+
+    def _load_camera(self):
+        from frame_source import CameraSource
+        cap = CameraSource(self.camera_index, width=1280, height=720)
+        cap.read()  # the first frame is the slow one on most drivers
+        self.components.cap = cap
+
+    def _log(self):
+        try:
+            os.makedirs(os.path.dirname(STARTUP_LOG), exist_ok=True)
+            entry = {"time": time.time(), "ok": self.error is None,
+                     "phases_ms": {k: round(v * 1000, 1) for k, v in self.timings.items()}}
+            with open(STARTUP_LOG, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+        print(self.report())
+
+
+if __name__ == "__main__":
+    warm = WarmStart()
+    warm.run()